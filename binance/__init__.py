@@ -8,12 +8,22 @@ __version__ = "1.0.31"
 
 from binance.async_client import AsyncClient  # noqa
 from binance.client import Client  # noqa
+from binance.rate_limit import RateLimiter, RateLimit, CircuitBreaker  # noqa
+from binance.response import ApiResponse, ResponseMeta  # noqa
+from binance.clock_sync import ClockSync  # noqa
+from binance.transport import AsyncTransport, HttpxTransport  # noqa
+from binance.hedging import HedgingPolicy  # noqa
+from binance.backfill import KlineBackfillEngine  # noqa
+from binance.kline_cache import CachedKlineStore, EarliestTimestampCache  # noqa
 from binance.ws.depthcache import (
     DepthCacheManager,  # noqa
     OptionsDepthCacheManager,  # noqa
     ThreadedDepthCacheManager,  # noqa
     FuturesDepthCacheManager,  # noqa
     OptionsDepthCacheManager,  # noqa
+    MultiDepthCacheManager,  # noqa
+    MultiFuturesDepthCacheManager,  # noqa
+    SnapshotScheduler,  # noqa
 )
 from binance.ws.streams import (
     BinanceSocketManager,  # noqa
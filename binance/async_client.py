@@ -1,6 +1,7 @@
 import asyncio
+import contextvars
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode, quote
 import time
 import aiohttp
@@ -17,8 +18,15 @@ from binance.helpers import (
     convert_ts_str,
     get_loop,
     interval_to_milliseconds,
+    merge_kline_pages,
 )
 from .base_client import BaseClient
+from .hedging import HedgingPolicy
+from .rate_limit import CircuitBreaker, RateLimiter
+from .klines import KLINES_LIST, check_output_format, format_klines
+from .kline_cache import EarliestTimestampCache
+from .response import ApiResponse
+from .transport import AsyncTransport
 from .client import Client
 
 
@@ -38,10 +46,25 @@ class AsyncClient(BaseClient):
         private_key_pass: Optional[str] = None,
         https_proxy: Optional[str] = None,
         time_unit: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        connector_params: Optional[Dict[str, Any]] = None,
+        transport: Optional[AsyncTransport] = None,
+        hedging_policy: Optional[HedgingPolicy] = None,
+        earliest_timestamp_cache: Optional[EarliestTimestampCache] = None,
     ):
+        if transport and https_proxy:
+            raise ValueError("https_proxy is not used with a transport, configure the proxy on the transport")
         self.https_proxy = https_proxy
+        self.transport = transport
+        self.hedging_policy = hedging_policy
         self.loop = loop or get_loop()
+        # the last response is kept per task so concurrent calls do not overwrite each other
+        self._response_var: contextvars.ContextVar[Optional[aiohttp.ClientResponse]] = (
+            contextvars.ContextVar(f"binance_response_{id(self)}", default=None)
+        )
         self._session_params: Dict[str, Any] = session_params or {}
+        self._connector_params = connector_params
         
         # Convert https_proxy to requests_params format for BaseClient
         if https_proxy and requests_params is None:
@@ -62,6 +85,9 @@ class AsyncClient(BaseClient):
             private_key,
             private_key_pass,
             time_unit=time_unit,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            earliest_timestamp_cache=earliest_timestamp_cache,
         )
 
     @classmethod
@@ -80,6 +106,12 @@ class AsyncClient(BaseClient):
         private_key_pass: Optional[str] = None,
         https_proxy: Optional[str] = None,
         time_unit: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        connector_params: Optional[Dict[str, Any]] = None,
+        transport: Optional[AsyncTransport] = None,
+        hedging_policy: Optional[HedgingPolicy] = None,
+        earliest_timestamp_cache: Optional[EarliestTimestampCache] = None,
     ):
         self = cls(
             api_key,
@@ -94,7 +126,13 @@ class AsyncClient(BaseClient):
             private_key,
             private_key_pass,
             https_proxy,
-            time_unit
+            time_unit,
+            rate_limiter,
+            circuit_breaker,
+            connector_params,
+            transport,
+            hedging_policy,
+            earliest_timestamp_cache,
         )
         self.https_proxy = https_proxy  # move this to the constructor
 
@@ -112,16 +150,76 @@ class AsyncClient(BaseClient):
             await self.close_connection()
             raise
 
-    def _init_session(self) -> aiohttp.ClientSession:
+    @property
+    def response(self) -> Optional[aiohttp.ClientResponse]:
+        """Last response received by the current task"""
+        return self._response_var.get()
+
+    @response.setter
+    def response(self, response: Optional[aiohttp.ClientResponse]):
+        self._response_var.set(response)
+
+    def _init_session(self) -> Optional[aiohttp.ClientSession]:
+        if self.transport:
+            # requests go through the transport, the session headers are sent with each request
+            self._transport_headers = self._get_headers()
+            return None
+        session_params = self._session_params
+        if self._connector_params is not None and "connector" not in session_params:
+            # e.g. limit_per_host, keepalive_timeout, ttl_dns_cache, aiohttp already sets TCP_NODELAY
+            session_params = dict(
+                session_params,
+                connector=aiohttp.TCPConnector(loop=self.loop, **self._connector_params),
+            )
         session = aiohttp.ClientSession(
-            loop=self.loop, headers=self._get_headers(), **self._session_params
+            loop=self.loop, headers=self._get_headers(), **session_params
         )
         return session
 
+    async def warmup(
+        self,
+        connections_per_host: int = 2,
+        apis: Tuple[str, ...] = ("api", "fapi", "dapi"),
+    ):
+        """Open keep-alive connections to the API hosts ahead of time
+
+        Pings each host with ``connections_per_host`` concurrent requests so the connections and their
+        TLS sessions are pooled, and the first request after idling does not pay for the handshake.
+        Connections stay open for the ``keepalive_timeout`` of the connector, call again to keep them warm.
+
+        :param connections_per_host: connections to open per host, at most the ``limit_per_host`` of the connector
+        :type connections_per_host: int
+        :param apis: hosts to connect to, any of "api", "fapi", "dapi", "eapi" and "papi"
+        :type apis: tuple
+
+        .. code:: python
+
+            client = await AsyncClient.create(connector_params={"limit_per_host": 10, "keepalive_timeout": 60})
+            await client.warmup(connections_per_host=4, apis=("api", "fapi"))
+
+        """
+        ping_uris = {
+            "api": self._create_api_uri("ping", False, self.PUBLIC_API_VERSION),
+            "fapi": self._create_futures_api_uri("ping"),
+            "dapi": self._create_futures_coin_api_url("ping"),
+            "eapi": self._create_options_api_uri("ping"),
+            "papi": self._create_papi_api_uri("ping"),
+        }
+        uris = [ping_uris[api] for api in apis]
+        await asyncio.gather(
+            *[
+                self._request("get", uri, False)
+                for uri in uris
+                for _ in range(connections_per_host)
+            ]
+        )
+
     async def close_connection(self):
         if self.session:
             assert self.session
             await self.session.close()
+        if self.transport:
+            await self.transport.close()
         if self.ws_api:
             await self.ws_api.close()
             self._ws_api = None
@@ -129,53 +227,151 @@ class AsyncClient(BaseClient):
     async def _request(
         self, method, uri: str, signed: bool, force_params: bool = False, **kwargs
     ):
-        # this check needs to be done before __get_request_kwargs to avoid
-        # polluting the signature
-        headers = {}
-        if method.upper() in ["POST", "PUT", "DELETE"]:
-            headers.update({"Content-Type": "application/x-www-form-urlencoded"})
+        send = self._send_hedged_request if self.hedging_policy else self._send_request
+        if not self.circuit_breaker:
+            return await send(method, uri, signed, force_params, **kwargs)
+
+        attempt = 0
+        while True:
+            await self.circuit_breaker.wait_async(uri)
+            try:
+                return await send(
+                    method, uri, signed, force_params, **self._copy_request_kwargs(kwargs)
+                )
+            except BinanceAPIException as e:
+                delay = self.circuit_breaker.get_retry_delay(method, e.status_code, attempt)
+                if delay is None:
+                    raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _send_request(
+        self, method, uri: str, signed: bool, force_params: bool = False, **kwargs
+    ):
+        if self.rate_limiter:
+            # wait before signing so the timestamp stays within recvWindow
+            await self.rate_limiter.acquire_async(method, uri, kwargs.get("data"))
 
-        if "data" in kwargs:
-            for key in kwargs["data"]:
-                if key == "headers":
-                    headers.update(kwargs["data"][key])
-                    del kwargs["data"][key]
-                    break
+        return await self._send_prepared_request(
+            self._prepare_request(method, uri, signed, force_params, **kwargs)
+        )
 
-        kwargs = self._get_request_kwargs(method, signed, force_params, **kwargs)
+    async def _send_hedged_request(
+        self, method, uri: str, signed: bool, force_params: bool = False, **kwargs
+    ):
+        """Send a public GET, and a copy of it when it is slower than usual
 
+        The first response wins and the other request is cancelled. Errors are only raised once
+        both requests have failed.
+        """
+        policy = self.hedging_policy
+        key = None if signed else policy.get_key(method, uri)
+        if key is None:
+            return await self._send_request(method, uri, signed, force_params, **kwargs)
+
+        weight = policy.get_weight(key, kwargs.get("data"))
+        policy.earn(weight)
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(
+            self._with_response(
+                self._send_request(method, uri, signed, force_params, **self._copy_request_kwargs(kwargs))
+            )
+        )
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=policy.get_delay(key))
+            hedge = None
+            if not done and policy.spend(weight):
+                hedge_uri = policy.get_hedge_uri(uri)
+                # a hedge never waits for the rate limiter, it is skipped instead
+                if not self.rate_limiter or self.rate_limiter.try_acquire(method, hedge_uri, kwargs.get("data")):
+                    request = self._prepare_request(
+                        method, hedge_uri, signed, force_params, **self._copy_request_kwargs(kwargs)
+                    )
+                    hedge = asyncio.ensure_future(self._with_response(self._send_prepared_request(request)))
+                    pending.add(hedge)
+                else:
+                    policy.refund(weight)
+
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        data, self.response = task.result()
+                        policy.record(key, time.perf_counter() - start, hedge is not None, task is hedge)
+                        return data
+                    error = error or task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _with_response(self, send):
+        # tasks run in a copy of the context, hand the response back to the caller
+        data = await send
+        return data, self.response
+
+    async def _send_prepared_request(self, request):
+        if self.transport:
+            return await self._send_transport_request(request)
+
+        method = request.method
+        uri = request.uri
+        kwargs = request.kwargs
         if method == "get":
-            # url encode the query string
-            if "params" in kwargs:
-                uri = f"{uri}?{kwargs['params']}"
-                kwargs.pop("params")
-
-        data = kwargs.get("data")
-        if data is not None:
-            del kwargs["data"]
-
-        if (
-            signed and self.PRIVATE_KEY and data
-        ):  # handle issues with signing using eddsa/rsa and POST requests
-            dict_data = Client.convert_to_dict(data)
-            signature = dict_data["signature"] if "signature" in dict_data else None
-            if signature:
-                del dict_data["signature"]
-            url_encoded_data = urlencode(dict_data)
-            data = f"{url_encoded_data}&signature={signature}"
+            # the query string is already url encoded
+            uri = request.url
+        elif request.query_string:
+            kwargs["params"] = request.query_string
 
         # Remove proxies from kwargs since aiohttp uses 'proxy' parameter instead
         kwargs.pop('proxies', None)
-        
+
+        start = time.perf_counter()
         async with getattr(self.session, method)(
             yarl.URL(uri, encoded=True),
             proxy=self.https_proxy,
-            headers=headers,
-            data=data,
+            headers=request.headers,
+            data=request.body,
             **kwargs,
         ) as response:
+            latency = time.perf_counter() - start
             self.response = response
-            return await self._handle_response(response)
+            if self.rate_limiter:
+                self.rate_limiter.update_from_headers(uri, response.headers)
+            if self.circuit_breaker:
+                self.circuit_breaker.record(uri, response.status, response.headers)
+            meta = self._get_response_meta(request, response.status, response.headers, latency)
+            data = await self._handle_response(response)
+            if request.envelope:
+                return ApiResponse(data, meta)
+            return data
+
+    async def _send_transport_request(self, request):
+        headers = self._transport_headers
+        if request.headers:
+            headers = {**headers, **request.headers}
+        start = time.perf_counter()
+        response = await self.transport.request(
+            request.method,
+            request.url,
+            headers,
+            data=request.body,
+            timeout=request.kwargs.get("timeout"),
+        )
+        latency = time.perf_counter() - start
+        self.response = response
+        if self.rate_limiter:
+            self.rate_limiter.update_from_headers(request.uri, response.headers)
+        if self.circuit_breaker:
+            self.circuit_breaker.record(request.uri, response.status, response.headers)
+        meta = self._get_response_meta(request, response.status, response.headers, latency)
+        data = await self._handle_response(response)
+        if request.envelope:
+            return ApiResponse(data, meta)
+        return data
 
     async def _handle_response(self, response: aiohttp.ClientResponse):
         """Internal helper for handling API responses from the Binance server.
@@ -474,6 +670,9 @@ class AsyncClient(BaseClient):
         interval,
         klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
     ):
+        timestamp = self.earliest_timestamp_cache.get(symbol, interval, klines_type)
+        if timestamp is not None:
+            return timestamp
         kline = await self._klines(
             klines_type=klines_type,
             symbol=symbol,
@@ -482,7 +681,9 @@ class AsyncClient(BaseClient):
             startTime=0,
             endTime=int(time.time() * 1000),
         )
-        return kline[0][0]
+        timestamp = kline[0][0]
+        self.earliest_timestamp_cache.set(symbol, interval, klines_type, timestamp)
+        return timestamp
 
     _get_earliest_valid_timestamp.__doc__ = Client._get_earliest_valid_timestamp.__doc__
 
@@ -494,8 +695,10 @@ class AsyncClient(BaseClient):
         end_str=None,
         limit=None,
         klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+        output_format: str = KLINES_LIST,
     ):
-        return await self._historical_klines(
+        check_output_format(output_format)
+        klines = await self._historical_klines(
             symbol,
             interval,
             start_str,
@@ -503,9 +706,50 @@ class AsyncClient(BaseClient):
             limit=limit,
             klines_type=klines_type,
         )
+        return format_klines(klines, output_format)
 
     get_historical_klines.__doc__ = Client.get_historical_klines.__doc__
 
+    async def get_historical_klines_parallel(
+        self,
+        symbol,
+        interval,
+        start_str=None,
+        end_str=None,
+        limit=None,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+        concurrency: int = 4,
+        page_limit: int = 1000,
+        output_format: str = KLINES_LIST,
+    ):
+        check_output_format(output_format)
+        if interval_to_milliseconds(interval) is None:
+            klines = await self._historical_klines(
+                symbol, interval, start_str, end_str, limit, klines_type
+            )
+            return format_klines(klines, output_format)
+        first_valid_ts = await self._get_earliest_valid_timestamp(symbol, interval, klines_type)
+        windows = self._get_kline_windows(
+            interval, first_valid_ts, start_str, end_str, limit, page_limit
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(window):
+            async with semaphore:
+                return await self._klines(
+                    klines_type=klines_type,
+                    symbol=symbol,
+                    interval=interval,
+                    limit=page_limit,
+                    startTime=window[0],
+                    endTime=window[1],
+                )
+
+        output_data = merge_kline_pages(await asyncio.gather(*[fetch(window) for window in windows]))
+        return format_klines(output_data[:limit] if limit else output_data, output_format)
+
+    get_historical_klines_parallel.__doc__ = Client.get_historical_klines_parallel.__doc__
+
     async def _historical_klines(
         self,
         symbol,
@@ -574,9 +818,9 @@ class AsyncClient(BaseClient):
             if end_ts and start_ts >= end_ts:
                 break
 
-            # sleep after every 3rd call to be kind to the API
+            # sleep after every 3rd call to be kind to the API, unless a rate limiter paces the calls
             idx += 1
-            if idx % 3 == 0:
+            if idx % 3 == 0 and not self.rate_limiter:
                 await asyncio.sleep(1)
 
         return output_data
@@ -662,9 +906,9 @@ class AsyncClient(BaseClient):
             if end_ts and start_ts >= end_ts:
                 break
 
-            # sleep after every 3rd call to be kind to the API
+            # sleep after every 3rd call to be kind to the API, unless a rate limiter paces the calls
             idx += 1
-            if idx % 3 == 0:
+            if idx % 3 == 0 and not self.rate_limiter:
                 await asyncio.sleep(1)
 
     _historical_klines_generator.__doc__ = Client._historical_klines_generator.__doc__
@@ -0,0 +1,305 @@
+"""Bulk kline backfill for many symbols and intervals
+
+``KlineBackfillEngine`` downloads a matrix of symbols, intervals and kline types with one
+``AsyncClient``, so every page shares its connection pool, rate limiter and circuit breaker.
+The first page of each job is requested from the start of the range without an end time,
+which finds the first available kline without a separate probe. The rest of the range is
+split into page windows that are fetched ``concurrency`` at a time across all jobs.
+
+Pages are passed to the sink in order for each job, and the open time of the last kline
+passed is saved to the checkpoint file, so a backfill restarted after a crash resumes
+where it stopped. The checkpoint is written at most every ``checkpoint_interval`` seconds
+and when a job finishes or fails, so after a crash the last pages may be passed again.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from .enums import HistoricalKlinesType
+from .helpers import convert_ts_str, get_kline_windows, interval_to_milliseconds
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillJob:
+    """Klines of one symbol, interval and kline type to download
+
+    :param symbol: Name of symbol pair e.g. BTCUSDT
+    :param interval: Binance Kline interval
+    :param start_ts: first open time in milliseconds, 0 for the first available kline
+    :param end_ts: optional - last open time in milliseconds, defaults to the last closed kline
+    :param klines_type: Historical klines type
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        interval: str,
+        start_ts: int = 0,
+        end_ts: Optional[int] = None,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+    ):
+        self.symbol = symbol
+        self.interval = interval
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.klines_type = klines_type
+        self.key = f"{klines_type.name}:{symbol}:{interval}"
+        # open time of the last kline passed to the sink
+        self.last_open_time: Optional[int] = None
+        self.klines = 0
+        self.pages = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._results: Dict[int, List] = {}
+        self._next_index = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def __repr__(self):
+        return f"BackfillJob({self.key})"
+
+
+class KlineBackfillEngine:
+    """Download klines for a matrix of symbols, intervals and kline types
+
+    :param client: AsyncClient shared by all requests
+    :type client: AsyncClient
+    :param sink: called with the job and each page of klines in order, may be a coroutine function
+    :type sink: callable
+    :param checkpoint: optional - path of a json file with the progress of each job
+    :type checkpoint: str|Path
+    :param concurrency: pages requested at the same time across all jobs
+    :type concurrency: int
+    :param page_limit: klines per request, max 1000 for spot and 1500 for futures
+    :type page_limit: int
+    :param checkpoint_interval: least seconds between checkpoint writes while jobs run
+    :type checkpoint_interval: float
+
+    .. code:: python
+
+        async def sink(job, klines):
+            await store.write(job.symbol, job.interval, klines)
+
+        client = await AsyncClient.create(rate_limiter=RateLimiter(), circuit_breaker=CircuitBreaker())
+        engine = KlineBackfillEngine(client, sink, checkpoint="backfill.json", concurrency=16)
+        engine.add_matrix(symbols, ["1m", "1h"], "1 Jan, 2020", klines_type=HistoricalKlinesType.FUTURES)
+        await engine.run()
+
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        sink: Callable[[BackfillJob, List], Optional[Awaitable]],
+        checkpoint: Optional[Union[str, Path]] = None,
+        concurrency: int = 8,
+        page_limit: int = 1000,
+        checkpoint_interval: float = 5.0,
+    ):
+        self.client = client
+        self.sink = sink
+        self.checkpoint = Path(checkpoint) if checkpoint else None
+        self.concurrency = concurrency
+        self.page_limit = page_limit
+        self.checkpoint_interval = checkpoint_interval
+        self.jobs: Dict[str, BackfillJob] = {}
+        self._progress: Dict[str, int] = self._load_checkpoint()
+        self._checkpoint_dirty = False
+        self._checkpoint_time = 0.0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def add(
+        self,
+        symbol: str,
+        interval: str,
+        start_str=None,
+        end_str=None,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+    ) -> BackfillJob:
+        """Add a job, resuming after the last kline saved in the checkpoint
+
+        :param start_str: optional - start date string in UTC format or timestamp in milliseconds, defaults to the first kline
+        :param end_str: optional - end date string in UTC format or timestamp in milliseconds, defaults to the last closed kline
+        """
+        job = BackfillJob(
+            symbol,
+            interval,
+            convert_ts_str(start_str) or 0,
+            convert_ts_str(end_str),
+            klines_type,
+        )
+        last_open_time = self._progress.get(job.key)
+        if last_open_time is not None:
+            job.last_open_time = last_open_time
+            job.start_ts = max(job.start_ts, last_open_time + 1)
+        self.jobs[job.key] = job
+        return job
+
+    def add_matrix(
+        self,
+        symbols: Iterable[str],
+        intervals: Iterable[str],
+        start_str=None,
+        end_str=None,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+    ) -> List[BackfillJob]:
+        """Add a job for every symbol and interval"""
+        intervals = list(intervals)
+        return [
+            self.add(symbol, interval, start_str, end_str, klines_type)
+            for symbol in symbols
+            for interval in intervals
+        ]
+
+    async def run(self) -> Dict[str, BackfillJob]:
+        """Download all jobs, a failed job does not stop the others
+
+        Call again to retry the failed jobs.
+
+        :return: jobs by key, with the klines and pages downloaded and the error of failed jobs
+        """
+        self._slots = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*[self._run_job(job) for job in self.jobs.values() if not job.done])
+        return self.jobs
+
+    def get_progress(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: {
+                "klines": job.klines,
+                "pages": job.pages,
+                "last_open_time": job.last_open_time,
+                "done": job.done,
+                "error": job.error,
+            }
+            for key, job in self.jobs.items()
+        }
+
+    async def _run_job(self, job: BackfillJob):
+        tasks: List[asyncio.Task] = []
+        job._lock = asyncio.Lock()
+        job._results = {}
+        job._next_index = 0
+        job.error = None
+        if job.last_open_time is not None:
+            # resume a failed run after the last kline passed on
+            job.start_ts = max(job.start_ts, job.last_open_time + 1)
+        try:
+            timeframe = interval_to_milliseconds(job.interval)
+            if job.end_ts is None:
+                # stop at the last closed kline, the open one changes until it closes
+                job.end_ts = int(time.time() * 1000) - (timeframe or 0)
+            if job.start_ts > job.end_ts:
+                job.done = True
+                return
+
+            # the first page finds the first available kline in the range
+            page = await self._fetch(job, job.start_ts, None)
+            await self._deliver(job, page)
+            if timeframe is None:
+                # monthly klines are not evenly spaced, walk them page by page
+                while len(page) == self.page_limit and page[-1][0] < job.end_ts:
+                    page = await self._fetch(job, page[-1][0] + 1, None)
+                    await self._deliver(job, page)
+            elif len(page) == self.page_limit and page[-1][0] < job.end_ts:
+                windows = get_kline_windows(page[-1][0] + timeframe, job.end_ts, timeframe, self.page_limit)
+                assert self._slots
+                for index, window in enumerate(windows):
+                    # wait for a slot before creating the task so pending pages stay bounded
+                    await self._slots.acquire()
+                    if job.error:
+                        self._slots.release()
+                        raise job.error
+                    tasks.append(asyncio.ensure_future(self._fetch_window(job, index, window)))
+                for result in await asyncio.gather(*tasks, return_exceptions=True):
+                    if isinstance(result, BaseException):
+                        raise result
+            job.done = True
+        except Exception as e:
+            job.error = e
+            logger.error("backfill of %s failed after %s klines: %r", job.key, job.klines, e)
+            for task in tasks:
+                task.cancel()
+        finally:
+            self._save_checkpoint(force=True)
+
+    async def _fetch(self, job: BackfillJob, start_ts: int, end_ts: Optional[int]) -> List:
+        assert self._slots
+        async with self._slots:
+            return await self._request(job, start_ts, end_ts)
+
+    async def _fetch_window(self, job: BackfillJob, index: int, window):
+        assert self._slots
+        try:
+            page = await self._request(job, *window)
+        except Exception as e:
+            job.error = e
+            raise
+        finally:
+            self._slots.release()
+        job._results[index] = page
+        assert job._lock
+        async with job._lock:
+            # pass the pages on in order, later pages wait for the earlier ones
+            while job._next_index in job._results:
+                await self._sink(job, job._results.pop(job._next_index))
+                job._next_index += 1
+
+    async def _request(self, job: BackfillJob, start_ts: int, end_ts: Optional[int]) -> List:
+        return await self.client._klines(
+            klines_type=job.klines_type,
+            symbol=job.symbol,
+            interval=job.interval,
+            limit=self.page_limit,
+            startTime=start_ts,
+            endTime=end_ts,
+        )
+
+    async def _deliver(self, job: BackfillJob, page: List):
+        assert job._lock
+        async with job._lock:
+            await self._sink(job, page)
+
+    async def _sink(self, job: BackfillJob, page: List):
+        job.pages += 1
+        if page and job.last_open_time is not None and page[0][0] <= job.last_open_time:
+            # drop klines already passed on, e.g. repeated at a page boundary
+            page = [kline for kline in page if kline[0] > job.last_open_time]
+        if page and page[-1][0] > job.end_ts:
+            page = [kline for kline in page if kline[0] <= job.end_ts]
+        if not page:
+            return
+        result = self.sink(job, page)
+        if inspect.isawaitable(result):
+            await result
+        job.klines += len(page)
+        job.last_open_time = page[-1][0]
+        self._progress[job.key] = job.last_open_time
+        self._checkpoint_dirty = True
+        self._save_checkpoint()
+
+    def _load_checkpoint(self) -> Dict[str, int]:
+        if not self.checkpoint or not self.checkpoint.exists():
+            return {}
+        with open(self.checkpoint) as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, force: bool = False):
+        if not self.checkpoint or not self._checkpoint_dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._checkpoint_time < self.checkpoint_interval:
+            # a write per page would block the event loop on large backfills
+            return
+        self._checkpoint_time = now
+        self._checkpoint_dirty = False
+        # write a new file and rename it, a crash never leaves a partial checkpoint
+        tmp = self.checkpoint.with_name(self.checkpoint.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._progress, f)
+        os.replace(tmp, self.checkpoint)
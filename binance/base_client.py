@@ -1,22 +1,71 @@
 from base64 import b64encode
 from pathlib import Path
 import random
-from typing import Dict, Optional, List, Tuple, Union, Any
+import re
+from typing import Callable, Dict, Optional, List, Tuple, Union, Any
 
 import asyncio
 import hashlib
 import hmac
+import logging
 import time
 from Crypto.PublicKey import RSA, ECC
 from Crypto.Hash import SHA256
 from Crypto.Signature import pkcs1_15, eddsa
 import urllib.parse as _urlencode
-from operator import itemgetter
 from urllib.parse import urlencode
 
 from binance.ws.websocket_api import WebsocketAPI
 
-from .helpers import get_loop
+from .helpers import convert_ts_str, get_kline_windows, get_loop, interval_to_milliseconds
+from .kline_cache import EarliestTimestampCache
+from .rate_limit import CircuitBreaker, RateLimiter
+from .response import ResponseMeta
+
+
+logger = logging.getLogger(__name__)
+
+# characters urlencode leaves as they are
+_URL_SAFE_VALUE = re.compile(r"[A-Za-z0-9_.~-]*\Z")
+
+
+class PreparedRequest:
+    """A request ready to be sent by the http session
+
+    :param method: http method, lower case
+    :param uri: url without the query string
+    :param query_string: encoded query string or None
+    :param body: encoded body or None
+    :param headers: request headers
+    :param kwargs: session keyword arguments, e.g. timeout and proxies
+    :param envelope: return the payload with its ResponseMeta
+    """
+
+    __slots__ = ("method", "uri", "query_string", "body", "headers", "kwargs", "envelope")
+
+    def __init__(
+        self,
+        method: str,
+        uri: str,
+        query_string: Optional[str],
+        body: Any,
+        headers: Dict[str, str],
+        kwargs: Dict[str, Any],
+        envelope: bool = False,
+    ):
+        self.method = method
+        self.uri = uri
+        self.query_string = query_string
+        self.body = body
+        self.headers = headers
+        self.kwargs = kwargs
+        self.envelope = envelope
+
+    @property
+    def url(self) -> str:
+        if self.query_string:
+            return f"{self.uri}?{self.query_string}"
+        return self.uri
 
 
 class BaseClient:
@@ -67,6 +116,9 @@ class BaseClient:
 
     REQUEST_RECVWINDOW: int = 10000  # 10 seconds
 
+    # params which are sent in the body even when force_params is set
+    BODY_PARAMS = ("batchOrders", "orderidlist", "origclientorderidlist")
+
     SYMBOL_TYPE_SPOT = "SPOT"
 
     ORDER_STATUS_NEW = "NEW"
@@ -167,6 +219,9 @@ class BaseClient:
         private_key_pass: Optional[str] = None,
         loop: Optional[asyncio.AbstractEventLoop] = None,
         time_unit: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        earliest_timestamp_cache: Optional[EarliestTimestampCache] = None,
     ):
         """Binance API Client constructor
 
@@ -184,6 +239,12 @@ class BaseClient:
         :type private_key_pass: optional - str
         :param time_unit: Time unit to use for requests. Supported values: "MILLISECOND", "MICROSECOND"
         :type time_unit: optional - str
+        :param rate_limiter: Limiter charging every request against the Binance rate limits, can be shared between clients
+        :type rate_limiter: optional - RateLimiter
+        :param circuit_breaker: Breaker pausing requests after a 429 or 418 response and retrying failed GET requests
+        :type circuit_breaker: optional - CircuitBreaker
+        :param earliest_timestamp_cache: Cache of the first kline open times, can be shared between clients, defaults to one per client
+        :type earliest_timestamp_cache: optional - EarliestTimestampCache
 
         """
 
@@ -200,6 +261,8 @@ class BaseClient:
 
         self.API_KEY = api_key
         self.API_SECRET = api_secret
+        self._hmac_key: Optional[str] = None
+        self._hmac_base: Any = None
         self.TIME_UNIT = time_unit
         self._is_rsa = False
         self.PRIVATE_KEY: Any = self._init_private_key(private_key, private_key_pass)
@@ -209,6 +272,12 @@ class BaseClient:
         self.testnet = testnet
         self.demo = demo
         self.timestamp_offset = 0
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        if earliest_timestamp_cache is None:
+            earliest_timestamp_cache = EarliestTimestampCache()
+        self.earliest_timestamp_cache = earliest_timestamp_cache
+        self.response_hooks: List[Callable[[ResponseMeta], None]] = []
         ws_api_url = self.WS_API_URL.format(tld)
         if testnet:
             ws_api_url = self.WS_API_TESTNET_URL
@@ -230,6 +299,54 @@ class BaseClient:
         self.ws_future = WebsocketAPI(url=ws_future_url, tld=tld, https_proxy=https_proxy)
         self.loop = loop or get_loop()
 
+    def add_response_hook(self, hook: Callable[[ResponseMeta], None]):
+        """Call ``hook`` with the ResponseMeta of every response, including errors
+
+        Hooks run on the thread or task making the call and should return quickly.
+
+        .. code:: python
+
+            client.add_response_hook(lambda meta: print(meta.url, meta.latency, meta.used_weight))
+
+        """
+        self.response_hooks.append(hook)
+
+    def remove_response_hook(self, hook: Callable[[ResponseMeta], None]):
+        self.response_hooks.remove(hook)
+
+    def _get_response_meta(
+        self, request: "PreparedRequest", status: int, headers: Any, latency: float
+    ) -> Optional[ResponseMeta]:
+        # only parsed when someone is interested
+        if not (request.envelope or self.response_hooks):
+            return None
+        meta = ResponseMeta(request.method, request.uri, status, latency, headers)
+        for hook in self.response_hooks:
+            try:
+                hook(meta)
+            except Exception:
+                logger.exception("response hook %r failed", hook)
+        return meta
+
+    @staticmethod
+    def _get_kline_windows(
+        interval: str,
+        first_valid_ts: int,
+        start_str=None,
+        end_str=None,
+        limit: Optional[int] = None,
+        page_limit: int = 1000,
+    ) -> List[Tuple[int, int]]:
+        """Windows of the kline pages between the start and end of a historical klines call"""
+        timeframe = interval_to_milliseconds(interval)
+        assert timeframe
+        start_ts = convert_ts_str(start_str)
+        start_ts = first_valid_ts if start_ts is None else max(start_ts, first_valid_ts)
+        end_ts = convert_ts_str(end_str) or int(time.time() * 1000)
+        if limit:
+            end_ts = min(end_ts, start_ts + limit * timeframe - 1)
+        return get_kline_windows(start_ts, end_ts, timeframe, page_limit)
+
     def _get_headers(self) -> Dict:
         headers = {
             "Accept": "application/json",
@@ -360,24 +477,34 @@ class BaseClient:
 
     def _hmac_signature(self, query_string: str) -> str:
         assert self.API_SECRET, "API Secret required for private endpoints"
-        m = hmac.new(
-            self.API_SECRET.encode("utf-8"),
-            query_string.encode("utf-8"),
-            hashlib.sha256,
-        )
+        if self._hmac_key != self.API_SECRET:
+            # key the hmac once, each signature continues from a copy of it
+            self._hmac_base = hmac.new(self.API_SECRET.encode("utf-8"), digestmod=hashlib.sha256)
+            self._hmac_key = self.API_SECRET
+        m = self._hmac_base.copy()
+        m.update(query_string.encode("utf-8"))
         return m.hexdigest()
 
-    def _generate_signature(self, data: Dict, uri_encode=True) -> str:
+    @staticmethod
+    def _canonical_query(params: List[Tuple[str, str]]) -> str:
+        return "&".join(
+            f"{key}={_urlencode.quote(value) if key == 'symbol' else value}"
+            for key, value in params
+        )
+
+    def _sign_query(self, query_string: str, uri_encode=True) -> str:
         sig_func = self._hmac_signature
         if self.PRIVATE_KEY:
             if self._is_rsa:
                 sig_func = self._rsa_signature
             else:
                 sig_func = self._ed25519_signature
-        query_string = "&".join([f"{d[0]}={_urlencode.quote(d[1]) if d[0] == 'symbol' else d[1]}" for d in self._order_params(data)])
         res = sig_func(query_string)
         return self.encode_uri_component(res) if uri_encode else res
 
+    def _generate_signature(self, data: Dict, uri_encode=True) -> str:
+        return self._sign_query(self._canonical_query(self._order_params(data)), uri_encode)
+
     def _sign_ws_params(self, params, signature_func):
         if "signature" in params:
             return params
@@ -458,23 +585,32 @@ class BaseClient:
         :return:
 
         """
-        data = dict(filter(lambda el: el[1] is not None, data.items()))
-        has_signature = False
-        params = []
-        for key, value in data.items():
-            if key == "signature":
-                has_signature = True
-            else:
-                params.append((key, str(value)))
-        # sort parameters by key
-        params.sort(key=itemgetter(0))
-        if has_signature:
+        # keys are unique so sorting the pairs sorts by key
+        params = sorted(
+            (key, str(value))
+            for key, value in data.items()
+            if value is not None and key != "signature"
+        )
+        if data.get("signature") is not None:
             params.append(("signature", data["signature"]))
         return params
 
-    def _get_request_kwargs(
-        self, method, signed: bool, force_params: bool = False, **kwargs
-    ) -> Dict:
+    @staticmethod
+    def _copy_request_kwargs(kwargs: Dict) -> Dict:
+        # the request params are consumed when signing, retries start from a fresh copy
+        kwargs = dict(kwargs)
+        if isinstance(kwargs.get("data"), dict):
+            kwargs["data"] = dict(kwargs["data"])
+        return kwargs
+
+    def _prepare_request(
+        self, method, uri: str, signed: bool, force_params: bool = False, **kwargs
+    ) -> "PreparedRequest":
+        """Build the headers, query string and body of a request in a single pass"""
+        headers = {}
+        if method.upper() in ("POST", "PUT", "DELETE"):
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
         # set default requests timeout
         kwargs["timeout"] = self.REQUEST_TIMEOUT
 
@@ -482,50 +618,47 @@ class BaseClient:
         if self._requests_params:
             kwargs.update(self._requests_params)
 
-        data = kwargs.get("data", None)
-        if data and isinstance(data, dict):
-            kwargs["data"] = data
-            # find any requests params passed and apply them
-            if "requests_params" in kwargs["data"]:
-                # merge requests params into kwargs
-                kwargs.update(kwargs["data"]["requests_params"])
-                del kwargs["data"]["requests_params"]
+        data = kwargs.pop("data", None)
+        if signed and data is None:
+            data = {}
+        if not isinstance(data, dict):
+            return PreparedRequest(method, uri, None, data, headers, kwargs)
+
+        # headers, requests params and envelope passed with the call are not request params
+        if "headers" in data:
+            headers.update(data.pop("headers"))
+        if "requests_params" in data:
+            kwargs.update(data.pop("requests_params"))
+        envelope = bool(data.pop("envelope", False))
 
         if signed:
-            # generate signature
-            kwargs["data"]["timestamp"] = int(
-                time.time() * 1000 + self.timestamp_offset
-            )
+            data["timestamp"] = int(time.time() * 1000 + self.timestamp_offset)
             if self.REQUEST_RECVWINDOW:
-                kwargs["data"]["recvWindow"] = self.REQUEST_RECVWINDOW
-            kwargs["data"]["signature"] = self._generate_signature(kwargs["data"])
-
-        # sort get and post params to match signature order
-        if data:
-            # sort post params and remove any arguments with values of None
-            kwargs["data"] = self._order_params(kwargs["data"])
-            # Remove any arguments with values of None.
-            null_args = [
-                i for i, (key, value) in enumerate(kwargs["data"]) if value is None
-            ]
-            for i in reversed(null_args):
-                del kwargs["data"][i]
-
-        # if get request assign data array to params value for requests lib
-        if data and (method == "get" or force_params):
-            kwargs["params"] = "&".join(
-                "%s=%s" % (data[0], data[1]) for data in kwargs["data"]
-            )
-            del kwargs["data"]
-
-        # Temporary fix for Signature issue while using batchOrders in AsyncClient
-        if "params" in kwargs.keys():
-            if (
-                "batchOrders" in kwargs["params"]
-                or "orderidlist" in kwargs["params"]
-                or "origclientorderidlist" in kwargs["params"]
-            ):
-                kwargs["data"] = kwargs["params"]
-                del kwargs["params"]
-
-        return kwargs
+                data["recvWindow"] = self.REQUEST_RECVWINDOW
+            data.pop("signature", None)
+
+        if not data:
+            return PreparedRequest(method, uri, None, None, headers, kwargs, envelope=envelope)
+
+        # sort the params and drop None values once, the signature and the
+        # query string are both built from the same canonical string
+        params = self._order_params(data)
+        query_string = self._canonical_query(params)
+        signature = self._sign_query(query_string) if signed else None
+        if signature:
+            query_string = f"{query_string}&signature={signature}"
+
+        if method == "get" or force_params:
+            # Temporary fix for Signature issue while using batchOrders in AsyncClient
+            if any(key in self.BODY_PARAMS for key, _ in params):
+                return PreparedRequest(method, uri, None, query_string, headers, kwargs, envelope=envelope)
+            return PreparedRequest(method, uri, query_string, None, headers, kwargs, envelope=envelope)
+
+        if all(_URL_SAFE_VALUE.match(value) for _, value in params):
+            # nothing to encode, the body is the query string
+            return PreparedRequest(method, uri, None, query_string, headers, kwargs, envelope=envelope)
+        # the signature is already uri encoded, append it as is
+        body = urlencode(params)
+        if signature:
+            body = f"{body}&signature={signature}"
+        return PreparedRequest(method, uri, None, body, headers, kwargs, envelope=envelope)
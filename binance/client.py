@@ -2,15 +2,24 @@ from pathlib import Path
 from typing import Dict, Optional, List, Union, Any
 
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlencode, quote
 
 from .base_client import BaseClient
+from .rate_limit import CircuitBreaker, RateLimiter
+from .klines import KLINES_LIST, check_output_format, format_klines
+from .kline_cache import EarliestTimestampCache
+from .response import ApiResponse
 
 from .helpers import (
     convert_list_to_json_array,
     interval_to_milliseconds,
     convert_ts_str,
+    merge_kline_pages,
 )
 from .exceptions import (
     BinanceAPIException,
@@ -34,7 +43,14 @@ class Client(BaseClient):
         private_key_pass: Optional[str] = None,
         ping: Optional[bool] = True,
         time_unit: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        adapter_params: Optional[Dict[str, Any]] = None,
+        earliest_timestamp_cache: Optional[EarliestTimestampCache] = None,
     ):
+        # the last response is kept per thread so one client can be shared by a thread pool
+        self._local = threading.local()
+        self._adapter_params = adapter_params
         super().__init__(
             api_key,
             api_secret,
@@ -46,49 +62,94 @@ class Client(BaseClient):
             private_key,
             private_key_pass,
             time_unit=time_unit,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            earliest_timestamp_cache=earliest_timestamp_cache,
         )
 
         # init DNS and SSL cert
         if ping:
             self.ping()
 
+    @property
+    def response(self) -> Optional[requests.Response]:
+        """Last response received by the current thread"""
+        return getattr(self._local, "response", None)
+
+    @response.setter
+    def response(self, response: Optional[requests.Response]):
+        self._local.response = response
+
     def _init_session(self) -> requests.Session:
         headers = self._get_headers()
 
         session = requests.session()
         session.headers.update(headers)
+        if self._adapter_params is not None:
+            adapter_params = dict(self._adapter_params)
+            if "max_retries" not in adapter_params:
+                adapter_params["max_retries"] = self._get_default_retry()
+            # one pool of pool_maxsize connections is kept per host
+            session.mount("https://", HTTPAdapter(**adapter_params))
         return session
 
+    @staticmethod
+    def _get_default_retry() -> Retry:
+        # only GET requests are idempotent, failed orders must not be sent twice
+        return Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+
     def _request(
         self, method, uri: str, signed: bool, force_params: bool = False, **kwargs
     ):
-        headers = {}
-        if method.upper() in ["POST", "PUT", "DELETE"]:
-            headers.update({"Content-Type": "application/x-www-form-urlencoded"})
-
-        if "data" in kwargs:
-            for key in kwargs["data"]:
-                if key == "headers":
-                    headers.update(kwargs["data"][key])
-                    del kwargs["data"][key]
-                    break
-
-        kwargs = self._get_request_kwargs(method, signed, force_params, **kwargs)
-
-        data = kwargs.get("data")
-        if data is not None:
-            del kwargs["data"]
-
-        if signed and self.PRIVATE_KEY and data: # handle issues with signing using eddsa/rsa and POST requests
-            dict_data = Client.convert_to_dict(data)
-            signature = dict_data["signature"] if "signature" in dict_data else  None
-            if signature:
-                del dict_data["signature"]
-            url_encoded_data = urlencode(dict_data)
-            data = f"{url_encoded_data}&signature={signature}"
-
-        self.response = getattr(self.session, method)(uri, headers=headers, data=data, **kwargs)
-        return self._handle_response(self.response)
+        if not self.circuit_breaker:
+            return self._send_request(method, uri, signed, force_params, **kwargs)
+
+        attempt = 0
+        while True:
+            self.circuit_breaker.wait(uri)
+            try:
+                return self._send_request(
+                    method, uri, signed, force_params, **self._copy_request_kwargs(kwargs)
+                )
+            except BinanceAPIException as e:
+                delay = self.circuit_breaker.get_retry_delay(method, e.status_code, attempt)
+                if delay is None:
+                    raise
+            attempt += 1
+            time.sleep(delay)
+
+    def _send_request(
+        self, method, uri: str, signed: bool, force_params: bool = False, **kwargs
+    ):
+        if self.rate_limiter:
+            # wait before signing so the timestamp stays within recvWindow
+            self.rate_limiter.acquire(method, uri, kwargs.get("data"))
+
+        request = self._prepare_request(method, uri, signed, force_params, **kwargs)
+        start = time.perf_counter()
+        response = self.response = getattr(self.session, method)(
+            uri,
+            params=request.query_string,
+            headers=request.headers,
+            data=request.body,
+            **request.kwargs,
+        )
+        latency = time.perf_counter() - start
+        if self.rate_limiter:
+            self.rate_limiter.update_from_headers(uri, response.headers)
+        if self.circuit_breaker:
+            self.circuit_breaker.record(uri, response.status_code, response.headers)
+        meta = self._get_response_meta(request, response.status_code, response.headers, latency)
+        data = self._handle_response(response)
+        if request.envelope:
+            return ApiResponse(data, meta)
+        return data
 
     @staticmethod
     def _handle_response(response: requests.Response):
@@ -821,6 +882,9 @@ class Client(BaseClient):
         :return: first valid timestamp
 
         """
+        timestamp = self.earliest_timestamp_cache.get(symbol, interval, klines_type)
+        if timestamp is not None:
+            return timestamp
         kline = self._klines(
             klines_type=klines_type,
             symbol=symbol,
@@ -829,7 +893,9 @@ class Client(BaseClient):
             startTime=0,
             endTime=int(time.time() * 1000),
         )
-        return kline[0][0]
+        timestamp = kline[0][0]
+        self.earliest_timestamp_cache.set(symbol, interval, klines_type, timestamp)
+        return timestamp
 
     def get_historical_klines(
         self,
@@ -839,6 +905,7 @@ class Client(BaseClient):
         end_str=None,
         limit=None,
         klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+        output_format: str = KLINES_LIST,
     ):
         """Get Historical Klines from Binance
 
@@ -865,11 +932,14 @@ class Client(BaseClient):
         :type limit: int
         :param klines_type: Historical klines type: SPOT or FUTURES
         :type klines_type: HistoricalKlinesType
+        :param output_format: "list", or "columns", "numpy" and "pandas" for numeric columns, see binance.klines
+        :type output_format: str
 
         :return: list of OHLCV values (Open time, Open, High, Low, Close, Volume, Close time, Quote asset volume, Number of trades, Taker buy base asset volume, Taker buy quote asset volume, Ignore)
 
         """
-        return self._historical_klines(
+        check_output_format(output_format)
+        klines = self._historical_klines(
             symbol,
             interval,
             start_str=start_str,
@@ -877,6 +947,71 @@ class Client(BaseClient):
             limit=limit,
             klines_type=klines_type,
         )
+        return format_klines(klines, output_format)
+
+    def get_historical_klines_parallel(
+        self,
+        symbol,
+        interval,
+        start_str=None,
+        end_str=None,
+        limit=None,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+        concurrency: int = 4,
+        page_limit: int = 1000,
+        output_format: str = KLINES_LIST,
+    ):
+        """Get Historical Klines from Binance, fetching pages concurrently
+
+        Kline open times are evenly spaced, so the range is split into the windows of each page up front
+        and the pages are requested ``concurrency`` at a time, from a thread pool for the Client. Pass a
+        ``RateLimiter`` to the client to keep the download within a request weight budget.
+        Monthly klines are not evenly spaced and are fetched page by page.
+
+        :param symbol: Name of symbol pair e.g. BNBBTC
+        :type symbol: str
+        :param interval: Binance Kline interval
+        :type interval: str
+        :param start_str: optional - start date string in UTC format or timestamp in milliseconds, defaults to the first kline
+        :type start_str: str|int
+        :param end_str: optional - end date string in UTC format or timestamp in milliseconds (default will fetch everything up to now)
+        :type end_str: str|int
+        :param limit: optional - maximum number of klines
+        :type limit: int
+        :param klines_type: Historical klines type: SPOT or FUTURES
+        :type klines_type: HistoricalKlinesType
+        :param concurrency: pages requested at the same time
+        :type concurrency: int
+        :param page_limit: klines per request, max 1000 for spot and 1500 for futures
+        :type page_limit: int
+        :param output_format: "list", or "columns", "numpy" and "pandas" for numeric columns, see binance.klines
+        :type output_format: str
+
+        :return: list of OHLCV values (Open time, Open, High, Low, Close, Volume, Close time, Quote asset volume, Number of trades, Taker buy base asset volume, Taker buy quote asset volume, Ignore)
+
+        """
+        check_output_format(output_format)
+        if interval_to_milliseconds(interval) is None:
+            return format_klines(
+                self._historical_klines(symbol, interval, start_str, end_str, limit, klines_type),
+                output_format,
+            )
+        first_valid_ts = self._get_earliest_valid_timestamp(symbol, interval, klines_type)
+        windows = self._get_kline_windows(interval, first_valid_ts, start_str, end_str, limit, page_limit)
+
+        def fetch(window):
+            return self._klines(
+                klines_type=klines_type,
+                symbol=symbol,
+                interval=interval,
+                limit=page_limit,
+                startTime=window[0],
+                endTime=window[1],
+            )
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            output_data = merge_kline_pages(executor.map(fetch, windows))
+        return format_klines(output_data[:limit] if limit else output_data, output_format)
 
     def _historical_klines(
         self,
@@ -970,9 +1105,9 @@ class Client(BaseClient):
             if end_ts and start_ts >= end_ts:
                 break
 
-            # sleep after every 3rd call to be kind to the API
+            # sleep after every 3rd call to be kind to the API, unless a rate limiter paces the calls
             idx += 1
-            if idx % 3 == 0:
+            if idx % 3 == 0 and not self.rate_limiter:
                 time.sleep(1)
 
         return output_data
@@ -1104,9 +1239,9 @@ class Client(BaseClient):
             if end_ts and start_ts >= end_ts:
                 break
 
-            # sleep after every 3rd call to be kind to the API
+            # sleep after every 3rd call to be kind to the API, unless a rate limiter paces the calls
             idx += 1
-            if idx % 3 == 0:
+            if idx % 3 == 0 and not self.rate_limiter:
                 time.sleep(1)
 
     def get_avg_price(self, **params):
@@ -0,0 +1,200 @@
+"""Keep the timestamp offset of a client in line with the server clock
+
+Signed requests carry ``timestamp = local time + timestamp_offset`` and are rejected with
+-1021 when it falls outside ``recvWindow``. ``ClockSync`` samples the server time, takes the
+median of the round trip compensated offsets and refreshes it periodically. Between syncs it
+estimates the offset from the ``Date`` header of regular responses, which costs no request
+weight. Each header bounds the offset to a window of one second plus the round trip, the
+windows of successive responses are intersected, and an offset outside them is moved to the
+nearest bound. Only an error larger than ``drift_tolerance`` triggers an early resync.
+"""
+
+import asyncio
+import logging
+import statistics
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from .response import ResponseMeta
+
+logger = logging.getLogger(__name__)
+
+
+class ClockSync:
+    """Sample the server time and update ``client.timestamp_offset``
+
+    :param client: Client or AsyncClient to keep in sync
+    :param interval: seconds between syncs
+    :type interval: float
+    :param samples: server time requests per sync, each has a weight of 1
+    :type samples: int
+    :param drift_tolerance: milliseconds the offset may be off by the Date headers before an early resync,
+        smaller errors are corrected from the headers alone
+    :type drift_tolerance: int
+
+    .. code:: python
+
+        clock = ClockSync(client, interval=300)
+        clock.start()  # or await clock.start_async() for the AsyncClient
+        ...
+        clock.stop()  # or await clock.stop_async()
+
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        interval: float = 300,
+        samples: int = 5,
+        drift_tolerance: int = 1000,
+    ):
+        self.client = client
+        self.interval = interval
+        self.samples = samples
+        self.drift_tolerance = drift_tolerance
+        # round trip of the best sample of the last sync, in milliseconds
+        self.rtt: Optional[float] = None
+        self.last_sync: Optional[float] = None
+        # (low, high) offsets consistent with the Date headers since the last sync
+        self.header_bounds: Optional[Tuple[float, float]] = None
+        self._bounds_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._wakeup_thread = threading.Event()
+        self._wakeup_task: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def _sample(sent: float, server_time: int, received: float) -> Tuple[float, float]:
+        # assume the server stamped its time halfway through the round trip
+        sent_ms = sent * 1000
+        received_ms = received * 1000
+        return server_time - (sent_ms + received_ms) / 2, received_ms - sent_ms
+
+    def _apply(self, samples: List[Tuple[float, float]]) -> int:
+        offset = int(statistics.median(offset for offset, _ in samples))
+        # a single int assignment, signing threads see either the old or the new offset
+        self.client.timestamp_offset = offset
+        self.rtt = min(rtt for _, rtt in samples)
+        self.last_sync = time.monotonic()
+        self.header_bounds = None
+        logger.debug("timestamp offset %sms, rtt %.1fms", offset, self.rtt)
+        return offset
+
+    def sync(self) -> int:
+        """Sample the server time with a Client and return the new offset"""
+        samples = []
+        for _ in range(self.samples):
+            sent = time.time()
+            res = self.client.get_server_time()
+            samples.append(self._sample(sent, res["serverTime"], time.time()))
+        return self._apply(samples)
+
+    async def sync_async(self) -> int:
+        """Sample the server time with an AsyncClient and return the new offset"""
+        samples = []
+        for _ in range(self.samples):
+            sent = time.time()
+            res = await self.client.get_server_time()
+            samples.append(self._sample(sent, res["serverTime"], time.time()))
+        return self._apply(samples)
+
+    @staticmethod
+    def _header_bounds(meta: ResponseMeta) -> Tuple[float, float]:
+        # the server stamped a time in [Date, Date + 1s) somewhere between sending and receiving
+        sent = meta.received_at - meta.latency * 1000
+        return meta.server_time - meta.received_at, meta.server_time + 1000 - sent
+
+    def observe(self, meta: ResponseMeta):
+        """Response hook estimating the offset from the Date header of a response"""
+        if meta.server_time is None:
+            return
+        low, high = self._header_bounds(meta)
+        with self._bounds_lock:
+            if self.header_bounds:
+                low, high = max(low, self.header_bounds[0]), min(high, self.header_bounds[1])
+                if low > high:
+                    # one of the clocks jumped, start over from this response
+                    low, high = self._header_bounds(meta)
+            self.header_bounds = (low, high)
+        offset = self.client.timestamp_offset
+        if low <= offset <= high:
+            return
+        estimate = int(min(max(offset, low), high))
+        self.client.timestamp_offset = estimate
+        error = abs(estimate - offset)
+        logger.debug("timestamp offset %sms corrected by %sms from %s", estimate, estimate - offset, meta.url)
+        if error > self.drift_tolerance:
+            logger.info("clock drift of %sms detected from %s, resyncing", error, meta.url)
+            self.request_resync()
+
+    def request_resync(self):
+        """Sync again without waiting for the interval"""
+        self._wakeup_thread.set()
+        if self._wakeup_task:
+            self._wakeup_task.set()
+
+    def start(self):
+        """Sync a Client now and then every ``interval`` seconds from a daemon thread"""
+        self.sync()
+        self._stopped.clear()
+        self.client.add_response_hook(self.observe)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup_thread.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._remove_hook()
+
+    def _run(self):
+        while True:
+            self._wakeup_thread.wait(self.interval)
+            self._wakeup_thread.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("clock sync failed")
+
+    async def start_async(self):
+        """Sync an AsyncClient now and then every ``interval`` seconds from a task"""
+        await self.sync_async()
+        self._wakeup_task = asyncio.Event()
+        self.client.add_response_hook(self.observe)
+        self._task = asyncio.ensure_future(self._run_async())
+
+    async def stop_async(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup_task = None
+        self._remove_hook()
+
+    async def _run_async(self):
+        assert self._wakeup_task
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup_task.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup_task.clear()
+            try:
+                await self.sync_async()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("clock sync failed")
+
+    def _remove_hook(self):
+        if self.observe in self.client.response_hooks:
+            self.client.remove_response_hook(self.observe)
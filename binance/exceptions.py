@@ -85,6 +85,10 @@ class ReadLoopClosed(Exception):
     """Raised when trying to read from read loop but already closed"""
     pass
 
+class BinanceDepthCacheOutOfSync(Exception):
+    """Raised when new order book snapshots keep lagging the depth stream."""
+    pass
+
 class NotImplementedException(Exception):
     def __init__(self, value):
         message = f"Not implemented: {value}"
@@ -93,3 +97,25 @@ class NotImplementedException(Exception):
 
 class UnknownDateFormat(Exception):
     ...
+
+
+class BinanceRateLimitExceeded(Exception):
+    """Raised by the RateLimiter when a request would exceed a rate limit."""
+
+    def __init__(self, family, retry_after):
+        self.family = family
+        self.retry_after = retry_after
+        super().__init__(
+            f"{family} rate limit reached, retry after {retry_after:.3f}s"
+        )
+
+
+class BinanceCircuitBreakerOpen(Exception):
+    """Raised by the CircuitBreaker when requests are paused for longer than it may wait."""
+
+    def __init__(self, family, retry_after):
+        self.family = family
+        self.retry_after = retry_after
+        super().__init__(
+            f"{family} requests paused after a 429/418 response, retry after {retry_after:.3f}s"
+        )
@@ -0,0 +1,159 @@
+"""Hedged requests for latency critical market data
+
+A hedged request sends a second copy of a public GET when the first has not returned
+within the usual latency of its endpoint, and uses whichever response arrives first.
+Spot hedges on binance.com go to another of the ``api1`` to ``api4`` hosts. Hedges cost request weight,
+so they are paid from a budget earned as a fraction of the weight of regular requests and
+are charged to the rate limiter of the client when one is set.
+"""
+
+import itertools
+import re
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+from .rate_limit import ENDPOINT_WEIGHTS, get_api_family, get_endpoint_weight
+
+DEFAULT_HEDGED_ENDPOINTS = frozenset(
+    {
+        "GET /api/v3/depth",
+        "GET /api/v3/ticker/price",
+        "GET /fapi/v1/depth",
+    }
+)
+
+# only binance.com has the api1 to api4 hosts, other tlds, testnet and demo are hedged to the same host
+_SPOT_HOST = re.compile(r"^https://api\d?\.binance\.com/")
+
+
+class HedgingPolicy:
+    """When and where the AsyncClient sends a hedged request
+
+    :param endpoints: requests to hedge, keyed like "GET /api/v3/depth"
+    :type endpoints: iterable
+    :param delay: optional - fixed seconds to wait before hedging, defaults to the ``quantile`` of recent latencies
+    :type delay: float
+    :param quantile: latency quantile of an endpoint after which a request is hedged
+    :type quantile: float
+    :param min_delay: lower bound of the learned delay in seconds
+    :type min_delay: float
+    :param max_delay: upper bound of the learned delay, used until ``min_samples`` latencies are known
+    :type max_delay: float
+    :param min_samples: latencies needed before the delay is learned
+    :type min_samples: int
+    :param window: latencies kept per endpoint
+    :type window: int
+    :param budget: weight earned for hedges per weight of hedged endpoint requests, 0.1 allows about 10% more weight
+    :type budget: float
+    :param max_tokens: most weight saved up for hedges, the budget starts full to cover startup bursts
+    :type max_tokens: float
+    :param hosts: base endpoints spot hedges rotate through, empty to hedge to the same host
+    :type hosts: iterable
+
+    .. code:: python
+
+        policy = HedgingPolicy(quantile=0.95, budget=0.1)
+        client = await AsyncClient.create(hedging_policy=policy, rate_limiter=RateLimiter())
+        depth = await client.get_order_book(symbol="BTCUSDT", limit=100)
+
+    """
+
+    def __init__(
+        self,
+        endpoints: Iterable[str] = DEFAULT_HEDGED_ENDPOINTS,
+        delay: Optional[float] = None,
+        quantile: float = 0.95,
+        min_delay: float = 0.02,
+        max_delay: float = 0.5,
+        min_samples: int = 20,
+        window: int = 200,
+        budget: float = 0.1,
+        max_tokens: float = 100,
+        hosts: Iterable[str] = ("1", "2", "3", "4"),
+    ):
+        self.endpoints = frozenset(endpoints)
+        self.delay = delay
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.budget = budget
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.hosts = tuple(hosts)
+        self._hosts = itertools.cycle(self.hosts) if self.hosts else None
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def get_key(self, method: str, uri: str) -> Optional[str]:
+        """Return the endpoint key of a request if it is hedged"""
+        key = f"{method.upper()} {get_api_family(uri)[1]}"
+        if key in self.endpoints:
+            return key
+        return None
+
+    def get_weight(self, key: str, params: Optional[Dict] = None) -> int:
+        method, path = key.split(" ", 1)
+        return get_endpoint_weight(method, path, params, ENDPOINT_WEIGHTS)
+
+    def get_delay(self, key: str) -> float:
+        """Seconds to wait for the first response before hedging"""
+        if self.delay is not None:
+            return self.delay
+        latencies = self._latencies.get(key)
+        if not latencies or len(latencies) < self.min_samples:
+            return self.max_delay
+        ordered = sorted(latencies)
+        value = ordered[int(self.quantile * (len(ordered) - 1))]
+        return min(max(value, self.min_delay), self.max_delay)
+
+    def record(self, key: str, latency: float, hedged: bool = False, hedge_won: bool = False):
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None:
+                latencies = self._latencies[key] = deque(maxlen=self.window)
+            latencies.append(latency)
+            self.requests += 1
+            self.hedges += hedged
+            self.hedge_wins += hedge_won
+
+    def earn(self, weight: int):
+        """Credit the budget for a request to a hedged endpoint"""
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + weight * self.budget)
+
+    def spend(self, weight: int) -> bool:
+        """Take the weight of a hedge from the budget, False when it is spent"""
+        with self._lock:
+            if self.tokens < weight:
+                return False
+            self.tokens -= weight
+            return True
+
+    def refund(self, weight: int):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + weight)
+
+    def get_hedge_uri(self, uri: str) -> str:
+        """Uri of the hedge, spot requests go to the next of ``hosts`` other than the one of the first request"""
+        match = _SPOT_HOST.match(uri)
+        if not match or not self._hosts:
+            return uri
+        for _ in range(len(self.hosts)):
+            host = f"https://api{next(self._hosts)}.binance.com/"
+            if host != match.group(0):
+                return host + uri[match.end():]
+        return uri
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "tokens": self.tokens,
+        }
@@ -1,7 +1,7 @@
 import asyncio
 from decimal import Decimal
 import json
-from typing import Union, Optional, Dict
+from typing import Any, Callable, Iterable, List, Tuple, Union, Optional, Dict
 
 import dateparser
 import pytz
@@ -10,6 +10,16 @@ from datetime import datetime, timezone
 
 from binance.exceptions import UnknownDateFormat
 
+# load orjson if available, otherwise default to json
+orjson = None
+try:
+    import orjson as orjson
+except ImportError:
+    pass
+
+# decodes str or bytes, shared by the websockets and their typed event decoders
+json_loads: Callable[[Union[str, bytes]], Any] = orjson.loads if orjson else json.loads
+
 
 def date_to_milliseconds(date_str: str) -> int:
     """Convert UTC date to milliseconds
@@ -59,6 +69,40 @@ def interval_to_milliseconds(interval: str) -> Optional[int]:
         return None
 
 
+def get_kline_windows(
+    start_ts: int, end_ts: int, interval_ms: int, limit: int
+) -> List[Tuple[int, int]]:
+    """Split a time range into the windows of consecutive kline pages
+
+    Kline open times are ``interval_ms`` apart, so a window of ``limit * interval_ms`` milliseconds
+    holds at most ``limit`` klines and every window can be fetched independently.
+
+    :param start_ts: first open time in milliseconds
+    :param end_ts: last open time in milliseconds, inclusive
+    :param interval_ms: interval in milliseconds, see interval_to_milliseconds
+    :param limit: klines per page
+
+    :return: list of (startTime, endTime) tuples
+    """
+    step = interval_ms * limit
+    return [(ts, min(ts + step - 1, end_ts)) for ts in range(start_ts, end_ts + 1, step)]
+
+
+def merge_kline_pages(pages: Iterable[List]) -> List:
+    """Concatenate pages of klines in order, dropping klines repeated at page boundaries"""
+    output: List = []
+    for page in pages:
+        if output and page:
+            last_open_time = output[-1][0]
+            skip = 0
+            while skip < len(page) and page[skip][0] <= last_open_time:
+                skip += 1
+            output.extend(page[skip:])
+        else:
+            output.extend(page)
+    return output
+
+
 def round_step_size(
     quantity: Union[float, Decimal], step_size: Union[float, Decimal]
 ) -> float:
@@ -0,0 +1,432 @@
+"""Klines and first kline open times cached on disk in SQLite
+
+``CachedKlineStore`` keeps the klines of every symbol, interval and kline type it has fetched
+in a SQLite database, together with the time ranges known to be complete. A request is served
+from disk and only the missing gaps, usually the tail since the last stored kline, are
+fetched with ``Client._klines``. The kline still open is returned but never stored, so it is
+fetched again until it closes.
+
+The database runs in WAL mode and every thread opens its own connection, so any number of
+threads and processes can read while one of them writes. With an ``AsyncClient`` use the
+``_async`` methods, the database is still read and written from the event loop thread.
+
+``EarliestTimestampCache`` keeps the open time of the first kline of each symbol, which the
+historical klines calls otherwise request before every download, in memory and optionally
+in the same kind of database.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .enums import HistoricalKlinesType
+from .helpers import convert_ts_str, interval_to_milliseconds
+from .klines import KLINES_LIST, check_output_format, format_klines
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS klines (
+    klines_type INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    open_time INTEGER NOT NULL,
+    open TEXT,
+    high TEXT,
+    low TEXT,
+    close TEXT,
+    volume TEXT,
+    close_time INTEGER,
+    quote_volume TEXT,
+    trades INTEGER,
+    taker_buy_base_volume TEXT,
+    taker_buy_quote_volume TEXT,
+    ignore TEXT,
+    PRIMARY KEY (klines_type, symbol, interval, open_time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    klines_type INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    first_open_time INTEGER NOT NULL,
+    last_open_time INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_series ON coverage (klines_type, symbol, interval, first_open_time);
+"""
+
+_EARLIEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS earliest_timestamps (
+    klines_type INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    open_time INTEGER NOT NULL,
+    PRIMARY KEY (klines_type, symbol, interval)
+) WITHOUT ROWID;
+"""
+
+
+class EarliestTimestampCache:
+    """Open time of the first kline of each symbol, interval and kline type
+
+    Every client keeps one in memory by default. Pass the same cache to several clients of the
+    same environment, sync or async, to share it, and a path to keep it between runs. The path
+    is a SQLite database, which may be the file of a CachedKlineStore, written one row at a time
+    so processes sharing it do not overwrite each other's timestamps.
+
+    :param path: optional - SQLite database the timestamps are loaded from and saved to
+    :type path: str|Path
+
+    .. code:: python
+
+        cache = EarliestTimestampCache("klines.sqlite3")
+        client = Client(api_key, api_secret, earliest_timestamp_cache=cache)
+        async_client = await AsyncClient.create(api_key, api_secret, earliest_timestamp_cache=cache)
+
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = str(path) if path else None
+        self._timestamps: Dict[Tuple[int, str, str], int] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.path:
+            # one connection shared by all threads, every use holds the lock
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            with self._conn:
+                self._conn.executescript(_EARLIEST_SCHEMA)
+            rows = self._conn.execute("SELECT klines_type, symbol, interval, open_time FROM earliest_timestamps")
+            self._timestamps = {(row[0], row[1], row[2]): row[3] for row in rows}
+
+    @staticmethod
+    def _key(symbol: str, interval: str, klines_type: HistoricalKlinesType) -> Tuple[int, str, str]:
+        # the first open time is aligned to the interval, e.g. the start of the day for 1d klines
+        return klines_type.value, symbol, interval
+
+    def get(self, symbol: str, interval: str, klines_type: HistoricalKlinesType) -> Optional[int]:
+        key = self._key(symbol, interval, klines_type)
+        timestamp = self._timestamps.get(key)
+        if timestamp is None and self._conn is not None:
+            # another process may have stored it since the cache was loaded
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT open_time FROM earliest_timestamps WHERE klines_type = ? AND symbol = ? AND interval = ?",
+                    key,
+                ).fetchone()
+            if row:
+                timestamp = self._timestamps[key] = row[0]
+        return timestamp
+
+    def set(self, symbol: str, interval: str, klines_type: HistoricalKlinesType, timestamp: int):
+        key = self._key(symbol, interval, klines_type)
+        with self._lock:
+            self._timestamps[key] = timestamp
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO earliest_timestamps VALUES (?, ?, ?, ?)", (*key, timestamp)
+                    )
+
+    def clear(self):
+        with self._lock:
+            self._timestamps = {}
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM earliest_timestamps")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self):
+        return len(self._timestamps)
+
+
+class CachedKlineStore:
+    """Serve historical klines from a local SQLite cache, fetching only what is missing
+
+    :param client: Client used to fetch the missing klines, or an AsyncClient for the ``_async`` methods
+    :type client: Client|AsyncClient
+    :param path: database file, created if missing
+    :type path: str|Path
+    :param page_limit: klines per request, max 1000 for spot and 1500 for futures
+    :type page_limit: int
+
+    .. code:: python
+
+        store = CachedKlineStore(client, "klines.sqlite3")
+
+        # the first run downloads the year, later runs only the klines closed since
+        klines = store.get_klines("BTCUSDT", Client.KLINE_INTERVAL_1MINUTE, "1 Jan, 2024")
+
+        async_store = CachedKlineStore(async_client, "klines.sqlite3")
+        klines = await async_store.get_klines_async("BTCUSDT", Client.KLINE_INTERVAL_1MINUTE, "1 Jan, 2024")
+
+    """
+
+    def __init__(self, client: Any, path: Union[str, Path] = "klines.sqlite3", page_limit: int = 1000):
+        self.client = client
+        self.path = str(path)
+        self.page_limit = page_limit
+        self._local = threading.local()
+        # every thread's connection, so close() can close them all
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # each thread uses its own connection, a connection from before close() is not reused
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            # close() may run in another thread than the one using the connection
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close the connections of all threads"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_str=None,
+        end_str=None,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+        output_format: str = KLINES_LIST,
+    ):
+        """Get the klines of a range, fetching the parts missing from the cache
+
+        :param symbol: Name of symbol pair e.g. BNBBTC
+        :type symbol: str
+        :param interval: Binance Kline interval, monthly klines are not cached
+        :type interval: str
+        :param start_str: optional - start date string in UTC format or timestamp in milliseconds, defaults to the first kline
+        :type start_str: str|int
+        :param end_str: optional - end date string in UTC format or timestamp in milliseconds (default will fetch everything up to now)
+        :type end_str: str|int
+        :param klines_type: Historical klines type: SPOT or FUTURES
+        :type klines_type: HistoricalKlinesType
+        :param output_format: "list", or "columns", "numpy" and "pandas" for numeric columns, see binance.klines
+        :type output_format: str
+
+        :return: klines as returned by get_historical_klines
+        """
+        check_output_format(output_format)
+        timeframe = interval_to_milliseconds(interval)
+        if timeframe is None:
+            # monthly klines are not evenly spaced
+            klines = self.client._historical_klines(symbol, interval, start_str, end_str, klines_type=klines_type)
+            return format_klines(klines, output_format)
+
+        start_ts, end_ts, last_closed = self._get_range(start_str, end_str, timeframe)
+        open_klines: List[List] = []
+        series = (klines_type.value, symbol, interval)
+        for gap_start, gap_end in self.get_gaps(symbol, interval, start_ts, end_ts, klines_type):
+            klines = self._fetch(series, klines_type, gap_start, gap_end, timeframe)
+            open_klines += self._store_closed(series, klines, gap_start, gap_end, last_closed, timeframe)
+
+        klines = self._read(series, start_ts, end_ts) + open_klines
+        return format_klines(klines, output_format)
+
+    async def get_klines_async(
+        self,
+        symbol: str,
+        interval: str,
+        start_str=None,
+        end_str=None,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+        output_format: str = KLINES_LIST,
+    ):
+        """Same as get_klines, fetching the missing klines with an AsyncClient"""
+        check_output_format(output_format)
+        timeframe = interval_to_milliseconds(interval)
+        if timeframe is None:
+            klines = await self.client._historical_klines(
+                symbol, interval, start_str, end_str, klines_type=klines_type
+            )
+            return format_klines(klines, output_format)
+
+        start_ts, end_ts, last_closed = self._get_range(start_str, end_str, timeframe)
+        open_klines: List[List] = []
+        series = (klines_type.value, symbol, interval)
+        for gap_start, gap_end in self.get_gaps(symbol, interval, start_ts, end_ts, klines_type):
+            klines = await self._fetch_async(series, klines_type, gap_start, gap_end, timeframe)
+            open_klines += self._store_closed(series, klines, gap_start, gap_end, last_closed, timeframe)
+
+        klines = self._read(series, start_ts, end_ts) + open_klines
+        return format_klines(klines, output_format)
+
+    def update(
+        self,
+        symbol: str,
+        interval: str,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+    ) -> int:
+        """Fetch the klines closed since the last cached one
+
+        :return: number of klines stored
+        """
+        before = self.count(symbol, interval, klines_type)
+        self.get_klines(symbol, interval, self._get_update_start(symbol, interval, klines_type), klines_type=klines_type)
+        return self.count(symbol, interval, klines_type) - before
+
+    async def update_async(
+        self,
+        symbol: str,
+        interval: str,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+    ) -> int:
+        """Same as update, fetching the klines with an AsyncClient"""
+        before = self.count(symbol, interval, klines_type)
+        await self.get_klines_async(
+            symbol, interval, self._get_update_start(symbol, interval, klines_type), klines_type=klines_type
+        )
+        return self.count(symbol, interval, klines_type) - before
+
+    def _get_update_start(self, symbol: str, interval: str, klines_type: HistoricalKlinesType) -> Optional[int]:
+        row = self._connection().execute(
+            "SELECT max(last_open_time) FROM coverage WHERE klines_type = ? AND symbol = ? AND interval = ?",
+            (klines_type.value, symbol, interval),
+        ).fetchone()
+        return row[0] + 1 if row[0] is not None else None
+
+    def count(
+        self,
+        symbol: str,
+        interval: str,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+    ) -> int:
+        return self._connection().execute(
+            "SELECT count(*) FROM klines WHERE klines_type = ? AND symbol = ? AND interval = ?",
+            (klines_type.value, symbol, interval),
+        ).fetchone()[0]
+
+    def get_gaps(
+        self,
+        symbol: str,
+        interval: str,
+        start_ts: int,
+        end_ts: int,
+        klines_type: HistoricalKlinesType = HistoricalKlinesType.SPOT,
+    ) -> List[Tuple[int, int]]:
+        """Ranges of open times between start_ts and end_ts missing from the cache"""
+        ranges = self._connection().execute(
+            "SELECT first_open_time, last_open_time FROM coverage WHERE klines_type = ? AND symbol = ?"
+            " AND interval = ? AND last_open_time >= ? AND first_open_time <= ? ORDER BY first_open_time",
+            (klines_type.value, symbol, interval, start_ts, end_ts),
+        ).fetchall()
+        gaps = []
+        cursor = start_ts
+        for start, end in ranges:
+            if start > cursor:
+                gaps.append((cursor, start - 1))
+            cursor = max(cursor, end + 1)
+        if cursor <= end_ts:
+            gaps.append((cursor, end_ts))
+        return gaps
+
+    @staticmethod
+    def _get_range(start_str, end_str, timeframe: int) -> Tuple[int, int, int]:
+        now = int(time.time() * 1000)
+        start_ts = convert_ts_str(start_str) or 0
+        end_ts = min(convert_ts_str(end_str) or now, now)
+        # klines opened after the last closed one are still open
+        return start_ts, end_ts, now - timeframe
+
+    def _store_closed(
+        self, series: Tuple, klines: List[List], start_ts: int, end_ts: int, last_closed: int, timeframe: int
+    ) -> List[List]:
+        """Store the closed klines of a fetched gap and return the open ones"""
+        closed = [kline for kline in klines if kline[0] <= last_closed]
+        self._store(series, closed, start_ts, min(end_ts, last_closed), timeframe)
+        return klines[len(closed):]
+
+    def _fetch(
+        self, series: Tuple, klines_type: HistoricalKlinesType, start_ts: int, end_ts: int, timeframe: int
+    ) -> List[List]:
+        _, symbol, interval = series
+        output_data: List[List] = []
+        while start_ts <= end_ts:
+            klines = self.client._klines(
+                klines_type=klines_type,
+                symbol=symbol,
+                interval=interval,
+                limit=self.page_limit,
+                startTime=start_ts,
+                endTime=end_ts,
+            )
+            output_data += klines
+            if len(klines) < self.page_limit:
+                break
+            start_ts = klines[-1][0] + timeframe
+        return output_data
+
+    async def _fetch_async(
+        self, series: Tuple, klines_type: HistoricalKlinesType, start_ts: int, end_ts: int, timeframe: int
+    ) -> List[List]:
+        _, symbol, interval = series
+        output_data: List[List] = []
+        while start_ts <= end_ts:
+            klines = await self.client._klines(
+                klines_type=klines_type,
+                symbol=symbol,
+                interval=interval,
+                limit=self.page_limit,
+                startTime=start_ts,
+                endTime=end_ts,
+            )
+            output_data += klines
+            if len(klines) < self.page_limit:
+                break
+            start_ts = klines[-1][0] + timeframe
+        return output_data
+
+    def _store(self, series: Tuple, klines: List[List], start_ts: int, end_ts: int, timeframe: int):
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO klines VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*series, *kline[:12]) for kline in klines],
+            )
+            if end_ts < start_ts:
+                return
+            # merge with the overlapping and adjacent ranges
+            overlapping = conn.execute(
+                "SELECT min(first_open_time), max(last_open_time) FROM coverage WHERE klines_type = ?"
+                " AND symbol = ? AND interval = ? AND last_open_time >= ? AND first_open_time <= ?",
+                (*series, start_ts - timeframe, end_ts + timeframe),
+            ).fetchone()
+            if overlapping[0] is not None:
+                start_ts = min(start_ts, overlapping[0])
+                end_ts = max(end_ts, overlapping[1])
+            conn.execute(
+                "DELETE FROM coverage WHERE klines_type = ? AND symbol = ? AND interval = ?"
+                " AND first_open_time >= ? AND last_open_time <= ?",
+                (*series, start_ts, end_ts),
+            )
+            conn.execute("INSERT INTO coverage VALUES (?, ?, ?, ?, ?)", (*series, start_ts, end_ts))
+
+    def _read(self, series: Tuple, start_ts: int, end_ts: int) -> List[List]:
+        rows = self._connection().execute(
+            "SELECT open_time, open, high, low, close, volume, close_time, quote_volume, trades,"
+            " taker_buy_base_volume, taker_buy_quote_volume, ignore FROM klines"
+            " WHERE klines_type = ? AND symbol = ? AND interval = ? AND open_time BETWEEN ? AND ?"
+            " ORDER BY open_time",
+            (*series, start_ts, end_ts),
+        ).fetchall()
+        return [list(row) for row in rows]
@@ -0,0 +1,118 @@
+"""Columnar output for klines
+
+Kline endpoints return one list per kline with the prices and volumes as strings. These
+helpers convert a list of klines to one array per field in a single pass per column,
+as ``array.array`` columns without dependencies, NumPy arrays or a structured array when
+NumPy is installed, or a pandas DataFrame when pandas is installed.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional
+
+np = None
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    pass
+
+pd = None
+try:
+    import pandas as pd  # type: ignore
+except ImportError:
+    pass
+
+KLINES_LIST = "list"
+KLINES_COLUMNS = "columns"
+KLINES_NUMPY = "numpy"
+KLINES_PANDAS = "pandas"
+
+# field name and type of each kline value, the unused last value is dropped
+KLINE_FIELDS = (
+    ("open_time", "int64"),
+    ("open", "float64"),
+    ("high", "float64"),
+    ("low", "float64"),
+    ("close", "float64"),
+    ("volume", "float64"),
+    ("close_time", "int64"),
+    ("quote_volume", "float64"),
+    ("trades", "int64"),
+    ("taker_buy_base_volume", "float64"),
+    ("taker_buy_quote_volume", "float64"),
+)
+
+_ARRAY_TYPECODES = {"int64": "q", "float64": "d"}
+_PARSERS = {"int64": int, "float64": float}
+
+
+def _transpose(klines: List[List]) -> List[tuple]:
+    if not klines:
+        return [() for _ in KLINE_FIELDS]
+    return list(zip(*klines))[: len(KLINE_FIELDS)]
+
+
+def klines_to_columns(klines: List[List], use_numpy: Optional[bool] = None) -> Dict[str, Any]:
+    """Convert klines to one array per field
+
+    :param klines: klines as returned by get_klines or get_historical_klines
+    :param use_numpy: optional - return NumPy arrays, defaults to True when NumPy is installed
+
+    :return: dict of field name to ``numpy.ndarray`` or ``array.array``
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ImportError("NumPy output requires numpy, install it with pip install numpy")
+    columns = _transpose(klines)
+    if use_numpy:
+        # numpy parses the decimal strings of a whole column at once
+        return {name: np.array(column, dtype=dtype) for (name, dtype), column in zip(KLINE_FIELDS, columns)}
+    return {
+        name: array(_ARRAY_TYPECODES[dtype], map(_PARSERS[dtype], column))
+        for (name, dtype), column in zip(KLINE_FIELDS, columns)
+    }
+
+
+def klines_to_numpy(klines: List[List]):
+    """Convert klines to a NumPy structured array with the fields of ``KLINE_FIELDS``"""
+    if np is None:
+        raise ImportError("NumPy output requires numpy, install it with pip install numpy")
+    output = np.empty(len(klines), dtype=list(KLINE_FIELDS))
+    for (name, dtype), column in zip(KLINE_FIELDS, _transpose(klines)):
+        output[name] = np.array(column, dtype=dtype)
+    return output
+
+
+def klines_to_dataframe(klines: List[List]):
+    """Convert klines to a pandas DataFrame, with the open and close times as UTC datetimes"""
+    if pd is None:
+        raise ImportError("DataFrame output requires pandas, install it with pip install pandas")
+    df = pd.DataFrame(klines_to_columns(klines, use_numpy=True))
+    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms", utc=True)
+    df["close_time"] = pd.to_datetime(df["close_time"], unit="ms", utc=True)
+    return df
+
+
+def check_output_format(output_format: str):
+    """Raise before a download when the output format is unknown or its package is missing"""
+    if output_format not in (KLINES_LIST, KLINES_COLUMNS, KLINES_NUMPY, KLINES_PANDAS):
+        raise ValueError(f"unknown klines output format {output_format!r}")
+    if output_format == KLINES_NUMPY and np is None:
+        raise ImportError("NumPy output requires numpy, install it with pip install numpy")
+    if output_format == KLINES_PANDAS and pd is None:
+        raise ImportError("DataFrame output requires pandas, install it with pip install pandas")
+
+
+def format_klines(klines: List[List], output_format: str = KLINES_LIST):
+    """Return klines in one of the output formats
+
+    :param output_format: "list" to keep the klines as returned by the API, "columns", "numpy" or "pandas"
+    """
+    check_output_format(output_format)
+    if output_format == KLINES_COLUMNS:
+        return klines_to_columns(klines)
+    if output_format == KLINES_NUMPY:
+        return klines_to_numpy(klines)
+    if output_format == KLINES_PANDAS:
+        return klines_to_dataframe(klines)
+    return klines
@@ -0,0 +1,556 @@
+"""Client side request weight and order count limiter, and 429/418 circuit breaker
+
+Binance counts request weight per IP and orders per account in fixed windows aligned to
+the wall clock, separately for each API family (api, sapi, fapi, dapi, eapi, papi). The
+``RateLimiter`` keeps the same counters locally, charges each request with the weight of
+its endpoint before it is sent and reconciles with the ``X-MBX-USED-WEIGHT-*``,
+``X-MBX-ORDER-COUNT-*`` and ``X-SAPI-USED-*`` headers of every response. Share one
+limiter between clients to keep several workers under the same allowance.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from .exceptions import BinanceCircuitBreakerOpen, BinanceRateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+
+def spot_order_book_weight(limit: int) -> int:
+    """Request weight of a spot GET /api/v3/depth call"""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+def futures_order_book_weight(limit: int) -> int:
+    """Request weight of a futures GET /fapi/v1/depth or /dapi/v1/depth call"""
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def futures_klines_weight(limit: int) -> int:
+    """Request weight of a futures klines call"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def _limit_weight(func: Callable[[int], int], default: int) -> Callable[[Dict], int]:
+    def weight(params: Dict) -> int:
+        return func(int(params.get("limit", default)))
+
+    return weight
+
+
+def _symbol_weight(single: int, many: int) -> Callable[[Dict], int]:
+    def weight(params: Dict) -> int:
+        return single if params.get("symbol") else many
+
+    return weight
+
+
+def _ticker_weight(single: int, many: int) -> Callable[[Dict], int]:
+    def weight(params: Dict) -> int:
+        if params.get("symbol"):
+            return single
+        symbols = params.get("symbols")
+        if symbols:
+            count = len(json.loads(symbols)) if isinstance(symbols, str) else len(symbols)
+            if count <= 20:
+                return single
+            if count <= 100:
+                return many // 2
+        return many
+
+    return weight
+
+
+# weight of an endpoint, either an int or a function of the request params,
+# endpoints missing from the table weigh 1
+ENDPOINT_WEIGHTS: Dict[str, Union[int, Callable[[Dict], int]]] = {
+    "GET /api/v3/depth": _limit_weight(spot_order_book_weight, 100),
+    "GET /api/v3/trades": 25,
+    "GET /api/v3/historicalTrades": 25,
+    "GET /api/v3/aggTrades": 4,
+    "GET /api/v3/klines": 2,
+    "GET /api/v3/uiKlines": 2,
+    "GET /api/v3/avgPrice": 2,
+    "GET /api/v3/exchangeInfo": 20,
+    "GET /api/v3/ticker/24hr": _ticker_weight(2, 80),
+    "GET /api/v3/ticker/price": _symbol_weight(2, 4),
+    "GET /api/v3/ticker/bookTicker": _symbol_weight(2, 4),
+    "GET /api/v3/ticker": _ticker_weight(4, 200),
+    "GET /api/v3/account": 20,
+    "GET /api/v3/order": 4,
+    "GET /api/v3/openOrders": _symbol_weight(6, 80),
+    "GET /api/v3/allOrders": 20,
+    "GET /api/v3/myTrades": 20,
+    "GET /api/v3/rateLimit/order": 40,
+    "POST /api/v3/order/test": 1,
+    "GET /fapi/v1/depth": _limit_weight(futures_order_book_weight, 500),
+    "GET /fapi/v1/klines": _limit_weight(futures_klines_weight, 500),
+    "GET /fapi/v1/continuousKlines": _limit_weight(futures_klines_weight, 500),
+    "GET /fapi/v1/indexPriceKlines": _limit_weight(futures_klines_weight, 500),
+    "GET /fapi/v1/markPriceKlines": _limit_weight(futures_klines_weight, 500),
+    "GET /fapi/v1/trades": 5,
+    "GET /fapi/v1/historicalTrades": 20,
+    "GET /fapi/v1/aggTrades": 20,
+    "GET /fapi/v1/premiumIndex": _symbol_weight(1, 10),
+    "GET /fapi/v1/ticker/24hr": _symbol_weight(1, 40),
+    "GET /fapi/v1/ticker/price": _symbol_weight(1, 2),
+    "GET /fapi/v2/ticker/price": _symbol_weight(1, 2),
+    "GET /fapi/v1/ticker/bookTicker": _symbol_weight(2, 5),
+    "GET /fapi/v1/openOrders": _symbol_weight(1, 40),
+    "GET /fapi/v1/allOrders": 5,
+    "GET /fapi/v1/userTrades": 5,
+    "GET /fapi/v2/account": 5,
+    "GET /fapi/v3/account": 5,
+    "GET /fapi/v2/balance": 5,
+    "GET /fapi/v3/balance": 5,
+    "GET /fapi/v2/positionRisk": 5,
+    "GET /fapi/v3/positionRisk": 5,
+    "GET /fapi/v1/income": 30,
+    "GET /dapi/v1/depth": _limit_weight(futures_order_book_weight, 500),
+    "GET /dapi/v1/klines": _limit_weight(futures_klines_weight, 500),
+    "GET /dapi/v1/continuousKlines": _limit_weight(futures_klines_weight, 500),
+    "GET /dapi/v1/indexPriceKlines": _limit_weight(futures_klines_weight, 500),
+    "GET /dapi/v1/markPriceKlines": _limit_weight(futures_klines_weight, 500),
+    "GET /dapi/v1/trades": 5,
+    "GET /dapi/v1/historicalTrades": 20,
+    "GET /dapi/v1/aggTrades": 20,
+    "GET /dapi/v1/exchangeInfo": 1,
+    "GET /dapi/v1/premiumIndex": 10,
+    "GET /dapi/v1/ticker/24hr": _symbol_weight(1, 40),
+    "GET /dapi/v1/ticker/price": _symbol_weight(1, 2),
+    "GET /dapi/v1/ticker/bookTicker": _symbol_weight(2, 5),
+    "GET /dapi/v1/openOrders": _symbol_weight(1, 40),
+    "GET /dapi/v1/allOrders": _symbol_weight(20, 40),
+    "GET /dapi/v1/userTrades": _symbol_weight(20, 40),
+    "GET /dapi/v1/account": 5,
+    "GET /dapi/v1/balance": 1,
+    "GET /dapi/v1/positionRisk": 1,
+    "GET /dapi/v1/income": 20,
+    "GET /eapi/v1/depth": _limit_weight(futures_order_book_weight, 100),
+    "GET /eapi/v1/historicalTrades": 20,
+    "GET /sapi/v1/margin/allOrders": 200,
+    "GET /sapi/v1/margin/myTrades": 10,
+    "GET /sapi/v1/margin/openOrders": 10,
+    "GET /sapi/v1/capital/config/getall": 10,
+    "GET /sapi/v1/asset/assetDetail": 1,
+    "GET /sapi/v1/accountSnapshot": 2400,
+}
+
+# endpoints counted against the order rate limits
+ORDER_ENDPOINTS = {
+    "POST /api/v3/order",
+    "POST /api/v3/order/oco",
+    "POST /api/v3/orderList/oco",
+    "POST /api/v3/orderList/oto",
+    "POST /api/v3/orderList/otoco",
+    "POST /api/v3/order/cancelReplace",
+    "POST /api/v3/sor/order",
+    "POST /sapi/v1/margin/order",
+    "POST /sapi/v1/margin/order/oco",
+    "POST /fapi/v1/order",
+    "PUT /fapi/v1/order",
+    "POST /fapi/v1/batchOrders",
+    "PUT /fapi/v1/batchOrders",
+    "POST /dapi/v1/order",
+    "PUT /dapi/v1/order",
+    "POST /dapi/v1/batchOrders",
+    "PUT /dapi/v1/batchOrders",
+    "POST /eapi/v1/order",
+    "POST /eapi/v1/batchOrders",
+    "POST /papi/v1/um/order",
+    "POST /papi/v1/cm/order",
+    "POST /papi/v1/margin/order",
+}
+
+
+class RateLimit:
+    """One counter of a family, e.g. 6000 request weight per minute
+
+    :param limit_type: REQUEST_WEIGHT or ORDERS
+    :type limit_type: str
+    :param interval: window length in seconds
+    :type interval: int
+    :param limit: allowance per window
+    :type limit: int
+    :param header: response header reporting the server side count
+    :type header: str
+    """
+
+    REQUEST_WEIGHT = "REQUEST_WEIGHT"
+    ORDERS = "ORDERS"
+
+    def __init__(self, limit_type: str, interval: int, limit: int, header: str):
+        self.limit_type = limit_type
+        self.interval = interval
+        self.limit = limit
+        self.header = header
+
+    def __repr__(self):
+        return f"RateLimit({self.limit_type} {self.limit}/{self.interval}s {self.header})"
+
+
+DEFAULT_LIMITS: Dict[str, List[RateLimit]] = {
+    "api": [
+        RateLimit(RateLimit.REQUEST_WEIGHT, 60, 6000, "X-MBX-USED-WEIGHT-1M"),
+        RateLimit(RateLimit.ORDERS, 10, 100, "X-MBX-ORDER-COUNT-10S"),
+        RateLimit(RateLimit.ORDERS, 86400, 200000, "X-MBX-ORDER-COUNT-1D"),
+    ],
+    "sapi": [
+        RateLimit(RateLimit.REQUEST_WEIGHT, 60, 12000, "X-SAPI-USED-IP-WEIGHT-1M"),
+        RateLimit(RateLimit.REQUEST_WEIGHT, 60, 180000, "X-SAPI-USED-UID-WEIGHT-1M"),
+    ],
+    "fapi": [
+        RateLimit(RateLimit.REQUEST_WEIGHT, 60, 2400, "X-MBX-USED-WEIGHT-1M"),
+        RateLimit(RateLimit.ORDERS, 10, 300, "X-MBX-ORDER-COUNT-10S"),
+        RateLimit(RateLimit.ORDERS, 60, 1200, "X-MBX-ORDER-COUNT-1M"),
+    ],
+    "dapi": [
+        RateLimit(RateLimit.REQUEST_WEIGHT, 60, 2400, "X-MBX-USED-WEIGHT-1M"),
+        RateLimit(RateLimit.ORDERS, 60, 1200, "X-MBX-ORDER-COUNT-1M"),
+    ],
+    "eapi": [
+        RateLimit(RateLimit.REQUEST_WEIGHT, 60, 400, "X-MBX-USED-WEIGHT-1M"),
+        RateLimit(RateLimit.ORDERS, 10, 100, "X-MBX-ORDER-COUNT-10S"),
+        RateLimit(RateLimit.ORDERS, 60, 1200, "X-MBX-ORDER-COUNT-1M"),
+    ],
+    "papi": [
+        RateLimit(RateLimit.REQUEST_WEIGHT, 60, 6000, "X-MBX-USED-WEIGHT-1M"),
+        RateLimit(RateLimit.ORDERS, 60, 1200, "X-MBX-ORDER-COUNT-1M"),
+    ],
+}
+
+
+def get_endpoint_weight(
+    method: str,
+    path: str,
+    params: Optional[Dict] = None,
+    weights: Mapping[str, Union[int, Callable[[Dict], int]]] = ENDPOINT_WEIGHTS,
+) -> int:
+    """Return the request weight of an endpoint, 1 for endpoints missing from ``weights``"""
+    weight = weights.get(f"{method.upper()} {path}", 1)
+    if callable(weight):
+        return weight(params or {})
+    return weight
+
+
+def get_api_family(uri: str) -> Tuple[Optional[str], str]:
+    """Return the API family and path of a request uri
+
+    The family is None for urls which are not rate limited, e.g. the website endpoints.
+    """
+    parsed = urlparse(uri)
+    path = parsed.path
+    family = path.split("/", 2)[1] if path.startswith("/") else ""
+    if family == "futures":
+        # futures data endpoints are counted with the host they are served from
+        family = "dapi" if parsed.hostname and parsed.hostname.startswith("dapi") else "fapi"
+    if family not in DEFAULT_LIMITS:
+        return None, path
+    return family, path
+
+
+class RateLimiter:
+    """Keep requests within the request weight and order rate limits
+
+    :param limits: optional - counters per family, defaults to ``DEFAULT_LIMITS``
+    :type limits: dict
+    :param weights: optional - endpoint weights updating ``ENDPOINT_WEIGHTS``, keyed like "GET /api/v3/depth"
+    :type weights: dict
+    :param utilization: fraction of each limit to use
+    :type utilization: float
+    :param mode: "delay" to wait for the next window, "reject" to raise ``BinanceRateLimitExceeded``
+    :type mode: str
+    :param max_delay: longest wait in seconds before raising ``BinanceRateLimitExceeded``
+    :type max_delay: float
+
+    .. code:: python
+
+        limiter = RateLimiter(utilization=0.95)
+        client = Client(api_key, api_secret, rate_limiter=limiter)
+
+    """
+
+    DELAY = "delay"
+    REJECT = "reject"
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, List[RateLimit]]] = None,
+        weights: Optional[Dict[str, Union[int, Callable[[Dict], int]]]] = None,
+        utilization: float = 0.95,
+        mode: str = DELAY,
+        max_delay: float = 60,
+    ):
+        if mode not in (self.DELAY, self.REJECT):
+            raise ValueError(f"mode must be {self.DELAY!r} or {self.REJECT!r}")
+        self.limits = limits if limits is not None else DEFAULT_LIMITS
+        self.weights = dict(ENDPOINT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self.utilization = utilization
+        self.mode = mode
+        self.max_delay = max_delay
+        # (family, header) -> [window start, used]
+        self._usage: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def get_weight(self, method: str, path: str, params: Optional[Dict] = None) -> int:
+        return get_endpoint_weight(method, path, params, self.weights)
+
+    def get_order_count(self, method: str, path: str, params: Optional[Dict] = None) -> int:
+        if f"{method.upper()} {path}" not in ORDER_ENDPOINTS:
+            return 0
+        orders = (params or {}).get("batchOrders")
+        if orders:
+            return len(json.loads(orders)) if isinstance(orders, str) else len(orders)
+        return 1
+
+    def _get_usage(self, family: str, limit: RateLimit, now: float) -> List[float]:
+        window = now - now % limit.interval
+        usage = self._usage.get((family, limit.header))
+        if usage is None or usage[0] != window:
+            usage = self._usage[(family, limit.header)] = [window, 0]
+        return usage
+
+    def _reserve(self, family: str, weight: int, orders: int, now: float) -> float:
+        """Charge the request and return 0, or return the seconds to wait without charging"""
+        with self._lock:
+            charges = []
+            delay = 0.0
+            for limit in self.limits.get(family, ()):
+                cost = orders if limit.limit_type == RateLimit.ORDERS else weight
+                if not cost:
+                    continue
+                usage = self._get_usage(family, limit, now)
+                # a request heavier than the whole allowance is let through on an empty window
+                if usage[1] and usage[1] + cost > limit.limit * self.utilization:
+                    delay = max(delay, usage[0] + limit.interval - now)
+                charges.append((usage, cost))
+            if delay:
+                return delay
+            for usage, cost in charges:
+                usage[1] += cost
+            return 0.0
+
+    def _check_delay(self, family: str, delay: float):
+        if self.mode == self.REJECT or delay > self.max_delay:
+            raise BinanceRateLimitExceeded(family, delay)
+        logger.debug("%s rate limit reached, waiting %.3fs", family, delay)
+
+    def _prepare(self, method: str, uri: str, params: Optional[Dict]):
+        family, path = get_api_family(uri)
+        if family is None:
+            return None, 0, 0
+        return family, self.get_weight(method, path, params), self.get_order_count(method, path, params)
+
+    def acquire(self, method: str, uri: str, params: Optional[Dict] = None):
+        """Charge a request, sleeping until the next window when a limit is reached"""
+        family, weight, orders = self._prepare(method, uri, params)
+        if family is None:
+            return
+        while True:
+            delay = self._reserve(family, weight, orders, time.time())
+            if not delay:
+                return
+            self._check_delay(family, delay)
+            time.sleep(delay)
+
+    def try_acquire(self, method: str, uri: str, params: Optional[Dict] = None) -> bool:
+        """Charge a request only if it fits in the current windows, never waits"""
+        family, weight, orders = self._prepare(method, uri, params)
+        if family is None:
+            return True
+        return not self._reserve(family, weight, orders, time.time())
+
+    async def acquire_async(self, method: str, uri: str, params: Optional[Dict] = None):
+        """Charge a request, awaiting the next window when a limit is reached"""
+        family, weight, orders = self._prepare(method, uri, params)
+        if family is None:
+            return
+        while True:
+            delay = self._reserve(family, weight, orders, time.time())
+            if not delay:
+                return
+            self._check_delay(family, delay)
+            await asyncio.sleep(delay)
+
+    def update_from_headers(self, uri: str, headers: Any):
+        """Reconcile the counters with the usage reported in the response headers
+
+        The server count includes requests from other processes sharing the IP or account,
+        so the local count is raised to it but never lowered.
+        """
+        family, _ = get_api_family(uri)
+        if family is None or headers is None:
+            return
+        now = time.time()
+        with self._lock:
+            for limit in self.limits.get(family, ()):
+                value = headers.get(limit.header)
+                if value is None:
+                    continue
+                try:
+                    used = int(value)
+                except ValueError:
+                    continue
+                usage = self._get_usage(family, limit, now)
+                if used > usage[1]:
+                    usage[1] = used
+
+    def get_usage(self) -> Dict[str, Dict[str, Tuple[float, int]]]:
+        """Return the used count and limit of every active counter, keyed by family and header"""
+        now = time.time()
+        usage: Dict[str, Dict[str, Tuple[float, int]]] = {}
+        with self._lock:
+            for family, limits in self.limits.items():
+                for limit in limits:
+                    if (family, limit.header) in self._usage:
+                        used = self._get_usage(family, limit, now)[1]
+                        usage.setdefault(family, {})[limit.header] = (used, limit.limit)
+        return usage
+
+
+class CircuitBreaker:
+    """Pause every request to an API family after a 429 or 418 response
+
+    A 429 means the rate limit was hit, continuing to send requests turns it into a 418 IP ban.
+    The breaker opens for the family until the ``Retry-After`` of the response has passed,
+    requests made meanwhile wait for it to close, and idempotent GET requests failing with a
+    429, 418 or 5xx status are retried with jittered exponential backoff.
+
+    :param max_retries: retries of a failed GET request
+    :type max_retries: int
+    :param backoff: base of the backoff in seconds, attempt ``n`` waits up to ``backoff * 2 ** n``
+    :type backoff: float
+    :param max_backoff: longest backoff in seconds
+    :type max_backoff: float
+    :param default_pause: pause in seconds when the response has no ``Retry-After`` header
+    :type default_pause: float
+    :param max_wait: longest wait in seconds for the breaker to close, longer pauses raise ``BinanceCircuitBreakerOpen``
+    :type max_wait: float
+
+    .. code:: python
+
+        breaker = CircuitBreaker()
+        client = Client(api_key, api_secret, circuit_breaker=breaker)
+        print(breaker.get_state())
+
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    TRIP_STATUSES = (418, 429)
+    RETRY_STATUSES = (418, 429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        default_pause: float = 30,
+        max_wait: float = 60,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.default_pause = default_pause
+        self.max_wait = max_wait
+        self._open_until: Dict[str, float] = {}
+        self._last_status: Dict[str, int] = {}
+        self._trips: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _family(uri: str) -> str:
+        family, _ = get_api_family(uri)
+        return family or "other"
+
+    def record(self, uri: str, status: int, headers: Any = None) -> float:
+        """Open the breaker when the response is a 429 or 418, return the pause in seconds"""
+        if status not in self.TRIP_STATUSES:
+            return 0.0
+        pause = self.default_pause
+        retry_after = headers.get("Retry-After") if headers is not None else None
+        if retry_after is not None:
+            try:
+                pause = float(retry_after)
+            except ValueError:
+                pass
+        family = self._family(uri)
+        with self._lock:
+            until = time.monotonic() + pause
+            self._open_until[family] = max(self._open_until.get(family, 0.0), until)
+            self._last_status[family] = status
+            self._trips[family] = self._trips.get(family, 0) + 1
+        logger.warning("%s returned %s, pausing %s requests for %.1fs", uri, status, family, pause)
+        return pause
+
+    def get_wait(self, uri: str) -> float:
+        """Seconds until requests to the family of ``uri`` may be sent"""
+        until = self._open_until.get(self._family(uri))
+        if until is None:
+            return 0.0
+        return max(0.0, until - time.monotonic())
+
+    def _check_wait(self, uri: str) -> float:
+        delay = self.get_wait(uri)
+        if delay > self.max_wait:
+            raise BinanceCircuitBreakerOpen(self._family(uri), delay)
+        return delay
+
+    def wait(self, uri: str):
+        """Sleep while the breaker of the family of ``uri`` is open"""
+        delay = self._check_wait(uri)
+        if delay:
+            time.sleep(delay)
+
+    async def wait_async(self, uri: str):
+        """Await while the breaker of the family of ``uri`` is open"""
+        delay = self._check_wait(uri)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def get_retry_delay(self, method: str, status: int, attempt: int) -> Optional[float]:
+        """Return the backoff before retrying a failed request, or None when it should not be retried"""
+        if method.upper() != "GET" or status not in self.RETRY_STATUSES or attempt >= self.max_retries:
+            return None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def get_state(self) -> Dict[str, Dict[str, Any]]:
+        """Return the state, remaining pause, last trip status and trip count of each tripped family"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                family: {
+                    "state": self.OPEN if until > now else self.CLOSED,
+                    "retry_after": max(0.0, until - now),
+                    "status": self._last_status[family],
+                    "trips": self._trips[family],
+                }
+                for family, until in self._open_until.items()
+            }
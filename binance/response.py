@@ -0,0 +1,107 @@
+"""Per call response metadata
+
+``ResponseMeta`` is built once from the status and headers of a response and passed to the
+response hooks of the client, or returned with the payload when a call is made with
+``envelope=True``.
+"""
+
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+USED_WEIGHT_PREFIX = "X-MBX-USED-WEIGHT-"
+SAPI_USED_WEIGHT_PREFIX = "X-SAPI-USED-"
+ORDER_COUNT_PREFIX = "X-MBX-ORDER-COUNT-"
+
+
+class ResponseMeta:
+    """Metadata of one response
+
+    :param method: http method
+    :param url: request url without the query string
+    :param status: http status code
+    :param latency: seconds from sending the request to receiving the response headers
+    :param headers: response headers
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "status",
+        "latency",
+        "headers",
+        "used_weight",
+        "order_count",
+        "server_time",
+        "retry_after",
+        "received_at",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        latency: float,
+        headers: Mapping[str, str],
+    ):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.latency = latency
+        self.headers = headers
+        # keyed by interval, e.g. {"1M": 120}, sapi weights are keyed "IP-1M" and "UID-1M"
+        self.used_weight: Dict[str, int] = {}
+        # keyed by interval, e.g. {"10S": 1, "1D": 20}
+        self.order_count: Dict[str, int] = {}
+        # milliseconds, from the Date header which has a one second resolution
+        self.server_time: Optional[int] = None
+        self.retry_after: Optional[int] = None
+        self.received_at = int(time.time() * 1000)
+        self._parse_headers(headers)
+
+    def _parse_headers(self, headers: Mapping[str, str]):
+        for name, value in headers.items():
+            name = name.upper()
+            if not name.startswith("X-"):
+                if name == "DATE":
+                    try:
+                        self.server_time = int(parsedate_to_datetime(value).timestamp() * 1000)
+                    except (TypeError, ValueError):
+                        pass
+                elif name == "RETRY-AFTER" and value.isdigit():
+                    self.retry_after = int(value)
+            elif name.startswith(USED_WEIGHT_PREFIX):
+                self.used_weight[name[len(USED_WEIGHT_PREFIX):]] = int(value)
+            elif name.startswith(ORDER_COUNT_PREFIX):
+                self.order_count[name[len(ORDER_COUNT_PREFIX):]] = int(value)
+            elif name.startswith(SAPI_USED_WEIGHT_PREFIX):
+                # X-SAPI-USED-IP-WEIGHT-1M -> IP-1M
+                kind, _, interval = name[len(SAPI_USED_WEIGHT_PREFIX):].partition("-WEIGHT-")
+                self.used_weight[f"{kind}-{interval}"] = int(value)
+
+    def __repr__(self):
+        return (
+            f"ResponseMeta({self.method.upper()} {self.url} {self.status} "
+            f"{self.latency * 1000:.1f}ms weight={self.used_weight} orders={self.order_count})"
+        )
+
+
+class ApiResponse:
+    """Payload of a call made with ``envelope=True`` together with its metadata
+
+    Unpacks as ``data, meta = client.get_account(envelope=True)``.
+    """
+
+    __slots__ = ("data", "meta")
+
+    def __init__(self, data: Any, meta: ResponseMeta):
+        self.data = data
+        self.meta = meta
+
+    def __iter__(self):
+        yield self.data
+        yield self.meta
+
+    def __repr__(self):
+        return f"ApiResponse({self.meta!r})"
@@ -0,0 +1,113 @@
+"""Pluggable HTTP transports for the AsyncClient
+
+By default the ``AsyncClient`` sends requests through its aiohttp session, which opens one
+HTTP/1.1 connection per request in flight. Pass a transport to use another HTTP client,
+e.g. ``HttpxTransport`` multiplexes concurrent requests to a host over a single HTTP/2
+connection.
+
+A transport returns responses with ``status``, ``headers`` and awaitable ``text()`` and
+``json()``, the subset of ``aiohttp.ClientResponse`` used by the client.
+"""
+
+import json
+from typing import Any, Dict, Mapping, Optional
+
+httpx = None
+try:
+    import httpx  # type: ignore
+except ImportError:
+    pass
+
+
+class TransportResponse:
+    """Response read in full by a transport
+
+    :param status: http status code
+    :param headers: response headers
+    :param body: response text
+    :param raw: response object of the underlying http client
+    """
+
+    __slots__ = ("status", "headers", "body", "raw")
+
+    def __init__(self, status: int, headers: Mapping[str, str], body: str, raw: Any = None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.raw = raw
+
+    async def text(self) -> str:
+        return self.body
+
+    async def json(self) -> Any:
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"TransportResponse({self.status})"
+
+
+class AsyncTransport:
+    """Base class of the AsyncClient transports"""
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        """Send a request
+
+        :param method: http method in lower case
+        :param url: url with the encoded query string, it must be sent as is
+        :param headers: request headers
+        :param data: url encoded body
+        :param timeout: seconds
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class HttpxTransport(AsyncTransport):
+    """Send requests with httpx over HTTP/2
+
+    Requires ``pip install httpx[http2]``. Concurrent requests to the same host share one
+    connection, which avoids a TCP and TLS handshake per request in flight on bursts.
+
+    :param http2: negotiate HTTP/2, falls back to HTTP/1.1 when the server does not support it
+    :type http2: bool
+    :param client_params: keyword arguments of ``httpx.AsyncClient``, e.g. limits or proxy
+
+    .. code:: python
+
+        client = await AsyncClient.create(api_key, api_secret, transport=HttpxTransport())
+
+    """
+
+    def __init__(self, http2: bool = True, **client_params):
+        if httpx is None:
+            raise ImportError("HttpxTransport requires httpx, install it with pip install httpx[http2]")
+        self.client = httpx.AsyncClient(http2=http2, **client_params)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        response = await self.client.request(
+            method.upper(),
+            url,
+            headers=headers,
+            content=data,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        return TransportResponse(response.status_code, response.headers, response.text, response)
+
+    async def close(self):
+        await self.client.aclose()
@@ -8,3 +8,13 @@ class WSListenerState(Enum):
     STREAMING = "Streaming"
     RECONNECTING = "Reconnecting"
     EXITING = "Exiting"
+
+
+class WSQueueOverflowPolicy(Enum):
+    """What a websocket does with a new message when its queue is full"""
+
+    RAISE = "raise"  # stop the read loop with BinanceWebsocketQueueOverflow
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    CONFLATE = "conflate"  # replace the queued message with the same key, else drop oldest
+    BLOCK = "block"  # stop reading the connection until there is room
@@ -1,31 +1,117 @@
+import heapq
 import logging
+from decimal import Decimal
 from operator import itemgetter
 import asyncio
 import time
-from typing import Optional, Dict, Callable
+from typing import Optional, Dict, Callable, List, Tuple, Union
 
+from ..exceptions import BinanceDepthCacheOutOfSync
 from ..helpers import get_loop
+from ..rate_limit import spot_order_book_weight, futures_order_book_weight
 from .streams import BinanceSocketManager
+from ..enums import FuturesType
 from .threaded_stream import ThreadedApiManager
 
 
+def _decimal_places(value: str) -> int:
+    """Number of significant decimal places in a decimal string, e.g. "0.01000000" -> 2"""
+    _, _, frac = str(value).partition(".")
+    return len(frac.rstrip("0"))
+
+
+def _to_scaled_int(value: Union[str, float, int], decimals: int) -> int:
+    """Parse a decimal string into an int scaled by 10**decimals without a float round trip
+
+    Digits beyond ``decimals`` are truncated, which is lossless for values that are
+    multiples of the tick or step size the scale was derived from.
+    """
+    s = value if isinstance(value, str) else str(value)
+    if "e" in s or "E" in s:
+        s = format(Decimal(s), "f")
+    whole, _, frac = s.partition(".")
+    if len(frac) < decimals:
+        frac = frac + "0" * (decimals - len(frac))
+    return int((whole or "0") + frac[:decimals])
+
+
+def _from_scaled_int(value: int, decimals: int, conv_type: Callable):
+    """Convert a scaled int back to ``conv_type`` at the API boundary"""
+    if conv_type is float:
+        # int true division is correctly rounded, so this equals float("<decimal string>")
+        return value / 10**decimals
+    if conv_type is Decimal:
+        return Decimal(value).scaleb(-decimals)
+    sign = "-" if value < 0 else ""
+    digits = str(abs(value)).rjust(decimals + 1, "0")
+    if decimals:
+        return conv_type(f"{sign}{digits[:-decimals]}.{digits[-decimals:]}")
+    return conv_type(f"{sign}{digits}")
+
+
 class DepthCache(object):
-    def __init__(self, symbol, conv_type: Callable = float):
+    def __init__(
+        self,
+        symbol,
+        conv_type: Callable = float,
+        tick_size: Optional[str] = None,
+        step_size: Optional[str] = None,
+    ):
         """Initialise the DepthCache
 
         :param symbol: Symbol to create depth cache for
         :type symbol: string
         :param conv_type: Optional type to represent price, and amount, default is float.
         :type conv_type: function.
+        :param tick_size: Optional symbol tickSize (PRICE_FILTER). When set prices are stored as integer ticks
+            and quantities as scaled integers, and are only converted to conv_type when read.
+        :type tick_size: str
+        :param step_size: Optional symbol stepSize (LOT_SIZE) used to scale quantities in integer tick mode,
+            defaults to 8 decimal places.
+        :type step_size: str
 
         """
         self.symbol = symbol
         self._bids = {}
         self._asks = {}
+        # sorted views, rebuilt lazily on the first read after an update
+        self._bids_view: Optional[List] = None
+        self._asks_view: Optional[List] = None
         self.update_time = None
         self.conv_type: Callable = conv_type
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self._price_decimals = 0
+        self._price_unit = 1
+        self._qty_decimals = 8
+        if tick_size is not None:
+            self._price_decimals = _decimal_places(tick_size)
+            self._price_unit = _to_scaled_int(tick_size, self._price_decimals)
+            if self._price_unit <= 0:
+                raise ValueError(f"Invalid tick size: {tick_size}")
+        if step_size is not None:
+            self._qty_decimals = _decimal_places(step_size)
         self._log = logging.getLogger(__name__)
 
+    @property
+    def integer_ticks(self) -> bool:
+        """True if levels are stored as integer ticks and scaled integer quantities"""
+        return self.tick_size is not None
+
+    def _parse_level(self, level) -> Tuple[int, int]:
+        """Parse a [price, quantity] level into (price ticks, scaled quantity)"""
+        return (
+            _to_scaled_int(level[0], self._price_decimals) // self._price_unit,
+            _to_scaled_int(level[1], self._qty_decimals),
+        )
+
+    def _convert_level(self, ticks: int, quantity: int):
+        conv_type = self.conv_type
+        return [
+            _from_scaled_int(ticks * self._price_unit, self._price_decimals, conv_type),
+            _from_scaled_int(quantity, self._qty_decimals, conv_type),
+        ]
+
     def add_bid(self, bid):
         """Add a bid to the cache
 
@@ -33,9 +119,20 @@ class DepthCache(object):
         :return:
 
         """
-        self._bids[bid[0]] = self.conv_type(bid[1])
-        if bid[1] == "0.00000000":
-            del self._bids[bid[0]]
+        self._bids_view = None
+        if self.integer_ticks:
+            price, quantity = self._parse_level(bid)
+            if quantity:
+                self._bids[price] = quantity
+            else:
+                self._bids.pop(price, None)
+            return
+        quantity = self.conv_type(bid[1])
+        if quantity:
+            self._bids[bid[0]] = quantity
+        else:
+            # zero quantities come formatted as "0.00000000", "0.000" or "0"
+            self._bids.pop(bid[0], None)
 
     def add_ask(self, ask):
         """Add an ask to the cache
@@ -44,13 +141,26 @@ class DepthCache(object):
         :return:
 
         """
-        self._asks[ask[0]] = self.conv_type(ask[1])
-        if ask[1] == "0.00000000":
-            del self._asks[ask[0]]
+        self._asks_view = None
+        if self.integer_ticks:
+            price, quantity = self._parse_level(ask)
+            if quantity:
+                self._asks[price] = quantity
+            else:
+                self._asks.pop(price, None)
+            return
+        quantity = self.conv_type(ask[1])
+        if quantity:
+            self._asks[ask[0]] = quantity
+        else:
+            # zero quantities come formatted as "0.00000000", "0.000" or "0"
+            self._asks.pop(ask[0], None)
 
     def get_bids(self):
         """Get the current bids
 
+        The sorted levels are cached until the next bid update, so repeated calls only copy them.
+
         :return: list of bids with price and quantity as conv_type
 
         .. code-block:: python
@@ -79,11 +189,16 @@ class DepthCache(object):
             ]
 
         """
-        return DepthCache.sort_depth(self._bids, reverse=True, conv_type=self.conv_type)
+        if self._bids_view is None:
+            self._bids_view = self._sort_levels(self._bids, reverse=True)
+        # callers may change the result, the cached view must stay intact
+        return [list(level) for level in self._bids_view]
 
     def get_asks(self):
         """Get the current asks
 
+        The sorted levels are cached until the next ask update, so repeated calls only copy them.
+
         :return: list of asks with price and quantity as conv_type.
 
         .. code-block:: python
@@ -112,9 +227,78 @@ class DepthCache(object):
             ]
 
         """
-        return DepthCache.sort_depth(
-            self._asks, reverse=False, conv_type=self.conv_type
-        )
+        if self._asks_view is None:
+            self._asks_view = self._sort_levels(self._asks, reverse=False)
+        return [list(level) for level in self._asks_view]
+
+    def best_bid(self):
+        """Get the highest bid without sorting the book
+
+        :return: [price, quantity] as conv_type, or None if there are no bids
+        """
+        if self._bids_view is not None:
+            return list(self._bids_view[0]) if self._bids_view else None
+        return self._best_level(self._bids, max)
+
+    def best_ask(self):
+        """Get the lowest ask without sorting the book
+
+        :return: [price, quantity] as conv_type, or None if there are no asks
+        """
+        if self._asks_view is not None:
+            return list(self._asks_view[0]) if self._asks_view else None
+        return self._best_level(self._asks, min)
+
+    def top_n(self, n: int):
+        """Get the best n bids and asks
+
+        Uses the cached sorted views when they are up to date, otherwise selects the
+        n best levels with a heap instead of sorting the whole book.
+
+        :param n: number of levels per side
+        :type n: int
+
+        :return: tuple of (bids, asks), each a list of [price, quantity] as conv_type
+        """
+        if self._bids_view is not None:
+            bids = [list(level) for level in self._bids_view[:n]]
+        else:
+            bids = self._top_levels(self._bids, n, heapq.nlargest)
+        if self._asks_view is not None:
+            asks = [list(level) for level in self._asks_view[:n]]
+        else:
+            asks = self._top_levels(self._asks, n, heapq.nsmallest)
+        return bids, asks
+
+    def _price_key(self):
+        # integer ticks already compare numerically, raw price strings need converting
+        return None if self.integer_ticks else self.conv_type
+
+    def _convert(self, price, quantity):
+        if self.integer_ticks:
+            return self._convert_level(price, quantity)
+        return [self.conv_type(price), self.conv_type(quantity)]
+
+    def _best_level(self, vals, select: Callable):
+        if not vals:
+            return None
+        key = self._price_key()
+        price = select(vals, key=key) if key else select(vals)
+        return self._convert(price, vals[price])
+
+    def _top_levels(self, vals, n: int, select: Callable):
+        key = self._price_key()
+        prices = select(n, vals, key=key) if key else select(n, vals)
+        return [self._convert(price, vals[price]) for price in prices]
+
+    def _sort_levels(self, vals, reverse=False):
+        if self.integer_ticks:
+            convert = self._convert_level
+            return [
+                convert(price, quantity)
+                for price, quantity in sorted(vals.items(), reverse=reverse)
+            ]
+        return DepthCache.sort_depth(vals, reverse=reverse, conv_type=self.conv_type)
 
     @staticmethod
     def sort_depth(vals, reverse=False, conv_type: Callable = float):
@@ -135,6 +319,101 @@ class DepthCache(object):
 DEFAULT_REFRESH = 60 * 30  # 30 minutes
 
 
+class SnapshotScheduler:
+    """Fetch REST order book snapshots concurrently within a request weight budget
+
+    Requests run at most ``max_concurrency`` at a time and spend at most ``max_weight_per_minute``
+    in each minute long window. Waiting requests are served lowest priority value first, so books
+    that are currently invalid are fetched before refreshes of books that are still in sync.
+    One scheduler can be shared by several depth cache managers.
+    """
+
+    PRIORITY_INVALID = 0
+    PRIORITY_REFRESH = 1
+    WINDOW_SECONDS = 60
+
+    def __init__(self, max_concurrency: int = 10, max_weight_per_minute: int = 4800):
+        """
+        :param max_concurrency: Optional number of snapshots fetched at the same time, default 10
+        :type max_concurrency: int
+        :param max_weight_per_minute: Optional request weight the snapshots may use per minute, default 4800
+            which leaves 20% of the default 6000 spot weight limit for other requests
+        :type max_weight_per_minute: int
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_weight_per_minute = max_weight_per_minute
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._counter = 0
+        self._running = 0
+        self._window_start = 0.0
+        self._window_weight = 0
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def fetch(self, func: Callable, weight: int, priority: int = PRIORITY_INVALID):
+        """Run ``func()`` once a concurrency slot and enough weight are available
+
+        :param func: coroutine function fetching the snapshot
+        :param weight: request weight of the call
+        :param priority: lower values are fetched first
+        :return: result of ``func()``
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._counter += 1
+        heapq.heappush(self._waiters, (priority, self._counter, weight, waiter))
+        self._wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # cancelled after the slot was granted
+                self._release()
+            raise
+        try:
+            return await func()
+        finally:
+            self._release()
+
+    @property
+    def pending(self) -> int:
+        """Number of requests waiting for a slot"""
+        return len(self._waiters)
+
+    def _release(self):
+        self._running -= 1
+        self._wake()
+
+    def _wake(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    def _reserve(self, weight: int) -> float:
+        """Reserve weight in the current window, return seconds to wait when it is spent"""
+        now = time.monotonic()
+        if now - self._window_start >= self.WINDOW_SECONDS:
+            self._window_start = now
+            self._window_weight = 0
+        if self._window_weight and self._window_weight + weight > self.max_weight_per_minute:
+            return self._window_start + self.WINDOW_SECONDS - now
+        self._window_weight += weight
+        return 0
+
+    async def _dispatch(self):
+        while self._waiters and self._running < self.max_concurrency:
+            _, _, weight, waiter = self._waiters[0]
+            if waiter.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._reserve(weight)
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(self._waiters)
+            self._running += 1
+            waiter.set_result(None)
+
+
 class BaseDepthCacheManager:
     TIMEOUT = 60
 
@@ -147,6 +426,8 @@ class BaseDepthCacheManager:
         bm=None,
         limit=10,
         conv_type=float,
+        integer_ticks: bool = False,
+        snapshot_scheduler: Optional[SnapshotScheduler] = None,
     ):
         """Create a DepthCacheManager instance
 
@@ -164,6 +445,11 @@ class BaseDepthCacheManager:
         :type limit: int
         :param conv_type: Optional type to represent price, and amount, default is float.
         :type conv_type: function.
+        :param integer_ticks: Optional, store the book as integer price ticks and scaled integer quantities
+            using the symbol's tickSize and stepSize from exchange info, default False.
+        :type integer_ticks: bool
+        :param snapshot_scheduler: Optional SnapshotScheduler to fetch the REST snapshots through
+        :type snapshot_scheduler: SnapshotScheduler
 
         """
 
@@ -177,6 +463,10 @@ class BaseDepthCacheManager:
         self._refresh_interval = refresh_interval
         self._conn_key = None
         self._conv_type = conv_type
+        self._integer_ticks = integer_ticks
+        self._tick_size: Optional[str] = None
+        self._step_size: Optional[str] = None
+        self._snapshot_scheduler = snapshot_scheduler
         self._log = logging.getLogger(__name__)
 
     async def __aenter__(self):
@@ -193,7 +483,7 @@ class BaseDepthCacheManager:
         while not dc:
             try:
                 res = await asyncio.wait_for(self._socket.recv(), timeout=self.TIMEOUT)
-                self._log.debug(f"Received message: {res}")
+                self._log.debug("Received message: %s", res)
             except Exception as e:
                 self._log.warning(f"Exception recieving message: {e.__class__.__name__} (e) ")
             else:
@@ -206,13 +496,57 @@ class BaseDepthCacheManager:
         :return:
         """
         self._log.debug(f"Initialising depth cache for {self._symbol}")
+        if self._integer_ticks and self._tick_size is None:
+            self._tick_size, self._step_size = await self._get_symbol_filters()
+
         # initialise or clear depth cache
-        self._depth_cache = DepthCache(self._symbol, conv_type=self._conv_type)
+        self._depth_cache = DepthCache(
+            self._symbol,
+            conv_type=self._conv_type,
+            tick_size=self._tick_size,
+            step_size=self._step_size,
+        )
 
         # set a time to refresh the depth cache
         if self._refresh_interval:
             self._refresh_time = int(time.time()) + self._refresh_interval
 
+    async def _get_symbol_info(self) -> Optional[Dict]:
+        return await self._client.get_symbol_info(self._symbol)
+
+    async def _get_symbol_filters(self) -> Tuple[str, Optional[str]]:
+        """Get the tickSize and stepSize used to scale the book in integer tick mode
+
+        :return: (tickSize, stepSize)
+        """
+        info = await self._get_symbol_info()
+        if not info:
+            raise ValueError(f"Unable to find symbol info for {self._symbol}")
+        filters = {f["filterType"]: f for f in info.get("filters", [])}
+        if "PRICE_FILTER" not in filters:
+            raise ValueError(f"No PRICE_FILTER found for {self._symbol}")
+        tick_size = filters["PRICE_FILTER"]["tickSize"]
+        step_size = filters.get("LOT_SIZE", {}).get("stepSize")
+        return tick_size, step_size
+
+    async def _fetch_snapshot(self, priority: int = SnapshotScheduler.PRIORITY_INVALID) -> Dict:
+        """Fetch the REST order book snapshot, through the snapshot scheduler if one is set
+
+        :param priority: scheduler priority, lower values are fetched first
+        :return: order book snapshot
+        """
+        if self._snapshot_scheduler is None:
+            return await self._get_snapshot()
+        return await self._snapshot_scheduler.fetch(
+            self._get_snapshot, self._snapshot_weight(), priority
+        )
+
+    async def _get_snapshot(self) -> Dict:
+        raise NotImplementedError
+
+    def _snapshot_weight(self) -> int:
+        return 1
+
     async def _start_socket(self):
         """Start the depth cache socket
 
@@ -230,7 +564,7 @@ class BaseDepthCacheManager:
         :return:
 
         """
-        self._log.debug(f"Received depth event: {msg}")
+        self._log.debug("Received depth event: %s", msg)
 
         if not msg:
             return None
@@ -296,6 +630,9 @@ class BaseDepthCacheManager:
 
 
 class DepthCacheManager(BaseDepthCacheManager):
+    MAX_RESYNC_ATTEMPTS = 5
+    MAX_RESYNC_WAIT = 30
+
     def __init__(
         self,
         client,
@@ -306,6 +643,8 @@ class DepthCacheManager(BaseDepthCacheManager):
         limit=500,
         conv_type=float,
         ws_interval=None,
+        integer_ticks: bool = False,
+        snapshot_scheduler: Optional[SnapshotScheduler] = None,
     ):
         """Initialise the DepthCacheManager
 
@@ -322,52 +661,53 @@ class DepthCacheManager(BaseDepthCacheManager):
         :type conv_type: function.
         :param ws_interval: Optional interval for updates on websocket, default None. If not set, updates happen every second. Must be 0, None (1s) or 100 (100ms).
         :type ws_interval: int
+        :param integer_ticks: Optional, store the book as integer price ticks, default False.
+        :type integer_ticks: bool
+        :param snapshot_scheduler: Optional SnapshotScheduler to fetch the REST snapshots through
+        :type snapshot_scheduler: SnapshotScheduler
 
         """
-        super().__init__(client, symbol, loop, refresh_interval, bm, limit, conv_type)
+        super().__init__(
+            client,
+            symbol,
+            loop,
+            refresh_interval,
+            bm,
+            limit,
+            conv_type,
+            integer_ticks,
+            snapshot_scheduler,
+        )
         self._ws_interval = ws_interval
+        self._depth_message_buffer: List[Dict] = []
+        self._resyncing = False
+        self._resync_failed = False
 
-    async def _init_cache(self):
+    async def _init_cache(self, priority: int = SnapshotScheduler.PRIORITY_INVALID):
         """Initialise the depth cache calling REST endpoint
 
+        :param priority: snapshot scheduler priority, lower values are fetched first
         :return:
         """
+        # keep any messages already buffered, they are replayed over the new snapshot
         self._last_update_id = None
-        self._depth_message_buffer = []
 
-        res = await self._client.get_order_book(symbol=self._symbol, limit=self._limit)
+        res = await self._fetch_snapshot(priority)
 
         # initialise or clear depth cache
         await super()._init_cache()
 
         # process bid and asks from the order book
         self._apply_orders(res)
-        assert self._depth_cache
-        for bid in res["bids"]:
-            self._depth_cache.add_bid(bid)
-        for ask in res["asks"]:
-            self._depth_cache.add_ask(ask)
 
         # set first update id
         self._last_update_id = res["lastUpdateId"]
 
-        # Apply any updates from the websocket
-        for msg in self._depth_message_buffer:
+        # Apply any updates from the websocket, a gap found while replaying starts a new buffer
+        buffer, self._depth_message_buffer = self._depth_message_buffer, []
+        for msg in buffer:
             await self._process_depth_message(msg)
 
-        # clear the depth buffer
-        self._depth_message_buffer = []
-
-    async def _start_socket(self):
-        """Start the depth cache socket
-
-        :return:
-        """
-        if not getattr(self, "_depth_message_buffer", None):
-            self._depth_message_buffer = []
-
-        await super()._start_socket()
-
     def _get_socket(self):
         return self._bm.depth_socket(self._symbol, interval=self._ws_interval)
 
@@ -380,6 +720,9 @@ class DepthCacheManager(BaseDepthCacheManager):
         """
 
         if self._last_update_id is None:
+            if self._resync_failed:
+                # the last resync gave up, start over from this message
+                return await self._handle_gap(msg)
             # Initial depth snapshot fetch not yet performed, buffer messages
             self._depth_message_buffer.append(msg)
             return
@@ -387,10 +730,13 @@ class DepthCacheManager(BaseDepthCacheManager):
         if msg["u"] <= self._last_update_id:
             # ignore any updates before the initial update id
             return
-        elif msg["U"] != self._last_update_id + 1:
-            # if not buffered check we get sequential updates
-            # otherwise init cache again
-            await self._init_cache()
+        elif msg["U"] > self._last_update_id + 1:
+            # missed an update, keep the message and fetch a new snapshot
+            self._log.warning(
+                "Gap in depth updates for %s, expected %s got %s",
+                self._symbol, self._last_update_id + 1, msg["U"],
+            )
+            return await self._handle_gap(msg)
 
         # add any bid or ask values
         self._apply_orders(msg)
@@ -402,12 +748,162 @@ class DepthCacheManager(BaseDepthCacheManager):
 
         # after processing event see if we need to refresh the depth cache
         if self._refresh_interval and int(time.time()) > self._refresh_time:
-            await self._init_cache()
+            return await self._refresh(res)
+
+        return res
 
+    async def _handle_gap(self, msg):
+        """Keep the message that does not follow the book and resync
+
+        :return: the depth cache once in sync, None while buffering, or an error message dict
+        """
+        self._depth_message_buffer.append(msg)
+        if self._resyncing:
+            # found while replaying, the resync loop fetches the next snapshot
+            self._last_update_id = None
+            return None
+        try:
+            await self._resync()
+        except BinanceDepthCacheOutOfSync as e:
+            return {"e": "error", "type": e.__class__.__name__, "m": f"{e}"}
+        return self._depth_cache if self._last_update_id is not None else None
+
+    async def _refresh(self, res):
+        try:
+            await self._resync(SnapshotScheduler.PRIORITY_REFRESH)
+        except BinanceDepthCacheOutOfSync as e:
+            return {"e": "error", "type": e.__class__.__name__, "m": f"{e}"}
         return res
 
+    async def _get_snapshot(self) -> Dict:
+        return await self._client.get_order_book(symbol=self._symbol, limit=self._limit)
+
+    def _snapshot_weight(self) -> int:
+        return spot_order_book_weight(self._limit)
+
+    async def _resync(self, priority: int = SnapshotScheduler.PRIORITY_INVALID):
+        """Fetch new snapshots until the buffered messages replay over one without a gap
+
+        Snapshots that lag the stream are retried after 2, 4, 8... seconds up to ``MAX_RESYNC_WAIT``.
+        After ``MAX_RESYNC_ATTEMPTS`` the buffer is dropped and the next message starts over.
+
+        :param priority: snapshot scheduler priority, lower values are fetched first
+        :raises BinanceDepthCacheOutOfSync: when no snapshot caught up with the stream
+        """
+        self._resyncing = True
+        self._resync_failed = False
+        try:
+            for attempt in range(self.MAX_RESYNC_ATTEMPTS):
+                if attempt:
+                    await asyncio.sleep(min(2**attempt, self.MAX_RESYNC_WAIT))
+                await self._init_cache(priority)
+                if self._last_update_id is not None:
+                    return
+                # the book is invalid now, whatever the reason the first snapshot was fetched
+                priority = SnapshotScheduler.PRIORITY_INVALID
+        finally:
+            self._resyncing = False
+        self._depth_message_buffer = []
+        self._resync_failed = True
+        raise BinanceDepthCacheOutOfSync(
+            f"{self._symbol} snapshots lag the depth stream after {self.MAX_RESYNC_ATTEMPTS} attempts"
+        )
+
+
+class FuturesDepthCacheManager(DepthCacheManager):
+    """Futures depth cache kept from a REST snapshot plus the diff depth stream
+
+    Each diff must continue the previous one (its ``pu`` equals the previous ``u``),
+    otherwise a new snapshot is fetched and the buffered diffs are replayed over it.
+    """
+
+    def __init__(
+        self,
+        client,
+        symbol,
+        loop=None,
+        refresh_interval: Optional[int] = None,
+        bm=None,
+        limit=1000,
+        conv_type=float,
+        ws_interval: Optional[int] = 100,
+        integer_ticks: bool = False,
+        snapshot_scheduler: Optional[SnapshotScheduler] = None,
+        futures_type: FuturesType = FuturesType.USD_M,
+    ):
+        """Initialise the FuturesDepthCacheManager
+
+        :param client: Binance API client
+        :type client: binance.AsyncClient
+        :param loop: asyncio loop
+        :param symbol: Symbol to create depth cache for
+        :type symbol: string
+        :param refresh_interval: Optional number of seconds between cache refresh, use 0 or None to disable
+        :type refresh_interval: int
+        :param limit: Optional number of orders to get from the order book snapshot, default 1000
+        :type limit: int
+        :param conv_type: Optional type to represent price, and amount, default is float.
+        :type conv_type: function.
+        :param ws_interval: Optional interval for diff updates on websocket, default 100.
+            Must be None (250ms), 100 (100ms) or 500 (500ms).
+        :type ws_interval: int
+        :param integer_ticks: Optional, store the book as integer price ticks, default False.
+        :type integer_ticks: bool
+        :param snapshot_scheduler: Optional SnapshotScheduler to fetch the REST snapshots through
+        :type snapshot_scheduler: SnapshotScheduler
+        :param futures_type: use USD-M or COIN-M futures default USD-M
+        :type futures_type: FuturesType
+
+        """
+        super().__init__(
+            client,
+            symbol,
+            loop,
+            refresh_interval,
+            bm,
+            limit,
+            conv_type,
+            ws_interval,
+            integer_ticks,
+            snapshot_scheduler,
+        )
+        self._futures_type = futures_type
+        self._snapshot_pending = False
+
+    async def _init_cache(self, priority: int = SnapshotScheduler.PRIORITY_INVALID):
+        # the first diff after a snapshot is checked against the snapshot, not with pu
+        self._snapshot_pending = True
+        await super()._init_cache(priority)
+
+    async def _get_snapshot(self) -> Dict:
+        if self._futures_type == FuturesType.USD_M:
+            return await self._client.futures_order_book(symbol=self._symbol, limit=self._limit)
+        return await self._client.futures_coin_order_book(symbol=self._symbol, limit=self._limit)
+
+    def _snapshot_weight(self) -> int:
+        return futures_order_book_weight(self._limit)
+
+    async def _get_symbol_info(self) -> Optional[Dict]:
+        if self._futures_type == FuturesType.USD_M:
+            res = await self._client.futures_exchange_info()
+        else:
+            res = await self._client.futures_coin_exchange_info()
+        for item in res.get("symbols", []):
+            if item["symbol"] == self._symbol:
+                return item
+        return None
+
+    def _get_socket(self):
+        return self._bm.futures_depth_socket(
+            self._symbol, depth=None, interval=self._ws_interval, futures_type=self._futures_type
+        )
+
+    async def _depth_event(self, msg):
+        # futures sockets deliver {"stream": ..., "data": ...} envelopes
+        if msg and "data" in msg:
+            msg = msg["data"]
+        return await super()._depth_event(msg)
 
-class FuturesDepthCacheManager(BaseDepthCacheManager):
     async def _process_depth_message(self, msg):
         """Process a depth event message.
 
@@ -415,27 +911,380 @@ class FuturesDepthCacheManager(BaseDepthCacheManager):
         :return:
 
         """
-        msg = msg.get("data")
-        return await super()._process_depth_message(msg)
 
-    def _apply_orders(self, msg):
-        assert self._depth_cache
-        self._depth_cache._bids = msg.get("b", [])
-        self._depth_cache._asks = msg.get("a", [])
+        if self._last_update_id is None:
+            if self._resync_failed:
+                # the last resync gave up, start over from this message
+                return await self._handle_gap(msg)
+            # snapshot not fetched yet, buffer messages
+            self._depth_message_buffer.append(msg)
+            return
 
-        # keeping update time
-        self._depth_cache.update_time = msg.get("E") or msg.get("lastUpdateId")
+        if self._snapshot_pending:
+            if msg["u"] < self._last_update_id:
+                # ignore any updates before the snapshot
+                return
+            # first event must span the snapshot, U <= lastUpdateId <= u
+            in_sync = msg["U"] <= self._last_update_id
+        else:
+            if msg["u"] <= self._last_update_id:
+                return
+            in_sync = msg["pu"] == self._last_update_id
+
+        if not in_sync:
+            self._log.warning(
+                "Gap in futures depth updates for %s, previous update %s got pu %s",
+                self._symbol, self._last_update_id, msg.get("pu"),
+            )
+            return await self._handle_gap(msg)
+
+        self._snapshot_pending = False
+        self._apply_orders(msg)
+        res = self._depth_cache
+        self._last_update_id = msg["u"]
 
-    def _get_socket(self):
-        sock = self._bm.futures_depth_socket(self._symbol)
-        return sock
+        # after processing event see if we need to refresh the depth cache
+        if self._refresh_interval and int(time.time()) > self._refresh_time:
+            return await self._refresh(res)
+
+        return res
 
 
 class OptionsDepthCacheManager(BaseDepthCacheManager):
+    async def _get_symbol_info(self) -> Optional[Dict]:
+        res = await self._client.options_exchange_info()
+        for item in res.get("optionSymbols", []):
+            if item["symbol"] == self._symbol:
+                return item
+        return None
+
     def _get_socket(self):
         return self._bm.options_depth_socket(self._symbol)
 
 
+class _MultiplexedResyncMixin:
+    """Per symbol state of a MultiDepthCacheManager, fed from the shared connection"""
+
+    def __init__(self, multi, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._multi = multi
+
+    async def _resync(self, priority: int = SnapshotScheduler.PRIORITY_INVALID):
+        # buffer this symbol's updates while the snapshot is fetched in the background
+        self._last_update_id = None
+        self._resync_failed = False
+        self._multi._schedule_resync(self, priority)
+
+
+class _MultiplexedDepthCacheManager(_MultiplexedResyncMixin, DepthCacheManager):
+    pass
+
+
+class _MultiplexedFuturesDepthCacheManager(_MultiplexedResyncMixin, FuturesDepthCacheManager):
+    pass
+
+
+class MultiDepthCacheManager:
+    """Maintain depth caches for many symbols over as few combined stream connections as possible
+
+    Streams are sharded into ``multiplex_socket`` connections of at most ``MAX_STREAMS_PER_CONNECTION``
+    streams, each ``{"stream", "data"}`` envelope is routed to the cache of its symbol and a gap in
+    one symbol's updates only resyncs that symbol.
+    """
+
+    MAX_STREAMS_PER_CONNECTION = 1024
+    SNAPSHOT_WEIGHT_PER_MINUTE = 4800
+    MAX_RESYNC_ATTEMPTS = 5
+    MAX_RESYNC_WAIT = 30
+    TIMEOUT = 60
+
+    def __init__(
+        self,
+        client,
+        symbols: List[str],
+        loop=None,
+        refresh_interval: Optional[int] = None,
+        bm=None,
+        limit: int = 500,
+        conv_type=float,
+        ws_interval=None,
+        integer_ticks: bool = False,
+        max_streams_per_connection: Optional[int] = None,
+        snapshot_scheduler: Optional[SnapshotScheduler] = None,
+    ):
+        """Create a MultiDepthCacheManager instance
+
+        :param client: Binance API client
+        :type client: binance.AsyncClient
+        :param symbols: Symbols to create depth caches for
+        :type symbols: list
+        :param loop:
+        :type loop:
+        :param refresh_interval: Optional number of seconds between cache refresh of each symbol,
+            use 0 or None to disable, default disabled
+        :type refresh_interval: int
+        :param bm: Optional BinanceSocketManager
+        :type bm: BinanceSocketManager
+        :param limit: Optional number of orders to get from orderbook
+        :type limit: int
+        :param conv_type: Optional type to represent price, and amount, default is float.
+        :type conv_type: function.
+        :param ws_interval: Optional interval for updates on websocket, default None. If not set, updates happen every second. Must be 0, None (1s) or 100 (100ms).
+        :type ws_interval: int
+        :param integer_ticks: Optional, store the books as integer price ticks and scaled integer quantities
+        :type integer_ticks: bool
+        :param max_streams_per_connection: Optional limit of streams on one connection,
+            default MAX_STREAMS_PER_CONNECTION
+        :type max_streams_per_connection: int
+        :param snapshot_scheduler: Optional SnapshotScheduler shared by the symbols, by default one is created
+            with a budget of SNAPSHOT_WEIGHT_PER_MINUTE
+        :type snapshot_scheduler: SnapshotScheduler
+
+        """
+        if not symbols:
+            raise ValueError("At least one symbol is required")
+        self._client = client
+        self._loop = loop or get_loop()
+        self._refresh_interval = refresh_interval
+        self._bm = bm or BinanceSocketManager(self._client)
+        self._limit = limit
+        self._conv_type = conv_type
+        self._ws_interval = ws_interval
+        self._integer_ticks = integer_ticks
+        self._max_streams = max_streams_per_connection or self.MAX_STREAMS_PER_CONNECTION
+        self._snapshot_scheduler = snapshot_scheduler or SnapshotScheduler(
+            max_weight_per_minute=self.SNAPSHOT_WEIGHT_PER_MINUTE
+        )
+        self._managers: Dict[str, BaseDepthCacheManager] = {}
+        for symbol in symbols:
+            symbol = symbol.upper()
+            if symbol not in self._managers:
+                self._managers[symbol] = self._create_manager(symbol)
+        # created in __aenter__ so it belongs to the loop that reads it
+        self._queue: Optional[asyncio.Queue] = None
+        self._sockets: List = []
+        self._readers: List[asyncio.Task] = []
+        self._resync_tasks: Dict[str, asyncio.Task] = {}
+        self._log = logging.getLogger(__name__)
+
+    async def __aenter__(self):
+        self._queue = asyncio.Queue()
+        self._sockets = [self._get_socket(streams) for streams in self._get_stream_shards()]
+        for socket in self._sockets:
+            await socket.__aenter__()
+        # start reading before the snapshots are fetched so no update is missed
+        self._readers = [
+            asyncio.create_task(self._read_socket(socket)) for socket in self._sockets
+        ]
+        await asyncio.gather(*(dcm._init_cache() for dcm in self._managers.values()))
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        self._log.debug(f"Exiting multi depth cache manager for {len(self._managers)} symbols")
+        tasks = self._readers + list(self._resync_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._readers = []
+        for socket in self._sockets:
+            await socket.__aexit__(*args, **kwargs)
+        self._sockets = []
+
+    async def recv(self):
+        """Wait for the next depth event of any symbol
+
+        :return: the updated DepthCache, or an error message dict
+        """
+        assert self._queue, "use the manager with async with"
+        dc = None
+        while not dc:
+            try:
+                msg = await asyncio.wait_for(self._queue.get(), timeout=self.TIMEOUT)
+            except asyncio.TimeoutError:
+                self._log.debug(f"no message in {self.TIMEOUT} seconds")
+            else:
+                dc = await self._route(msg)
+        return dc
+
+    def _create_manager(self, symbol: str) -> BaseDepthCacheManager:
+        return _MultiplexedDepthCacheManager(
+            self,
+            client=self._client,
+            symbol=symbol,
+            loop=self._loop,
+            refresh_interval=self._refresh_interval,
+            bm=self._bm,
+            limit=self._limit,
+            conv_type=self._conv_type,
+            ws_interval=self._ws_interval,
+            integer_ticks=self._integer_ticks,
+            snapshot_scheduler=self._snapshot_scheduler,
+        )
+
+    def _get_stream_name(self, symbol: str) -> str:
+        stream = f"{symbol.lower()}@depth"
+        if self._ws_interval:
+            stream = f"{stream}@{self._ws_interval}ms"
+        return stream
+
+    def _get_stream_shards(self) -> List[List[str]]:
+        streams = [self._get_stream_name(symbol) for symbol in self._managers]
+        return [
+            streams[i:i + self._max_streams]
+            for i in range(0, len(streams), self._max_streams)
+        ]
+
+    def _get_socket(self, streams: List[str]):
+        return self._bm.multiplex_socket(streams)
+
+    async def _read_socket(self, socket):
+        """Move messages of one connection onto the shared queue"""
+        assert self._queue
+        while True:
+            try:
+                msg = await socket.recv()
+            except Exception as e:
+                await self._queue.put({
+                    "e": "error",
+                    "type": e.__class__.__name__,
+                    "m": f"{e}",
+                })
+                break
+            await self._queue.put(msg)
+
+    async def _route(self, msg):
+        """Route a combined stream envelope to the manager of its symbol"""
+        if not msg:
+            return None
+        if msg.get("e") == "error":
+            self._log.error(f"Error in multi depth cache event: {msg}")
+            return msg
+        data = msg.get("data") or {}
+        symbol = data.get("s") or msg.get("stream", "").split("@", 1)[0].upper()
+        dcm = self._managers.get(symbol)
+        if dcm is None:
+            self._log.debug(f"Ignoring depth event for unknown symbol {symbol}")
+            return None
+        return await dcm._depth_event(data)
+
+    def _schedule_resync(
+        self, dcm: BaseDepthCacheManager, priority: int = SnapshotScheduler.PRIORITY_INVALID
+    ):
+        symbol = dcm.get_symbol()
+        if symbol in self._resync_tasks:
+            return
+        task = asyncio.create_task(self._resync_symbol(dcm, priority))
+        self._resync_tasks[symbol] = task
+        task.add_done_callback(lambda _: self._resync_tasks.pop(symbol, None))
+
+    async def _resync_symbol(
+        self, dcm: BaseDepthCacheManager, priority: int = SnapshotScheduler.PRIORITY_INVALID
+    ):
+        """Fetch snapshots for one symbol until it is back in sync, other symbols keep streaming
+
+        After ``MAX_RESYNC_ATTEMPTS`` an error is queued, the buffer dropped and the next message
+        of the symbol starts over.
+        """
+        for attempt in range(1, self.MAX_RESYNC_ATTEMPTS + 1):
+            try:
+                await dcm._init_cache(priority)
+                if dcm._last_update_id is not None:
+                    return
+                # a gap found while replaying the buffer makes the book invalid again
+                priority = SnapshotScheduler.PRIORITY_INVALID
+                reason = "snapshot lags the depth stream"
+            except Exception as e:
+                reason = f"{e}"
+            if attempt == self.MAX_RESYNC_ATTEMPTS:
+                break
+            wait = min(2**attempt, self.MAX_RESYNC_WAIT)
+            self._log.warning(
+                f"Failed to resync depth cache for {dcm.get_symbol()}: {reason}, retrying in {wait}s"
+            )
+            await asyncio.sleep(wait)
+        dcm._last_update_id = None
+        dcm._depth_message_buffer = []
+        dcm._resync_failed = True
+        assert self._queue
+        await self._queue.put({
+            "e": "error",
+            "type": BinanceDepthCacheOutOfSync.__name__,
+            "m": f"{dcm.get_symbol()} not in sync after {self.MAX_RESYNC_ATTEMPTS} attempts: {reason}",
+        })
+
+    def get_depth_cache(self, symbol: str) -> Optional[DepthCache]:
+        """Get the current depth cache of a symbol
+
+        :return: DepthCache object, None while the first snapshot is being fetched
+        """
+        dcm = self._managers.get(symbol.upper())
+        return dcm.get_depth_cache() if dcm else None
+
+    def get_symbols(self) -> List[str]:
+        """Get the symbols of the depth caches
+
+        :return: list of symbols
+        """
+        return list(self._managers)
+
+    async def close(self):
+        """Close the open sockets and background tasks
+
+        :return:
+        """
+        await self.__aexit__(None, None, None)
+
+
+class MultiFuturesDepthCacheManager(MultiDepthCacheManager):
+    """Diff based depth caches for many futures symbols over combined stream connections"""
+
+    MAX_STREAMS_PER_CONNECTION = 200
+    SNAPSHOT_WEIGHT_PER_MINUTE = 1920
+
+    def __init__(
+        self,
+        client,
+        symbols: List[str],
+        futures_type: FuturesType = FuturesType.USD_M,
+        limit: int = 1000,
+        ws_interval: Optional[int] = 100,
+        **kwargs,
+    ):
+        """Create a MultiFuturesDepthCacheManager instance
+
+        Takes the same parameters as MultiDepthCacheManager
+
+        :param futures_type: use USD-M or COIN-M futures default USD-M
+        :type futures_type: FuturesType
+        :param limit: Optional number of orders to get from the order book snapshots, default 1000
+        :type limit: int
+        :param ws_interval: Optional interval for diff updates on websocket, default 100.
+            Must be None (250ms), 100 (100ms) or 500 (500ms).
+        :type ws_interval: int
+        """
+        self._futures_type = futures_type
+        super().__init__(client, symbols, limit=limit, ws_interval=ws_interval, **kwargs)
+
+    def _create_manager(self, symbol: str) -> BaseDepthCacheManager:
+        return _MultiplexedFuturesDepthCacheManager(
+            self,
+            client=self._client,
+            symbol=symbol,
+            loop=self._loop,
+            refresh_interval=self._refresh_interval,
+            bm=self._bm,
+            limit=self._limit,
+            conv_type=self._conv_type,
+            ws_interval=self._ws_interval,
+            integer_ticks=self._integer_ticks,
+            snapshot_scheduler=self._snapshot_scheduler,
+            futures_type=self._futures_type,
+        )
+
+    def _get_socket(self, streams: List[str]):
+        return self._bm.futures_multiplex_socket(streams, futures_type=self._futures_type)
+
+
 class ThreadedDepthCacheManager(ThreadedApiManager):
     def __init__(
         self,
@@ -487,6 +1336,7 @@ class ThreadedDepthCacheManager(ThreadedApiManager):
         limit=10,
         conv_type=float,
         ws_interval=0,
+        integer_ticks: bool = False,
     ) -> str:
         return self._start_depth_cache(
             dcm_class=DepthCacheManager,
@@ -497,16 +1347,55 @@ class ThreadedDepthCacheManager(ThreadedApiManager):
             limit=limit,
             conv_type=conv_type,
             ws_interval=ws_interval,
+            integer_ticks=integer_ticks,
         )
 
+    def start_multi_depth_cache(
+        self,
+        callback: Callable,
+        symbols: List[str],
+        refresh_interval=None,
+        bm=None,
+        limit=500,
+        conv_type=float,
+        ws_interval=0,
+        integer_ticks: bool = False,
+    ) -> str:
+        """Start depth caches for many symbols over shared combined stream connections
+
+        The callback receives the DepthCache of the symbol that was updated.
+        """
+        while not self._client:
+            time.sleep(0.01)
+
+        dcm = MultiDepthCacheManager(
+            client=self._client,
+            symbols=symbols,
+            loop=self._loop,
+            refresh_interval=refresh_interval,
+            bm=bm,
+            limit=limit,
+            conv_type=conv_type,
+            ws_interval=ws_interval,
+            integer_ticks=integer_ticks,
+        )
+        path = "/".join(s.lower() for s in dcm.get_symbols()) + "@depth" + str(limit)
+        self._socket_running[path] = True
+        self._loop.call_soon(
+            asyncio.create_task, self.start_listener(dcm, path, callback)
+        )
+        return path
+
     def start_futures_depth_socket(
         self,
         callback: Callable,
         symbol: str,
         refresh_interval=None,
         bm=None,
-        limit=10,
+        limit=1000,
         conv_type=float,
+        ws_interval=100,
+        futures_type: FuturesType = FuturesType.USD_M,
     ) -> str:
         return self._start_depth_cache(
             dcm_class=FuturesDepthCacheManager,
@@ -516,6 +1405,8 @@ class ThreadedDepthCacheManager(ThreadedApiManager):
             bm=bm,
             limit=limit,
             conv_type=conv_type,
+            ws_interval=ws_interval,
+            futures_type=futures_type,
         )
 
     def start_options_depth_socket(
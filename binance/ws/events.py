@@ -0,0 +1,235 @@
+"""Typed events for market data streams
+
+An event wraps the decoded message and reads its fields when they are accessed, converting
+numeric fields to float, so building one only adds a small object to the plain dict. Depth
+levels are converted when ``bids`` or ``asks`` is read. Events from combined streams keep
+the stream name in ``stream``. Use them by passing ``typed=True`` to the matching
+``BinanceSocketManager`` socket, or build a websocket decoder with ``make_decoder``.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from binance.helpers import json_loads
+
+
+def _unwrap(msg: Dict) -> Tuple[Any, Optional[str]]:
+    # combined streams wrap the payload as {"stream": ..., "data": ...}
+    if "stream" in msg and "data" in msg:
+        return msg["data"], msg["stream"]
+    return msg, None
+
+
+def _field(key: str, convert: Optional[Callable] = None) -> property:
+    if convert:
+        return property(lambda self: convert(self._msg[key]))
+    return property(lambda self: self._msg[key])
+
+
+def _optional_field(key: str, convert: Optional[Callable] = None) -> property:
+    # fields only sent on some markets, e.g. the event time of the futures book ticker
+    if convert:
+        return property(lambda self: convert(self._msg[key]) if self._msg.get(key) else None)
+    return property(lambda self: self._msg.get(key))
+
+
+def _levels(levels: List) -> List[Tuple[float, float]]:
+    return [(float(price), float(qty)) for price, qty in levels]
+
+
+class _Event:
+    __slots__ = ("_msg", "symbol", "stream")
+
+    def __init__(self, msg: Dict, stream: Optional[str] = None):
+        self._msg = msg
+        # also checks the message is an event
+        self.symbol = msg["s"]
+        # name of the combined stream the event came from
+        self.stream = stream
+
+    @property
+    def msg(self) -> Dict:
+        """The decoded message with every field"""
+        return self._msg
+
+
+class BookTicker(_Event):
+    __slots__ = ()
+
+    update_id = _field("u")
+    bid_price = _field("b", float)
+    bid_qty = _field("B", float)
+    ask_price = _field("a", float)
+    ask_qty = _field("A", float)
+    # only sent on the futures streams
+    event_time = _optional_field("E")
+    transaction_time = _optional_field("T")
+
+    def __repr__(self):
+        return (
+            f"BookTicker({self.symbol} {self.bid_qty}@{self.bid_price} / "
+            f"{self.ask_qty}@{self.ask_price} u={self.update_id})"
+        )
+
+
+class AggTrade(_Event):
+    __slots__ = ()
+
+    event_time = _field("E")
+    agg_trade_id = _field("a")
+    price = _field("p", float)
+    quantity = _field("q", float)
+    first_trade_id = _field("f")
+    last_trade_id = _field("l")
+    trade_time = _field("T")
+    is_buyer_maker = _field("m")
+
+    def __repr__(self):
+        return f"AggTrade({self.symbol} {self.quantity}@{self.price} a={self.agg_trade_id})"
+
+
+class DepthDiff(_Event):
+    __slots__ = ()
+
+    event_time = _field("E")
+    first_update_id = _field("U")
+    final_update_id = _field("u")
+    # only sent on the futures streams
+    prev_final_update_id = _optional_field("pu")
+    # converted to (price, quantity) floats on each access
+    bids = _field("b", _levels)
+    asks = _field("a", _levels)
+
+    def __repr__(self):
+        return (
+            f"DepthDiff({self.symbol} U={self.first_update_id} u={self.final_update_id} "
+            f"bids={len(self._msg['b'])} asks={len(self._msg['a'])})"
+        )
+
+
+class MarkPrice(_Event):
+    __slots__ = ()
+
+    event_time = _field("E")
+    mark_price = _field("p", float)
+    index_price = _optional_field("i", float)
+    estimated_settle_price = _optional_field("P", float)
+    funding_rate = _optional_field("r", float)
+    next_funding_time = _field("T")
+
+    def __repr__(self):
+        return f"MarkPrice({self.symbol} {self.mark_price} r={self.funding_rate})"
+
+
+def _kline_field(key: str, convert: Optional[Callable] = None) -> property:
+    if convert:
+        return property(lambda self: convert(self._kline[key]))
+    return property(lambda self: self._kline[key])
+
+
+class Kline(_Event):
+    __slots__ = ("_kline",)
+
+    def __init__(self, msg: Dict, stream: Optional[str] = None):
+        self._msg = msg
+        self._kline = msg["k"]
+        # continuous klines have a pair instead of a symbol
+        self.symbol = msg.get("s") or msg.get("ps")
+        self.stream = stream
+
+    event_time = _field("E")
+    interval = _kline_field("i")
+    start_time = _kline_field("t")
+    close_time = _kline_field("T")
+    open = _kline_field("o", float)
+    high = _kline_field("h", float)
+    low = _kline_field("l", float)
+    close = _kline_field("c", float)
+    volume = _kline_field("v", float)
+    quote_volume = _kline_field("q", float)
+    trades = _kline_field("n")
+    taker_buy_volume = _kline_field("V", float)
+    taker_buy_quote_volume = _kline_field("Q", float)
+    is_closed = _kline_field("x")
+
+    def __repr__(self):
+        return (
+            f"Kline({self.symbol} {self.interval} {self.start_time} "
+            f"o={self.open} h={self.high} l={self.low} c={self.close} closed={self.is_closed})"
+        )
+
+
+def parse_book_ticker(msg: Dict) -> BookTicker:
+    """Parse a spot or futures ``@bookTicker`` message"""
+    return BookTicker(*_unwrap(msg))
+
+
+def parse_agg_trade(msg: Dict) -> AggTrade:
+    """Parse a spot or futures ``@aggTrade`` message"""
+    return AggTrade(*_unwrap(msg))
+
+
+def parse_depth_diff(msg: Dict) -> DepthDiff:
+    """Parse a spot or futures ``@depth`` diff message"""
+    return DepthDiff(*_unwrap(msg))
+
+
+def parse_mark_price(msg: Union[Dict, List]) -> Union[MarkPrice, List[MarkPrice]]:
+    """Parse a ``@markPrice`` message, or the list sent by ``!markPrice@arr``"""
+    stream = None
+    if isinstance(msg, dict):
+        msg, stream = _unwrap(msg)
+    if isinstance(msg, list):
+        return [MarkPrice(item, stream) for item in msg]
+    return MarkPrice(msg, stream)
+
+
+def parse_kline(msg: Dict) -> Kline:
+    """Parse a spot or futures ``@kline_<interval>`` message"""
+    return Kline(*_unwrap(msg))
+
+
+EVENT_PARSERS: Dict[str, Callable[[Any], Any]] = {
+    "bookTicker": parse_book_ticker,
+    "aggTrade": parse_agg_trade,
+    "depthUpdate": parse_depth_diff,
+    "markPriceUpdate": parse_mark_price,
+    "kline": parse_kline,
+    "continuous_kline": parse_kline,
+}
+
+
+def parse_event(msg: Any):
+    """Parse any supported event, other messages are returned unchanged
+
+    Used for combined streams which can mix event types.
+    """
+    if isinstance(msg, list):
+        return [parse_event(item) for item in msg]
+    data, _ = _unwrap(msg)
+    if not isinstance(data, dict):
+        return msg
+    # the parsers unwrap the envelope themselves to keep the stream name
+    parser = EVENT_PARSERS.get(data.get("e"))  # type: ignore
+    if parser:
+        return parser(msg)
+    if "e" not in data and "u" in data and "B" in data and "A" in data:
+        # spot book ticker has no event type
+        return parse_book_ticker(msg)
+    return msg
+
+
+def make_decoder(parser: Callable[[Any], Any]) -> Callable[[Union[str, bytes]], Any]:
+    """Build a websocket decoder returning ``parser(json_loads(frame))``
+
+    Messages the parser does not understand, such as subscription responses, are passed through as dicts.
+    """
+
+    def decoder(frame: Union[str, bytes]):
+        msg = json_loads(frame)
+        try:
+            return parser(msg)
+        except (KeyError, TypeError):
+            return msg
+
+    decoder.__name__ = f"decode_{parser.__name__}"
+    return decoder
@@ -7,6 +7,7 @@
 import asyncio
 import time
 import warnings
+from bisect import bisect_left
 from typing import Dict, List, Optional, Callable, Any, Union
 from binance.async_client import AsyncClient
 from binance.ws.streams import BinanceSocketManager
@@ -15,6 +16,124 @@ from binance.ws.constants import WSListenerState
 from binance.enums import FuturesType
 
 
+class PriceLadder:
+    """
+    基于 bisect 维护的有序价格档位（平行数组：价格 / 数量）
+
+    单个档位的新增、更新、删除通过二分查找定位，无需在每次增量更新后对整个
+    订单簿重新排序。对外表现为只读的 [[price, quantity], ...] 序列视图，
+    支持 len()、迭代、下标与切片访问，可直接替代原先的排序列表。
+    """
+
+    __slots__ = ('_keys', '_prices', '_quantities', '_descending', 'max_levels')
+
+    def __init__(self, descending: bool = False, max_levels: Optional[int] = 1000):
+        """
+        Args:
+            descending: 是否按价格降序排列（买单为 True，卖单为 False）
+            max_levels: 视图对外暴露的最大档位数，None 表示不限制
+        """
+        self._descending = descending
+        self.max_levels = max_levels
+        # 排序键（降序时取负价格，保证 _keys 始终升序以便二分查找）
+        self._keys: List[float] = []
+        self._prices: List[float] = []
+        self._quantities: List[float] = []
+
+    def _key(self, price: float) -> float:
+        return -price if self._descending else price
+
+    def update(self, price: float, quantity: float) -> bool:
+        """
+        更新单个价格档位，数量为 0 时删除该档位
+
+        Returns:
+            bool: 档位是否发生变化
+        """
+        key = self._key(price)
+        keys = self._keys
+        i = bisect_left(keys, key)
+        found = i < len(keys) and keys[i] == key
+        if quantity == 0:
+            if not found:
+                return False
+            del keys[i]
+            del self._prices[i]
+            del self._quantities[i]
+            return True
+        if found:
+            self._quantities[i] = quantity
+        else:
+            keys.insert(i, key)
+            self._prices.insert(i, price)
+            self._quantities.insert(i, quantity)
+        return True
+
+    def load(self, levels: Dict[float, float]):
+        """用 {price: quantity} 全量重建档位（仅用于快照或修复）"""
+        items = sorted(levels.items(), reverse=self._descending)
+        self._prices = [price for price, _ in items]
+        self._quantities = [quantity for _, quantity in items]
+        self._keys = [self._key(price) for price in self._prices]
+
+    def clear(self):
+        self._keys = []
+        self._prices = []
+        self._quantities = []
+
+    @property
+    def prices(self) -> List[float]:
+        """按排序顺序排列的价格数组（只读引用）"""
+        return self._prices
+
+    @property
+    def quantities(self) -> List[float]:
+        """与 prices 对应的数量数组（只读引用）"""
+        return self._quantities
+
+    def best(self) -> Optional[List[float]]:
+        """最优档位 [price, quantity]，为空时返回 None"""
+        if not self._prices:
+            return None
+        return [self._prices[0], self._quantities[0]]
+
+    def __len__(self) -> int:
+        n = len(self._prices)
+        if self.max_levels is not None and n > self.max_levels:
+            return self.max_levels
+        return n
+
+    def __bool__(self) -> bool:
+        return bool(self._prices)
+
+    def __getitem__(self, index):
+        n = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(n)
+            return [
+                [self._prices[i], self._quantities[i]]
+                for i in range(start, stop, step)
+            ]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('PriceLadder index out of range')
+        return [self._prices[index], self._quantities[index]]
+
+    def __iter__(self):
+        n = len(self)
+        for i in range(n):
+            yield [self._prices[i], self._quantities[i]]
+
+    def __eq__(self, other):
+        if isinstance(other, PriceLadder):
+            other = other[:]
+        return self[:] == other
+
+    def __repr__(self) -> str:
+        return f"PriceLadder({self[:5]}{'...' if len(self) > 5 else ''})"
+
+
 class OrderBookManager:
     """
     Binance期货1000档订单簿管理器
@@ -56,8 +175,8 @@ class OrderBookManager:
             'symbol': self.symbol,
             'bids_dict': {},  # {price: quantity} - 买单字典
             'asks_dict': {},  # {price: quantity} - 卖单字典
-            'bids': [],       # [[price, quantity], ...] - 排序后的买单列表（降序）
-            'asks': [],       # [[price, quantity], ...] - 排序后的卖单列表（升序）
+            'bids': PriceLadder(descending=True),   # [[price, quantity], ...] - 有序买单视图（降序）
+            'asks': PriceLadder(descending=False),  # [[price, quantity], ...] - 有序卖单视图（升序）
             'last_update_id': 0,
             'timestamp': None
         }
@@ -151,28 +270,24 @@ class OrderBookManager:
             self.rest_snapshot_count += 1
             depth = await self.client.futures_order_book(symbol=self.symbol, limit=1000)
             
-            # 构建买单字典和列表（买单按价格降序排列）
+            # 构建买单字典（买单按价格降序排列）
             bids_dict = {}
-            bids_list = []
             for bid in depth['bids']:
-                price, quantity = float(bid[0]), float(bid[1])
-                bids_dict[price] = quantity
-                bids_list.append([price, quantity])
-            
-            # 构建卖单字典和列表（卖单按价格升序排列）
+                bids_dict[float(bid[0])] = float(bid[1])
+
+            # 构建卖单字典（卖单按价格升序排列）
             asks_dict = {}
-            asks_list = []
             for ask in depth['asks']:
-                price, quantity = float(ask[0]), float(ask[1])
-                asks_dict[price] = quantity
-                asks_list.append([price, quantity])
-            
+                asks_dict[float(ask[0])] = float(ask[1])
+
+            # 快照是唯一需要全量排序的场景，之后的增量更新只做二分插入/删除
+            self.orderbook['bids'].load(bids_dict)
+            self.orderbook['asks'].load(asks_dict)
+
             # 更新订单簿数据
             self.orderbook.update({
                 'bids_dict': bids_dict,
                 'asks_dict': asks_dict,
-                'bids': bids_list,
-                'asks': asks_list,
                 'last_update_id': depth['lastUpdateId'],
                 'timestamp': time.time()
             })
@@ -235,42 +350,37 @@ class OrderBookManager:
             should_apply = contiguous_by_pu or bridging_by_range
 
             if should_apply:
-                # 标记是否需要重建排序列表
-                bids_changed = False
-                asks_changed = False
-                
-                # 更新买单字典
+                bids_dict = self.orderbook['bids_dict']
+                asks_dict = self.orderbook['asks_dict']
+                bids_ladder = self.orderbook['bids']
+                asks_ladder = self.orderbook['asks']
+
+                # 更新买单字典与有序档位（O(log n) 定位，无需全量重排）
                 for bid in msg.get('b', []):
                     price, quantity = float(bid[0]), float(bid[1])
                     if quantity == 0:
                         # 删除订单
-                        if price in self.orderbook['bids_dict']:
-                            del self.orderbook['bids_dict'][price]
-                            bids_changed = True
+                        if price in bids_dict:
+                            del bids_dict[price]
+                            bids_ladder.update(price, 0)
                     else:
                         # 新增或更新订单
-                        self.orderbook['bids_dict'][price] = quantity
-                        bids_changed = True
-                
-                # 更新卖单字典
+                        bids_dict[price] = quantity
+                        bids_ladder.update(price, quantity)
+
+                # 更新卖单字典与有序档位
                 for ask in msg.get('a', []):
                     price, quantity = float(ask[0]), float(ask[1])
                     if quantity == 0:
                         # 删除订单
-                        if price in self.orderbook['asks_dict']:
-                            del self.orderbook['asks_dict'][price]
-                            asks_changed = True
+                        if price in asks_dict:
+                            del asks_dict[price]
+                            asks_ladder.update(price, 0)
                     else:
                         # 新增或更新订单
-                        self.orderbook['asks_dict'][price] = quantity
-                        asks_changed = True
-                
-                # 重建排序列表（仅在有变化时）
-                if bids_changed:
-                    self._rebuild_bids_list()
-                if asks_changed:
-                    self._rebuild_asks_list()
-                
+                        asks_dict[price] = quantity
+                        asks_ladder.update(price, quantity)
+
                 # 更新元数据
                 self.orderbook['last_update_id'] = final_update_id
                 self.orderbook['timestamp'] = time.time()
@@ -284,20 +394,12 @@ class OrderBookManager:
             print(f"❌ 处理深度更新失败: {e}")
     
     def _rebuild_bids_list(self):
-        """重建买单排序列表（按价格降序）"""
-        self.orderbook['bids'] = sorted(
-            [[price, quantity] for price, quantity in self.orderbook['bids_dict'].items()],
-            key=lambda x: x[0],
-            reverse=True
-        )[:1000]  # 保持1000档
+        """根据买单字典全量重建有序买单档位（按价格降序）"""
+        self.orderbook['bids'].load(self.orderbook['bids_dict'])
     
     def _rebuild_asks_list(self):
-        """重建卖单排序列表（按价格升序）"""
-        self.orderbook['asks'] = sorted(
-            [[price, quantity] for price, quantity in self.orderbook['asks_dict'].items()],
-            key=lambda x: x[0],
-            reverse=False
-        )[:1000]  # 保持1000档
+        """根据卖单字典全量重建有序卖单档位（按价格升序）"""
+        self.orderbook['asks'].load(self.orderbook['asks_dict'])
     
     def validate_orderbook(self) -> Dict[str, Any]:
         """
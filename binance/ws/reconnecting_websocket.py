@@ -1,19 +1,13 @@
 import asyncio
 import gzip
+import inspect
 import json
 import logging
 from socket import gaierror
-from typing import Optional
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Union
 from asyncio import sleep
 from random import random
 
-# load orjson if available, otherwise default to json
-orjson = None
-try:
-    import orjson as orjson
-except ImportError:
-    pass
-
 try:
     from websockets.exceptions import ConnectionClosedError  # type: ignore
 except ImportError:
@@ -38,8 +32,66 @@ from binance.exceptions import (
     BinanceWebsocketQueueOverflow,
     ReadLoopClosed,
 )
-from binance.helpers import get_loop
-from binance.ws.constants import WSListenerState
+from binance.helpers import get_loop, json_loads, orjson
+from binance.ws.constants import WSListenerState, WSQueueOverflowPolicy
+from binance.ws.events import BookTicker, Kline, MarkPrice
+
+# events that carry the latest state, an older queued message of the same key can be replaced
+CONFLATABLE_EVENTS = {
+    "bookTicker",
+    "kline",
+    "continuous_kline",
+    "markPriceUpdate",
+    "indexPriceUpdate",
+    "24hrTicker",
+    "24hrMiniTicker",
+    "partialDepth",
+}
+
+
+def default_conflate_key(msg) -> Optional[Hashable]:
+    """Conflation key of a message, None if the message must not be conflated
+
+    State events are keyed by stream, event type, symbol and kline interval. Trades and
+    depth diffs return None as every one of them is needed.
+    """
+    if isinstance(msg, (BookTicker, MarkPrice)):
+        return (msg.__class__.__name__, msg.symbol)
+    if isinstance(msg, Kline):
+        return ("Kline", msg.symbol, msg.interval)
+    stream = None
+    data = msg
+    if isinstance(msg, dict) and "stream" in msg and "data" in msg:
+        stream = msg["stream"]
+        data = msg["data"]
+    if isinstance(data, list):
+        # all market arrays, e.g. !ticker@arr
+        event = data[0].get("e") if data and isinstance(data[0], dict) else None
+        return (stream, event, "arr") if event in CONFLATABLE_EVENTS else None
+    if not isinstance(data, dict):
+        return None
+    event = data.get("e")
+    if event is None:
+        # spot book ticker and partial book depth have no event type
+        if "u" in data and "B" in data and "A" in data:
+            event = "bookTicker"
+        elif "lastUpdateId" in data:
+            event = "partialDepth"
+    if event not in CONFLATABLE_EVENTS:
+        return None
+    kline = data.get("k")
+    interval = kline.get("i") if isinstance(kline, dict) else None
+    return (stream, event, data.get("s") or data.get("ps"), interval)
+
+
+class _ConflatedMessage:
+    """Queue slot whose message is replaced by newer messages of the same key"""
+
+    __slots__ = ("key", "msg")
+
+    def __init__(self, key: Hashable, msg):
+        self.key = key
+        self.msg = msg
 
 
 class ReconnectingWebsocket:
@@ -58,8 +110,24 @@ class ReconnectingWebsocket:
         exit_coro=None,
         https_proxy: Optional[str] = None,
         max_queue_size: int = 100,
+        raw: bool = False,
+        decoder: Optional[Callable[[Union[str, bytes]], Any]] = None,
+        overflow_policy: Union[WSQueueOverflowPolicy, str] = WSQueueOverflowPolicy.RAISE,
+        conflate_key: Optional[Callable[[Any], Optional[Hashable]]] = None,
         **kwargs,
     ):
+        """
+        :param raw: Optional, queue frames as received without decompressing or decoding them, default False
+        :type raw: bool
+        :param decoder: Optional callable used instead of json_loads to decode each (decompressed) frame,
+            it receives bytes when the connection supports it. Frames it decodes to a falsy value are dropped
+        :type decoder: callable
+        :param overflow_policy: Optional, what to do when the queue holds max_queue_size messages, default RAISE
+        :type overflow_policy: WSQueueOverflowPolicy
+        :param conflate_key: Optional callable returning the conflation key of a message, or None if it must
+            be kept, used with the CONFLATE policy, default default_conflate_key
+        :type conflate_key: callable
+        """
         self._loop = get_loop()
         self._log = logging.getLogger(__name__)
         self._path = path
@@ -77,6 +145,16 @@ class ReconnectingWebsocket:
         self._https_proxy = https_proxy
         self._ws_kwargs = kwargs
         self.max_queue_size = max_queue_size
+        self.overflow_policy = WSQueueOverflowPolicy(overflow_policy)
+        if self.overflow_policy == WSQueueOverflowPolicy.BLOCK:
+            self._queue = asyncio.Queue(maxsize=max_queue_size)
+        self.conflate_key = conflate_key or default_conflate_key
+        self._conflated: Dict[Hashable, _ConflatedMessage] = {}
+        self.dropped_messages = 0
+        self.conflated_messages = 0
+        self.raw = raw
+        self.decoder = decoder
+        self._recv_kwargs: Dict[str, Any] = {}
 
     def json_dumps(self, msg) -> str:
         if orjson:
@@ -84,9 +162,7 @@ class ReconnectingWebsocket:
         return json.dumps(msg)
 
     def json_loads(self, msg):
-        if orjson:
-            return orjson.loads(msg)
-        return json.loads(msg)
+        return json_loads(msg)
 
     async def __aenter__(self):
         await self.connect()
@@ -137,6 +213,7 @@ class ReconnectingWebsocket:
             raise e
         self.ws_state = WSListenerState.STREAMING
         self._reconnects = 0
+        self._recv_kwargs = self._get_recv_kwargs()
         await self._after_connect()
         if not self._handle_read_loop:
             self._handle_read_loop = self._loop.call_soon_threadsafe(
@@ -155,7 +232,18 @@ class ReconnectingWebsocket:
     async def _after_connect(self):
         pass
 
+    def _get_recv_kwargs(self) -> Dict[str, Any]:
+        # receive text frames as bytes when the connection supports it, skipping the utf-8 decode,
+        # json_loads and orjson accept bytes directly
+        try:
+            params = inspect.signature(self.ws.recv).parameters  # type: ignore
+        except (TypeError, ValueError):
+            return {}
+        return {"decode": False} if "decode" in params else {}
+
     def _handle_message(self, evt):
+        if self.raw:
+            return evt
         if self._is_binary:
             try:
                 evt = gzip.decompress(evt)
@@ -166,6 +254,8 @@ class ReconnectingWebsocket:
                 self._log.error(f"Unexpected decompression error: {(e)}")
                 raise
         try:
+            if self.decoder:
+                return self.decoder(evt)
             return self.json_loads(evt)
         except ValueError as e:
             self._log.error(f"JSON Value Error parsing message: Error: {(e)}")
@@ -200,27 +290,18 @@ class ReconnectingWebsocket:
                     elif self.ws_state == WSListenerState.STREAMING:
                         assert self.ws
                         res = await asyncio.wait_for(
-                            self.ws.recv(), timeout=self.TIMEOUT
+                            self.ws.recv(**self._recv_kwargs), timeout=self.TIMEOUT
                         )
                         res = self._handle_message(res)
-                        self._log.debug(f"Received message: {res}")
+                        self._log.debug("Received message: %s", res)
                         if res:
-                            if self._queue.qsize() < self.max_queue_size:
-                                await self._queue.put(res)
-                            else:
-                                raise BinanceWebsocketQueueOverflow(
-                                    f"Message queue size {self._queue.qsize()} exceeded maximum {self.max_queue_size}"
-                                )
+                            await self._enqueue(res)
                 except asyncio.TimeoutError:
                     self._log.debug(f"no message in {self.TIMEOUT} seconds")
                     # _no_message_received_reconnect
                 except asyncio.CancelledError as e:
                     self._log.debug(f"_read_loop cancelled error {e}")
-                    await self._queue.put({
-                        "e": "error",
-                        "type": f"{e.__class__.__name__}",
-                        "m": f"{e}",
-                    })
+                    self._put_error(e)
                     break
                 except (
                     asyncio.IncompleteReadError,
@@ -230,11 +311,7 @@ class ReconnectingWebsocket:
                 ) as e:
                     # reports errors and continue loop
                     self._log.error(f"{e.__class__.__name__} ({e})")
-                    await self._queue.put({
-                        "e": "error",
-                        "type": f"{e.__class__.__name__}",
-                        "m": f"{e}",
-                    })
+                    self._put_error(e)
                 except (
                     BinanceWebsocketUnableToConnect,
                     BinanceWebsocketQueueOverflow,
@@ -242,11 +319,7 @@ class ReconnectingWebsocket:
                 ) as e:
                     # reports errors and break the loop
                     self._log.error(f"Unknown exception: {e.__class__.__name__} ({e})")
-                    await self._queue.put({
-                        "e": "error",
-                        "type": e.__class__.__name__,
-                        "m": f"{e}",
-                    })
+                    self._put_error(e)
                     break
         except Exception as e:
             self._log.error(f"Unknown exception: {e.__class__.__name__} ({e})")
@@ -254,6 +327,61 @@ class ReconnectingWebsocket:
             self._handle_read_loop = None  # Signal the coro is stopped
             self._reconnects = 0
 
+    async def _enqueue(self, msg):
+        """Queue a message applying the overflow policy"""
+        policy = self.overflow_policy
+        if policy == WSQueueOverflowPolicy.BLOCK:
+            await self._queue.put(msg)
+            return
+        if policy == WSQueueOverflowPolicy.CONFLATE:
+            key = self.conflate_key(msg)
+            if key is not None:
+                slot = self._conflated.get(key)
+                if slot:
+                    slot.msg = msg
+                    self.conflated_messages += 1
+                    return
+                msg = self._conflated[key] = _ConflatedMessage(key, msg)
+        if self._queue.qsize() >= self.max_queue_size:
+            if policy == WSQueueOverflowPolicy.RAISE:
+                raise BinanceWebsocketQueueOverflow(
+                    f"Message queue size {self._queue.qsize()} exceeded maximum {self.max_queue_size}"
+                )
+            self.dropped_messages += 1
+            if policy == WSQueueOverflowPolicy.DROP_NEWEST:
+                if isinstance(msg, _ConflatedMessage):
+                    del self._conflated[msg.key]
+                return
+            self._dequeue(self._queue.get_nowait())
+        self._queue.put_nowait(msg)
+
+    def _put_error(self, e: BaseException):
+        """Queue an error without waiting, dropping the oldest message when the queue is full"""
+        msg = {"e": "error", "type": e.__class__.__name__, "m": f"{e}"}
+        try:
+            self._queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            # a stalled consumer must not keep the read loop from reconnecting or exiting
+            self.dropped_messages += 1
+            self._dequeue(self._queue.get_nowait())
+            self._queue.put_nowait(msg)
+
+    def _dequeue(self, item):
+        """Unwrap a queued item"""
+        if isinstance(item, _ConflatedMessage):
+            self._conflated.pop(item.key, None)
+            return item.msg
+        return item
+
+    @property
+    def overflow_stats(self) -> Dict[str, int]:
+        """Counters of the messages dropped or conflated by the overflow policy"""
+        return {
+            "dropped": self.dropped_messages,
+            "conflated": self.conflated_messages,
+            "queued": self._queue.qsize(),
+        }
+
     async def _run_reconnect(self):
         await self.before_reconnect()
         if self._reconnects < self.MAX_RECONNECTS:
@@ -275,16 +403,82 @@ class ReconnectingWebsocket:
     async def recv(self):
         res = None
         while not res:
-            if not self._handle_read_loop:
-                raise ReadLoopClosed(
-                    "Read loop has been closed, please reset the websocket connection and listen to the message error."
-                )
+            self._check_read_loop()
             try:
-                res = await asyncio.wait_for(self._queue.get(), timeout=self.TIMEOUT)
-            except asyncio.TimeoutError:
-                self._log.debug(f"no message in {self.TIMEOUT} seconds")
+                # a queued message needs no timer
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=self.TIMEOUT)
+                except asyncio.TimeoutError:
+                    self._log.debug(f"no message in {self.TIMEOUT} seconds")
+                    continue
+            res = self._dequeue(item)
         return res
 
+    async def recv_many(self, max_n: int = 100, timeout: Optional[float] = None) -> List:
+        """Wait for a message, then return it together with the messages already queued
+
+        Like recv, empty messages are skipped.
+
+        :param max_n: Optional maximum number of messages to return, default 100
+        :type max_n: int
+        :param timeout: Optional seconds to wait for the first message, default TIMEOUT, 0 to only take the
+            messages already queued
+        :type timeout: float
+        :return: list of up to max_n messages in arrival order, empty if none arrived within the timeout
+        """
+        timeout = self.TIMEOUT if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        msgs: List = []
+        while not msgs:
+            self._check_read_loop()
+            items = []
+            if self._queue.empty():
+                try:
+                    items.append(
+                        await asyncio.wait_for(
+                            self._queue.get(), timeout=max(deadline - loop.time(), 0)
+                        )
+                    )
+                except asyncio.TimeoutError:
+                    return []
+            while len(items) < max_n:
+                try:
+                    items.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            msgs = [msg for msg in map(self._dequeue, items) if msg]
+        return msgs
+
+    async def iter_batches(
+        self, max_n: int = 100, timeout: Optional[float] = None
+    ) -> AsyncIterator[List]:
+        """Async iterator over batches of messages from recv_many
+
+        .. code-block:: python
+
+            async for msgs in socket.iter_batches():
+                for msg in msgs:
+                    ...
+
+        :param max_n: Optional maximum number of messages per batch, default 100
+        :type max_n: int
+        :param timeout: Optional seconds to wait for each batch, default TIMEOUT
+        :type timeout: float
+        """
+        while True:
+            msgs = await self.recv_many(max_n, timeout)
+            if msgs:
+                yield msgs
+
+    def _check_read_loop(self):
+        if not self._handle_read_loop:
+            raise ReadLoopClosed(
+                "Read loop has been closed, please reset the websocket connection and listen to the message error."
+            )
+
     async def _wait_for_reconnect(self):
         while (
             self.ws_state != WSListenerState.STREAMING
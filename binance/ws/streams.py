@@ -3,7 +3,16 @@ import time
 from enum import Enum
 from typing import Optional, List, Dict, Callable, Any
 
-from binance.ws.constants import KEEPALIVE_TIMEOUT
+from binance.ws.constants import KEEPALIVE_TIMEOUT, WSQueueOverflowPolicy
+from binance.ws.events import (
+    make_decoder,
+    parse_agg_trade,
+    parse_book_ticker,
+    parse_depth_diff,
+    parse_event,
+    parse_kline,
+    parse_mark_price,
+)
 from binance.ws.keepalive_websocket import KeepAliveWebsocket
 from binance.ws.reconnecting_websocket import ReconnectingWebsocket
 from binance.ws.threaded_stream import ThreadedApiManager
@@ -44,6 +53,10 @@ class BinanceSocketManager:
         client: AsyncClient, 
         user_timeout=KEEPALIVE_TIMEOUT,
         max_queue_size: int = 100,
+        raw: bool = False,
+        decoder: Optional[Callable] = None,
+        overflow_policy: WSQueueOverflowPolicy = WSQueueOverflowPolicy.RAISE,
+        conflate_key: Optional[Callable] = None,
     ):
         """Initialise the BinanceSocketManager
 
@@ -52,6 +65,15 @@ class BinanceSocketManager:
         :param user_timeout: Timeout for user socket in seconds
         :param max_queue_size: Max size of the websocket queue, defaults to 100
         :type max_queue_size: int
+        :param raw: Optional, market data sockets return frames as received instead of dicts, default False
+        :type raw: bool
+        :param decoder: Optional callable replacing json_loads for market data sockets, e.g. orjson.loads
+            or a function extracting a few fields
+        :type decoder: callable
+        :param overflow_policy: Optional, what market data sockets do when their queue is full, default RAISE
+        :type overflow_policy: WSQueueOverflowPolicy
+        :param conflate_key: Optional callable returning the conflation key of a message for the CONFLATE policy
+        :type conflate_key: callable
         """
         self.STREAM_URL = self.STREAM_URL.format(client.tld)
         self.FSTREAM_URL = self.FSTREAM_URL.format(client.tld)
@@ -65,6 +87,10 @@ class BinanceSocketManager:
         self.testnet = self._client.testnet
         self.demo = self._client.demo
         self._max_queue_size = max_queue_size
+        self._raw = raw
+        self._decoder = decoder
+        self._overflow_policy = overflow_policy
+        self._conflate_key = conflate_key
         self.ws_kwargs = {}
 
     def _get_stream_url(self, stream_url: Optional[str] = None):
@@ -84,8 +110,12 @@ class BinanceSocketManager:
         prefix: str = "ws/",
         is_binary: bool = False,
         socket_type: BinanceSocketType = BinanceSocketType.SPOT,
+        decoder: Optional[Callable] = None,
     ) -> ReconnectingWebsocket:
         conn_id = f"{socket_type}_{path}"
+        if decoder:
+            # typed and plain sockets for the same stream are separate connections
+            conn_id = f"{conn_id}_{decoder.__name__}"
         time_unit = getattr(self._client, "TIME_UNIT", None)
         if time_unit:
             path = f"{path}?timeUnit={time_unit}"
@@ -94,10 +124,14 @@ class BinanceSocketManager:
                 path=path,
                 url=self._get_stream_url(stream_url),
                 prefix=prefix,
-                exit_coro=lambda p: self._exit_socket(f"{socket_type}_{p}"),
+                exit_coro=lambda p: self._exit_socket(conn_id),
                 is_binary=is_binary,
                 https_proxy=self._client.https_proxy,
                 max_queue_size=self._max_queue_size,
+                raw=self._raw,
+                decoder=decoder or self._decoder,
+                overflow_policy=self._overflow_policy,
+                conflate_key=self._conflate_key,
                 **self.ws_kwargs,
             )
 
@@ -127,7 +161,11 @@ class BinanceSocketManager:
         return self._conns[conn_id]
 
     def _get_futures_socket(
-        self, path: str, futures_type: FuturesType, prefix: str = "stream?streams="
+        self,
+        path: str,
+        futures_type: FuturesType,
+        prefix: str = "stream?streams=",
+        decoder: Optional[Callable] = None,
     ):
         socket_type: BinanceSocketType = BinanceSocketType.USD_M_FUTURES
         if futures_type == FuturesType.USD_M:
@@ -142,7 +180,13 @@ class BinanceSocketManager:
                 stream_url = self.DSTREAM_TESTNET_URL
             elif self.demo:
                 stream_url = self.DSTREAM_DEMO_URL
-        return self._get_socket(path, stream_url, prefix, socket_type=socket_type)
+        return self._get_socket(
+            path, stream_url, prefix, socket_type=socket_type, decoder=decoder
+        )
+
+    @staticmethod
+    def _get_decoder(typed: bool, parser: Callable) -> Optional[Callable]:
+        return make_decoder(parser) if typed else None
 
     def _get_options_socket(self, path: str, prefix: str = "ws/"):
         stream_url = self.OPTIONS_URL
@@ -158,7 +202,11 @@ class BinanceSocketManager:
         await self._stop_socket(path)
 
     def depth_socket(
-        self, symbol: str, depth: Optional[str] = None, interval: Optional[int] = None
+        self,
+        symbol: str,
+        depth: Optional[str] = None,
+        interval: Optional[int] = None,
+        typed: bool = False,
     ):
         """Start a websocket for symbol market depth returning either a diff or a partial book
 
@@ -170,6 +218,8 @@ class BinanceSocketManager:
         :type depth: str
         :param interval: optional interval for updates, default None. If not set, updates happen every second. Must be 0, None (1s) or 100 (100ms)
         :type interval: int
+        :param typed: optional, return diffs as binance.ws.events.DepthDiff objects, default False
+        :type typed: bool
 
         :returns: connection key string if successful, False otherwise
 
@@ -233,9 +283,15 @@ class BinanceSocketManager:
                 raise ValueError(
                     "Websocket interval value not allowed. Allowed values are [0, 100]"
                 )
-        return self._get_socket(socket_name)
+        if typed and depth:
+            raise ValueError("Typed events are only available for the diff depth stream")
+        return self._get_socket(
+            socket_name, decoder=self._get_decoder(typed, parse_depth_diff)
+        )
 
-    def kline_socket(self, symbol: str, interval=AsyncClient.KLINE_INTERVAL_1MINUTE):
+    def kline_socket(
+        self, symbol: str, interval=AsyncClient.KLINE_INTERVAL_1MINUTE, typed: bool = False
+    ):
         """Start a websocket for symbol kline data
 
         https://github.com/binance-exchange/binance-official-api-docs/blob/master/web-socket-streams.md#klinecandlestick-streams
@@ -244,6 +300,8 @@ class BinanceSocketManager:
         :type symbol: str
         :param interval: Kline interval, default KLINE_INTERVAL_1MINUTE
         :type interval: str
+        :param typed: optional, return binance.ws.events.Kline objects, default False
+        :type typed: bool
 
         :returns: connection key string if successful, False otherwise
 
@@ -277,7 +335,7 @@ class BinanceSocketManager:
             }
         """
         path = f"{symbol.lower()}@kline_{interval}"
-        return self._get_socket(path)
+        return self._get_socket(path, decoder=self._get_decoder(typed, parse_kline))
 
     def kline_futures_socket(
         self,
@@ -285,6 +343,7 @@ class BinanceSocketManager:
         interval=AsyncClient.KLINE_INTERVAL_1MINUTE,
         futures_type: FuturesType = FuturesType.USD_M,
         contract_type: ContractType = ContractType.PERPETUAL,
+        typed: bool = False,
     ):
         """Start a websocket for symbol kline data for the perpeual futures stream
 
@@ -296,6 +355,7 @@ class BinanceSocketManager:
         :type interval: str
         :param futures_type: use USD-M or COIN-M futures default USD-M
         :param contract_type: use PERPETUAL or CURRENT_QUARTER or NEXT_QUARTER default PERPETUAL
+        :param typed: optional, return binance.ws.events.Kline objects, default False
 
         :returns: connection key string if successful, False otherwise
 
@@ -331,7 +391,12 @@ class BinanceSocketManager:
         """
 
         path = f"{symbol.lower()}_{contract_type.value}@continuousKline_{interval}"
-        return self._get_futures_socket(path, prefix="ws/", futures_type=futures_type)
+        return self._get_futures_socket(
+            path,
+            prefix="ws/",
+            futures_type=futures_type,
+            decoder=self._get_decoder(typed, parse_kline),
+        )
 
     def miniticker_socket(self, update_time: int = 1000):
         """Start a miniticker websocket for all trades
@@ -397,13 +462,15 @@ class BinanceSocketManager:
 
         return self._get_socket(symbol.lower() + "@trade")
 
-    def aggtrade_socket(self, symbol: str):
+    def aggtrade_socket(self, symbol: str, typed: bool = False):
         """Start a websocket for symbol trade data
 
         https://github.com/binance-exchange/binance-official-api-docs/blob/master/web-socket-streams.md#aggregate-trade-streams
 
         :param symbol: required
         :type symbol: str
+        :param typed: optional, return binance.ws.events.AggTrade objects, default False
+        :type typed: bool
 
         :returns: connection key string if successful, False otherwise
 
@@ -426,15 +493,21 @@ class BinanceSocketManager:
             }
 
         """
-        return self._get_socket(symbol.lower() + "@aggTrade")
+        return self._get_socket(
+            symbol.lower() + "@aggTrade", decoder=self._get_decoder(typed, parse_agg_trade)
+        )
 
     def aggtrade_futures_socket(
-        self, symbol: str, futures_type: FuturesType = FuturesType.USD_M
+        self,
+        symbol: str,
+        futures_type: FuturesType = FuturesType.USD_M,
+        typed: bool = False,
     ):
         """Start a websocket for aggregate symbol trade data for the futures stream
 
         :param symbol: required
         :param futures_type: use USD-M or COIN-M futures default USD-M
+        :param typed: optional, return binance.ws.events.AggTrade objects, default False
 
         :returns: connection key string if successful, False otherwise
 
@@ -457,7 +530,9 @@ class BinanceSocketManager:
 
         """
         return self._get_futures_socket(
-            symbol.lower() + "@aggTrade", futures_type=futures_type
+            symbol.lower() + "@aggTrade",
+            futures_type=futures_type,
+            decoder=self._get_decoder(typed, parse_agg_trade),
         )
 
     def symbol_miniticker_socket(self, symbol: str):
@@ -678,12 +753,14 @@ class BinanceSocketManager:
         symbol: str,
         fast: bool = True,
         futures_type: FuturesType = FuturesType.USD_M,
+        typed: bool = False,
     ):
         """Start a websocket for a symbol's futures mark price
         https://binance-docs.github.io/apidocs/futures/en/#mark-price-stream
         :param symbol: required
         :param fast: use faster or 1s default
         :param futures_type: use USD-M or COIN-M futures default USD-M
+        :param typed: optional, return binance.ws.events.MarkPrice objects, default False
         :returns: connection key string if successful, False otherwise
         Message Format
         .. code-block:: python
@@ -698,17 +775,23 @@ class BinanceSocketManager:
         """
         stream_name = "@markPrice@1s" if fast else "@markPrice"
         return self._get_futures_socket(
-            symbol.lower() + stream_name, futures_type=futures_type
+            symbol.lower() + stream_name,
+            futures_type=futures_type,
+            decoder=self._get_decoder(typed, parse_mark_price),
         )
 
     def all_mark_price_socket(
-        self, fast: bool = True, futures_type: FuturesType = FuturesType.USD_M
+        self,
+        fast: bool = True,
+        futures_type: FuturesType = FuturesType.USD_M,
+        typed: bool = False,
     ):
         """Start a websocket for all futures mark price data
         By default all symbols are included in an array.
         https://binance-docs.github.io/apidocs/futures/en/#mark-price-stream-for-all-market
         :param fast: use faster or 1s default
         :param futures_type: use USD-M or COIN-M futures default USD-M
+        :param typed: optional, return lists of binance.ws.events.MarkPrice objects, default False
         :returns: connection key string if successful, False otherwise
         Message Format
         .. code-block:: python
@@ -725,7 +808,11 @@ class BinanceSocketManager:
             ]
         """
         stream_name = "!markPrice@arr@1s" if fast else "!markPrice@arr"
-        return self._get_futures_socket(stream_name, futures_type=futures_type)
+        return self._get_futures_socket(
+            stream_name,
+            futures_type=futures_type,
+            decoder=self._get_decoder(typed, parse_mark_price),
+        )
 
     def symbol_ticker_futures_socket(
         self, symbol: str, futures_type: FuturesType = FuturesType.USD_M
@@ -804,13 +891,15 @@ class BinanceSocketManager:
 
         return self._get_futures_socket(channel, futures_type=futures_type)
 
-    def symbol_book_ticker_socket(self, symbol: str):
+    def symbol_book_ticker_socket(self, symbol: str, typed: bool = False):
         """Start a websocket for the best bid or ask's price or quantity for a specified symbol.
 
         https://github.com/binance-exchange/binance-official-api-docs/blob/master/web-socket-streams.md#individual-symbol-book-ticker-streams
 
         :param symbol: required
         :type symbol: str
+        :param typed: optional, return binance.ws.events.BookTicker objects, default False
+        :type typed: bool
 
         :returns: connection key string if successful, False otherwise
 
@@ -828,13 +917,19 @@ class BinanceSocketManager:
             }
 
         """
-        return self._get_socket(symbol.lower() + "@bookTicker")
+        return self._get_socket(
+            symbol.lower() + "@bookTicker",
+            decoder=self._get_decoder(typed, parse_book_ticker),
+        )
 
-    def book_ticker_socket(self):
+    def book_ticker_socket(self, typed: bool = False):
         """Start a websocket for the best bid or ask's price or quantity for all symbols.
 
         https://github.com/binance-exchange/binance-official-api-docs/blob/master/web-socket-streams.md#all-book-tickers-stream
 
+        :param typed: optional, return binance.ws.events.BookTicker objects, default False
+        :type typed: bool
+
         :returns: connection key string if successful, False otherwise
 
         Message Format
@@ -846,9 +941,11 @@ class BinanceSocketManager:
             }
 
         """
-        return self._get_socket("!bookTicker")
+        return self._get_socket(
+            "!bookTicker", decoder=self._get_decoder(typed, parse_book_ticker)
+        )
 
-    def multiplex_socket(self, streams: List[str]):
+    def multiplex_socket(self, streams: List[str], typed: bool = False):
         """Start a multiplexed socket using a list of socket names.
         User stream sockets can not be included.
 
@@ -860,6 +957,9 @@ class BinanceSocketManager:
 
         :param streams: list of stream names in lower case
         :type streams: list
+        :param typed: optional, return binance.ws.events objects for the supported event types
+            instead of the envelope, with the stream name in ``stream``, other messages are unchanged, default False
+        :type typed: bool
 
         :returns: connection key string if successful, False otherwise
 
@@ -867,7 +967,9 @@ class BinanceSocketManager:
 
         """
         path = f"streams={'/'.join(streams)}"
-        return self._get_socket(path, prefix="stream?")
+        return self._get_socket(
+            path, prefix="stream?", decoder=self._get_decoder(typed, parse_event)
+        )
 
     def options_multiplex_socket(self, streams: List[str]):
         """Start a multiplexed socket using a list of socket names.
@@ -880,7 +982,10 @@ class BinanceSocketManager:
         return self._get_options_socket(stream_path, prefix="stream?")
 
     def futures_multiplex_socket(
-        self, streams: List[str], futures_type: FuturesType = FuturesType.USD_M
+        self,
+        streams: List[str],
+        futures_type: FuturesType = FuturesType.USD_M,
+        typed: bool = False,
     ):
         """Start a multiplexed socket using a list of socket names.
         User stream sockets can not be included.
@@ -893,6 +998,8 @@ class BinanceSocketManager:
 
         :param streams: list of stream names in lower case
         :param futures_type: use USD-M or COIN-M futures default USD-M
+        :param typed: optional, return binance.ws.events objects for the supported event types
+            instead of the envelope, with the stream name in ``stream``, other messages are unchanged, default False
 
         :returns: connection key string if successful, False otherwise
 
@@ -901,7 +1008,10 @@ class BinanceSocketManager:
         """
         path = f"streams={'/'.join(streams)}"
         return self._get_futures_socket(
-            path, prefix="stream?", futures_type=futures_type
+            path,
+            prefix="stream?",
+            futures_type=futures_type,
+            decoder=self._get_decoder(typed, parse_event),
         )
 
     def user_socket(self):
@@ -1113,19 +1223,43 @@ class BinanceSocketManager:
         """
         return self._get_options_socket(symbol.upper() + "@depth" + str(depth))
 
-    def futures_depth_socket(self, symbol: str, depth: str = "10", futures_type=FuturesType.USD_M):
-        """Subscribe to a futures depth data stream
+    def futures_depth_socket(
+        self,
+        symbol: str,
+        depth: Optional[str] = "10",
+        futures_type=FuturesType.USD_M,
+        interval: Optional[int] = None,
+        typed: bool = False,
+    ):
+        """Subscribe to a futures depth data stream, either a partial book or the diff stream
 
         https://binance-docs.github.io/apidocs/futures/en/#partial-book-depth-streams
+        https://binance-docs.github.io/apidocs/futures/en/#diff-book-depth-streams
 
         :param symbol: required
         :type symbol: str
-        :param depth: optional Number of depth entries to return, default 10.
+        :param depth: optional Number of depth entries to return, default 10. If None returns the diff stream
         :type depth: str
         :param futures_type: use USD-M or COIN-M futures default USD-M
+        :param interval: optional interval for updates, default None (250ms). Must be None, 100 (100ms) or 500 (500ms)
+        :type interval: int
+        :param typed: optional, return binance.ws.events.DepthDiff objects, default False
+        :type typed: bool
         """
+        socket_name = symbol.lower() + "@depth"
+        if depth:
+            socket_name = f"{socket_name}{depth}"
+        if interval:
+            if interval in [100, 500]:
+                socket_name = f"{socket_name}@{interval}ms"
+            else:
+                raise ValueError(
+                    "Websocket interval value not allowed. Allowed values are [100, 500]"
+                )
         return self._get_futures_socket(
-            symbol.lower() + "@depth" + str(depth), futures_type=futures_type
+            socket_name,
+            futures_type=futures_type,
+            decoder=self._get_decoder(typed, parse_depth_diff),
         )
 
     def options_new_symbol_socket(self):
@@ -1236,6 +1370,10 @@ class ThreadedWebsocketManager(ThreadedApiManager):
         https_proxy: Optional[str] = None,
         loop: Optional[asyncio.AbstractEventLoop] = None,
         max_queue_size: int = 100,
+        raw: bool = False,
+        decoder: Optional[Callable] = None,
+        overflow_policy: WSQueueOverflowPolicy = WSQueueOverflowPolicy.RAISE,
+        conflate_key: Optional[Callable] = None,
     ):
         super().__init__(
             api_key,
@@ -1249,12 +1387,20 @@ class ThreadedWebsocketManager(ThreadedApiManager):
         )
         self._bsm: Optional[BinanceSocketManager] = None
         self._max_queue_size = max_queue_size
+        self._raw = raw
+        self._decoder = decoder
+        self._overflow_policy = overflow_policy
+        self._conflate_key = conflate_key
 
     async def _before_socket_listener_start(self):
         assert self._client
         self._bsm = BinanceSocketManager(
             client=self._client,
-            max_queue_size=self._max_queue_size
+            max_queue_size=self._max_queue_size,
+            raw=self._raw,
+            decoder=self._decoder,
+            overflow_policy=self._overflow_policy,
+            conflate_key=self._conflate_key,
         )
 
     def _start_async_socket(
@@ -1589,11 +1735,17 @@ class ThreadedWebsocketManager(ThreadedApiManager):
         self,
         callback: Callable,
         symbol: str,
-        depth: str = "10",
+        depth: Optional[str] = "10",
         futures_type=FuturesType.USD_M,
+        interval: Optional[int] = None,
     ) -> str:
         return self._start_async_socket(
             callback=callback,
             socket_name="futures_depth_socket",
-            params={"symbol": symbol, "depth": depth, "futures_type": futures_type},
+            params={
+                "symbol": symbol,
+                "depth": depth,
+                "futures_type": futures_type,
+                "interval": interval,
+            },
         )
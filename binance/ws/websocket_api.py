@@ -26,7 +26,7 @@ class WebsocketAPI(ReconnectingWebsocket):
     def _handle_message(self, msg):
         """Override message handling to support request-response"""
         parsed_msg = super()._handle_message(msg)
-        self._log.debug(f"Received message: {parsed_msg}")
+        self._log.debug("Received message: %s", parsed_msg)
         if parsed_msg is None:
             return None
 
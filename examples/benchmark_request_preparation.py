@@ -0,0 +1,46 @@
+import os
+import sys
+import timeit
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root)
+
+from binance.client import Client
+
+# measures the client side cost of building a request, no request is sent
+
+client = Client("api_key", "api_secret", ping=False)
+
+ORDER_URI = "https://api.binance.com/api/v3/order"
+ORDER_PARAMS = {
+    "symbol": "BTCUSDT",
+    "side": "BUY",
+    "type": "LIMIT",
+    "timeInForce": "GTC",
+    "quantity": "0.001",
+    "price": "65000.00",
+    "newClientOrderId": "x-HNA2TXFJ1234567890abcd",
+}
+KLINES_URI = "https://api.binance.com/api/v3/klines"
+KLINES_PARAMS = {"symbol": "BTCUSDT", "interval": "1m", "limit": 1000, "startTime": None}
+
+
+def prepare_signed_order():
+    client._prepare_request("post", ORDER_URI, True, data=dict(ORDER_PARAMS))
+
+
+def prepare_public_get():
+    client._prepare_request("get", KLINES_URI, False, data=dict(KLINES_PARAMS))
+
+
+def main(number=20000):
+    for name, func in (
+        ("signed order POST", prepare_signed_order),
+        ("public klines GET", prepare_public_get),
+    ):
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:20} {best / number * 1e6:8.2f} us per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,13 @@ import pytest
 import pytest_asyncio
 from binance.client import Client
 from binance.async_client import AsyncClient
+from binance.enums import HistoricalKlinesType
+from binance.exceptions import BinanceRequestException
+from binance.helpers import interval_to_milliseconds
 import os
 import asyncio
 import logging
+import time
 
 from binance.ws.streams import ThreadedWebsocketManager
 
@@ -178,6 +182,44 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(skip_gift_card)
 
 
+MINUTE = 60000
+
+
+class FakeKlinesClient:
+    """Serves the klines of each symbol from its listing time up to now without requests
+
+    Args:
+        listed: listing time in milliseconds of each symbol
+        fail_after: optional number of calls after which _klines raises
+    """
+
+    def __init__(self, listed, fail_after=None):
+        self.listed = listed
+        self.fail_after = fail_after
+        self.calls = []
+
+    def _klines(self, klines_type=HistoricalKlinesType.SPOT, **params):
+        self.calls.append((klines_type, params))
+        if self.fail_after is not None and len(self.calls) > self.fail_after:
+            raise BinanceRequestException("connection reset")
+        timeframe = interval_to_milliseconds(params["interval"])
+        listed = self.listed[params["symbol"]]
+        start = max(params["startTime"], listed)
+        start += -(start - listed) % timeframe
+        end = min(params.get("endTime") or 2**62, int(time.time() * 1000))
+        return [
+            [open_time, "1.0", "2.0", "0.5", str(open_time % 7), "10", open_time + timeframe - 1, "10", 3, "5", "5", "0"]
+            for open_time in range(start, end + 1, timeframe)[: params["limit"]]
+        ]
+
+
+class FakeAsyncKlinesClient(FakeKlinesClient):
+    async def _klines(self, klines_type=HistoricalKlinesType.SPOT, **params):
+        # finish out of order
+        await asyncio.sleep(0.001 * (len(self.calls) % 3))
+        return super()._klines(klines_type, **params)
+
+
 def call_method_and_assert_uri_contains(client, method_name, expected_string, *args, **kwargs):
     """
     Helper function to test that a client method calls the expected URI.
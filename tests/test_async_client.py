@@ -1,9 +1,11 @@
+import asyncio
 import pytest
 import sys
 
 from binance.async_client import AsyncClient
 from .conftest import proxy, api_key, api_secret, testnet
 from binance.exceptions import BinanceAPIException, BinanceRequestException
+from binance.transport import AsyncTransport, TransportResponse
 from aiohttp import ClientResponse, hdrs
 from aiohttp.helpers import TimerNoop
 from yarl import URL
@@ -274,4 +276,153 @@ async def test_handle_response(clientAsync):
     mock_response._body = b'error message'
     with pytest.raises(BinanceAPIException):
         await clientAsync._handle_response(mock_response)
-    
\ No newline at end of file
+    
+
+async def test_connector_params():
+    client = AsyncClient(
+        api_key,
+        api_secret,
+        connector_params={"limit_per_host": 8, "keepalive_timeout": 60, "ttl_dns_cache": 300},
+    )
+    try:
+        assert client.session.connector.limit_per_host == 8
+    finally:
+        await client.close_connection()
+
+
+async def test_warmup_opens_connections_per_host():
+    client = AsyncClient(api_key, api_secret)
+    uris = []
+
+    async def request(method, uri, signed, force_params=False, **kwargs):
+        uris.append(uri)
+        return {}
+
+    client._request = request
+    try:
+        await client.warmup(connections_per_host=3, apis=("api", "fapi"))
+    finally:
+        await client.close_connection()
+    assert uris.count("https://api.binance.com/api/v3/ping") == 3
+    assert uris.count("https://fapi.binance.com/fapi/v1/ping") == 3
+    assert len(uris) == 6
+
+
+async def test_send_request_prepares_query_and_body():
+    client = AsyncClient(api_key, api_secret)
+    calls = []
+
+    class Response:
+        status = 200
+        headers = {}
+
+        async def text(self):
+            return "{}"
+
+        async def json(self):
+            return {}
+
+    class Request:
+        def __init__(self, method, url, **kwargs):
+            calls.append((method, str(url), kwargs))
+
+        async def __aenter__(self):
+            return Response()
+
+        async def __aexit__(self, *args):
+            pass
+
+    session = client.session
+    client.session = type(
+        "Session",
+        (),
+        {
+            "get": lambda self, url, **kwargs: Request("get", url, **kwargs),
+            "post": lambda self, url, **kwargs: Request("post", url, **kwargs),
+        },
+    )()
+    try:
+        await client.get_symbol_ticker(symbol="BTCUSDT")
+        await client.create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1)
+    finally:
+        client.session = session
+        await client.close_connection()
+
+    method, url, kwargs = calls[0]
+    assert url == "https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT"
+    assert kwargs["data"] is None
+    method, url, kwargs = calls[1]
+    assert url == "https://api.binance.com/api/v3/order"
+    assert kwargs["headers"]["Content-Type"] == "application/x-www-form-urlencoded"
+    body, signature = kwargs["data"].rsplit("&signature=", 1)
+    assert body.startswith("newClientOrderId=")
+    assert "&quantity=1&recvWindow=" in body and "&symbol=BTCUSDT&timestamp=" in body
+    assert len(signature) == 64
+
+
+async def test_response_is_kept_per_task():
+    client = AsyncClient(api_key, api_secret)
+
+    async def call(value):
+        client.response = value
+        await asyncio.sleep(0)
+        return client.response
+
+    try:
+        assert await asyncio.gather(call("a"), call("b")) == ["a", "b"]
+        assert client.response is None
+    finally:
+        await client.close_connection()
+
+
+async def test_transport_sends_requests():
+    calls = []
+
+    class Transport(AsyncTransport):
+        async def request(self, method, url, headers, data=None, timeout=None):
+            calls.append((method, url, headers, data))
+            if url.endswith("/order"):
+                return TransportResponse(400, {}, '{"code": -2010, "msg": "rejected"}')
+            return TransportResponse(200, {"X-MBX-USED-WEIGHT-1M": "2"}, '{"price": "1"}')
+
+    client = AsyncClient(api_key, api_secret, transport=Transport())
+    assert client.session is None
+    assert await client.get_symbol_ticker(symbol="BTCUSDT") == {"price": "1"}
+    assert client.response.headers["X-MBX-USED-WEIGHT-1M"] == "2"
+    with pytest.raises(BinanceAPIException) as exc:
+        await client.create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1)
+    assert exc.value.code == -2010
+    await client.close_connection()
+
+    method, url, headers, data = calls[0]
+    assert url == "https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT"
+    assert headers["X-MBX-APIKEY"] == api_key
+    assert data is None
+    method, url, headers, data = calls[1]
+    assert method == "post"
+    assert headers["Content-Type"] == "application/x-www-form-urlencoded"
+    assert "&signature=" in data
+
+    with pytest.raises(ValueError):
+        AsyncClient(api_key, api_secret, https_proxy="http://proxy:8080", transport=Transport())
+
+
+async def test_httpx_transport():
+    httpx = pytest.importorskip("httpx")
+    from binance.transport import HttpxTransport
+
+    urls = []
+
+    def handler(request):
+        urls.append(str(request.url))
+        return httpx.Response(200, json={"serverTime": 1})
+
+    transport = HttpxTransport(http2=False, transport=httpx.MockTransport(handler))
+    client = AsyncClient(api_key, api_secret, transport=transport)
+    assert await client.get_server_time() == {"serverTime": 1}
+    await client.get_symbol_ticker(symbol="BTCUSDT")
+    await client.close_connection()
+    assert urls == [
+        "https://api.binance.com/api/v3/time",
+        "https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT",
+    ]
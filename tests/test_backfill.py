@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from binance.backfill import KlineBackfillEngine
+from binance.enums import HistoricalKlinesType
+from binance.exceptions import BinanceRequestException
+
+from .conftest import MINUTE, FakeAsyncKlinesClient
+
+LISTED = {"BTCUSDT": 1500000000000, "ETHUSDT": 1500000000000 + 1500 * MINUTE}
+
+
+def _collect():
+    received = {}
+
+    async def sink(job, klines):
+        received.setdefault(job.key, []).extend(kline[0] for kline in klines)
+
+    return received, sink
+
+
+@pytest.mark.asyncio()
+async def test_backfill_matrix_in_order():
+    client = FakeAsyncKlinesClient(LISTED)
+    received, sink = _collect()
+    engine = KlineBackfillEngine(client, sink, concurrency=3, page_limit=100)
+    end = LISTED["BTCUSDT"] + 2999 * MINUTE
+    jobs = engine.add_matrix(["BTCUSDT", "ETHUSDT"], ["1m"], 0, end, klines_type=HistoricalKlinesType.FUTURES)
+    assert [job.key for job in jobs] == ["FUTURES:BTCUSDT:1m", "FUTURES:ETHUSDT:1m"]
+    await engine.run()
+
+    assert received["FUTURES:BTCUSDT:1m"] == list(range(LISTED["BTCUSDT"], end + 1, MINUTE))
+    assert received["FUTURES:ETHUSDT:1m"] == list(range(LISTED["ETHUSDT"], end + 1, MINUTE))
+    # the first page of each job replaces the earliest timestamp probe
+    assert len(client.calls) == 30 + 15
+    assert all(klines_type == HistoricalKlinesType.FUTURES for klines_type, _ in client.calls)
+    progress = engine.get_progress()
+    assert progress["FUTURES:ETHUSDT:1m"]["klines"] == 1500
+    assert progress["FUTURES:ETHUSDT:1m"]["done"]
+
+
+@pytest.mark.asyncio()
+async def test_backfill_resumes_from_checkpoint(tmp_path):
+    checkpoint = tmp_path / "backfill.json"
+    end = LISTED["BTCUSDT"] + 999 * MINUTE
+
+    received, sink = _collect()
+    engine = KlineBackfillEngine(FakeAsyncKlinesClient(LISTED, fail_after=4), sink, checkpoint=checkpoint, concurrency=1, page_limit=100)
+    engine.add("BTCUSDT", "1m", end_str=end)
+    jobs = await engine.run()
+    job = jobs["SPOT:BTCUSDT:1m"]
+    assert isinstance(job.error, BinanceRequestException)
+    assert not job.done
+    saved = json.loads(checkpoint.read_text())["SPOT:BTCUSDT:1m"]
+    assert saved == received["SPOT:BTCUSDT:1m"][-1]
+
+    resumed, sink = _collect()
+    client = FakeAsyncKlinesClient(LISTED)
+    engine = KlineBackfillEngine(client, sink, checkpoint=checkpoint, concurrency=2, page_limit=100)
+    engine.add("BTCUSDT", "1m", end_str=end)
+    await engine.run()
+    assert client.calls[0][1]["startTime"] == saved + 1
+    assert received["SPOT:BTCUSDT:1m"] + resumed["SPOT:BTCUSDT:1m"] == list(
+        range(LISTED["BTCUSDT"], end + 1, MINUTE)
+    )
+
+
+@pytest.mark.asyncio()
+async def test_backfill_sync_sink_and_short_range():
+    pages = []
+    engine = KlineBackfillEngine(FakeAsyncKlinesClient(LISTED), lambda job, klines: pages.append(len(klines)), page_limit=100)
+    engine.add("BTCUSDT", "1m", LISTED["BTCUSDT"], LISTED["BTCUSDT"] + 49 * MINUTE)
+    await engine.run()
+    assert pages == [50]
+
+
+@pytest.mark.asyncio()
+async def test_backfill_throttles_checkpoint_writes(tmp_path, monkeypatch):
+    checkpoint = tmp_path / "backfill.json"
+    writes = []
+    replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: writes.append(dst) or replace(src, dst))
+
+    received, sink = _collect()
+    engine = KlineBackfillEngine(FakeAsyncKlinesClient(LISTED), sink, checkpoint=checkpoint, concurrency=3, page_limit=100)
+    end = LISTED["BTCUSDT"] + 2999 * MINUTE
+    engine.add_matrix(["BTCUSDT", "ETHUSDT"], ["1m"], 0, end)
+    await engine.run()
+
+    # the first page and the end of each job, not one write per page
+    assert len(writes) <= 4
+    assert json.loads(checkpoint.read_text()) == {"SPOT:BTCUSDT:1m": end, "SPOT:ETHUSDT:1m": end}
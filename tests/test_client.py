@@ -1,5 +1,7 @@
 import sys
+import threading
 import pytest
+import requests_mock
 from binance.client import Client
 from binance.exceptions import BinanceAPIException, BinanceRequestException
 from .conftest import proxies, api_key, api_secret, testnet, call_method_and_assert_uri_contains
@@ -267,3 +269,58 @@ def test_handle_response(client):
     })
     with pytest.raises(BinanceAPIException):
         client._handle_response(mock_error_response)
+
+
+def test_adapter_params():
+    client = Client(
+        api_key,
+        api_secret,
+        ping=False,
+        adapter_params={"pool_connections": 8, "pool_maxsize": 32},
+    )
+    adapter = client.session.get_adapter("https://fapi.binance.com/fapi/v1/ping")
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 3
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def test_response_is_kept_per_thread():
+    client = Client(api_key, api_secret, ping=False)
+    client.response = "main"
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(client.response))
+    thread.start()
+    thread.join()
+    assert seen == [None]
+    assert client.response == "main"
+
+
+def test_envelope_and_response_hooks():
+    client = Client(api_key, api_secret, ping=False)
+    metas = []
+    client.add_response_hook(metas.append)
+    with requests_mock.mock() as m:
+        m.get(
+            "https://api.binance.com/api/v3/account",
+            json={"balances": []},
+            headers={
+                "X-MBX-USED-WEIGHT-1M": "21",
+                "X-MBX-ORDER-COUNT-10S": "2",
+                "X-SAPI-USED-IP-WEIGHT-1M": "5",
+                "Date": "Tue, 01 Oct 2024 00:00:00 GMT",
+            },
+        )
+        data, meta = client.get_account(envelope=True)
+        # the envelope flag is not sent
+        assert "envelope" not in m.last_request.qs
+        assert client.get_account() == {"balances": []}
+
+    assert data == {"balances": []}
+    assert meta.status == 200
+    assert meta.url == "https://api.binance.com/api/v3/account"
+    assert meta.used_weight == {"1M": 21, "IP-1M": 5}
+    assert meta.order_count == {"10S": 2}
+    assert meta.server_time == 1727740800000
+    assert meta.latency >= 0
+    assert metas[0] is meta
+    assert len(metas) == 2
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+
+import pytest
+import requests_mock
+
+from binance import AsyncClient, Client
+from binance.clock_sync import ClockSync
+from binance.response import ResponseMeta
+from binance.transport import AsyncTransport, TransportResponse
+
+SERVER_TIME_URL = "https://api.binance.com/api/v3/time"
+
+
+def _server_time(offsets):
+    """requests_mock callback answering /api/v3/time with the local time plus the next offset"""
+    calls = []
+
+    def callback(request, context):
+        calls.append(request)
+        return {"serverTime": int(time.time() * 1000) + offsets[(len(calls) - 1) % len(offsets)]}
+
+    return calls, callback
+
+
+class ServerTimeTransport(AsyncTransport):
+    def __init__(self, offsets):
+        self.offsets = offsets
+        self.calls = 0
+
+    async def request(self, method, url, headers, data=None, timeout=None):
+        offset = self.offsets[self.calls % len(self.offsets)]
+        self.calls += 1
+        return TransportResponse(200, {}, json.dumps({"serverTime": int(time.time() * 1000) + offset}))
+
+
+def _meta(server_offset, latency=0.05):
+    server_time = time.time() * 1000 + server_offset
+    date = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(server_time / 1000))
+    return ResponseMeta("get", "https://api.binance.com/api/v3/time", 200, latency, {"Date": date})
+
+
+def test_sync_uses_median_offset():
+    client = Client("api_key", "api_secret", ping=False)
+    clock = ClockSync(client, samples=5)
+    calls, callback = _server_time([5000, 5010, 9000, 4990, 5005])
+    with requests_mock.mock() as m:
+        m.get(SERVER_TIME_URL, json=callback)
+        offset = clock.sync()
+    assert len(calls) == 5
+    # the outlier is ignored
+    assert offset == pytest.approx(5005, abs=20)
+    assert client.timestamp_offset == offset
+    assert clock.rtt is not None
+
+
+def test_sample_halves_round_trip():
+    offset, rtt = ClockSync._sample(100.0, 100_250, 100.1)
+    assert rtt == pytest.approx(100)
+    assert offset == pytest.approx(200)
+
+
+def _meta_at(received_at, server_time, latency=0.05):
+    meta = ResponseMeta("get", "https://api.binance.com/api/v3/depth", 200, latency, {})
+    meta.received_at = received_at
+    meta.server_time = server_time
+    return meta
+
+
+def test_observe_requests_resync_on_drift():
+    client = Client("api_key", "api_secret", ping=False)
+    clock = ClockSync(client, drift_tolerance=1000)
+    clock.observe(_meta(0))
+    assert not clock._wakeup_thread.is_set()
+    assert client.timestamp_offset == 0
+    clock.observe(_meta(5000))
+    assert clock._wakeup_thread.is_set()
+    assert client.timestamp_offset == pytest.approx(5000, abs=1100)
+
+
+def test_observe_estimates_offset_from_date_headers():
+    client = Client("api_key", "api_secret", ping=False)
+    clock = ClockSync(client, drift_tolerance=1000)
+    received = 1_700_000_000_400
+    # the server second started 600ms after our receive time
+    clock.observe(_meta_at(received, received + 600))
+    assert clock.header_bounds == (600, 1650)
+    assert client.timestamp_offset == 600
+    assert not clock._wakeup_thread.is_set()
+
+    # a later response narrows the window, the offset moves to its new bound
+    clock.observe(_meta_at(received + 1900, received + 2600))
+    assert clock.header_bounds == (700, 1650)
+    assert client.timestamp_offset == 700
+    assert not clock._wakeup_thread.is_set()
+
+
+def test_start_resyncs_in_background():
+    client = Client("api_key", "api_secret", ping=False)
+    clock = ClockSync(client, interval=60, samples=1)
+    offsets = [3000]
+    calls, callback = _server_time(offsets)
+    with requests_mock.mock() as m:
+        m.get(SERVER_TIME_URL, json=callback)
+        clock.start()
+        try:
+            assert len(calls) == 1
+            assert client.response_hooks == [clock.observe]
+            offsets[:] = [-3000]
+            clock.request_resync()
+            for _ in range(100):
+                if client.timestamp_offset < 0:
+                    break
+                time.sleep(0.01)
+            assert client.timestamp_offset == pytest.approx(-3000, abs=50)
+        finally:
+            clock.stop()
+    assert client.response_hooks == []
+
+
+@pytest.mark.asyncio()
+async def test_start_async_resyncs_in_task():
+    transport = ServerTimeTransport([2000])
+    client = AsyncClient("api_key", "api_secret", transport=transport)
+    clock = ClockSync(client, interval=60, samples=3)
+    await clock.start_async()
+    assert transport.calls == 3
+    assert client.timestamp_offset == pytest.approx(2000, abs=50)
+    transport.offsets = [-2000]
+    clock.request_resync()
+    for _ in range(100):
+        if client.timestamp_offset < 0:
+            break
+        await asyncio.sleep(0.01)
+    assert client.timestamp_offset == pytest.approx(-2000, abs=50)
+    await clock.stop_async()
+    assert client.response_hooks == []
+    await client.close_connection()
+
+
+def test_offset_is_used_for_signed_requests():
+    client = Client(api_key="api_key", api_secret="api_secret", ping=False)
+    client.timestamp_offset = 60_000
+    request = client._prepare_request("get", "https://api.binance.com/api/v3/account", True)
+    timestamp = int(request.query_string.split("timestamp=")[1].split("&")[0])
+    assert timestamp - time.time() * 1000 == pytest.approx(60_000, abs=1000)
@@ -1,3 +1,6 @@
+import hashlib
+import hmac
+
 from binance.client import Client
 
 test_cases = [
@@ -50,3 +53,21 @@ def test_encryption():
         assert signature == case["expected_signature"], (
             f"Test failed: {case['description']}"
         )
+
+
+def test_hmac_signature_matches_query_string():
+    client = Client(api_key="api_key", api_secret="api_secret", ping=False)
+    request = client._prepare_request(
+        "get", "https://api.binance.com/api/v3/order", True,
+        data={"symbol": "BTCUSDT", "quantity": 1, "price": None},
+    )
+    query_string, signature = request.query_string.rsplit("&signature=", 1)
+    assert query_string.startswith("quantity=1&recvWindow=")
+    assert "price" not in query_string
+    expected = hmac.new(b"api_secret", query_string.encode(), hashlib.sha256).hexdigest()
+    assert signature == expected
+
+    # the keyed hmac follows a changed secret
+    client.API_SECRET = "other_secret"
+    expected = hmac.new(b"other_secret", b"a=1", hashlib.sha256).hexdigest()
+    assert client._hmac_signature("a=1") == expected
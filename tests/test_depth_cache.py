@@ -1,4 +1,14 @@
-from binance.ws.depthcache import DepthCache
+import asyncio
+import threading
+from binance.enums import FuturesType
+from binance.ws.depthcache import (
+    DepthCache,
+    DepthCacheManager,
+    FuturesDepthCacheManager,
+    MultiDepthCacheManager,
+    SnapshotScheduler,
+    spot_order_book_weight,
+)
 from decimal import Decimal
 import pytest
 
@@ -47,3 +57,380 @@ def test_add_asks(fresh_cache):
 
     assert isinstance(asks[0][0], Decimal)
     assert isinstance(asks[0][1], Decimal)
+
+
+@pytest.fixture
+def tick_cache():
+    return DepthCache(TEST_SYMBOL, tick_size="0.00000100", step_size="0.01000000")
+
+
+def test_integer_ticks_storage(tick_cache):
+    """Prices are stored as integer ticks and quantities as scaled ints"""
+    tick_cache.add_bid(["0.00123400", "1.50000000"])
+    tick_cache.add_ask(["0.00123500", "2.00000000"])
+
+    assert tick_cache._bids == {1234: 150}
+    assert tick_cache._asks == {1235: 200}
+    assert tick_cache.get_bids() == [[0.001234, 1.5]]
+    assert tick_cache.get_asks() == [[0.001235, 2.0]]
+
+
+def test_integer_ticks_remove_level(tick_cache):
+    """A zero quantity removes the level whatever its string formatting"""
+    tick_cache.add_bid(["0.00123400", "1.50000000"])
+    tick_cache.add_bid(["0.00123400", "0.000"])
+    tick_cache.add_bid(["0.00123300", "0"])
+
+    assert tick_cache.get_bids() == []
+
+
+def test_integer_ticks_sorting_and_conv_type():
+    cache = DepthCache(TEST_SYMBOL, conv_type=Decimal, tick_size="0.50", step_size="0.001")
+    for bid in [["100.5", "1"], ["99.0", "2.5"], ["101.0", "0.001"]]:
+        cache.add_bid(bid)
+    for ask in [["102.0", "3"], ["101.5", "4"]]:
+        cache.add_ask(ask)
+
+    assert cache.get_bids() == [
+        [Decimal("101.0"), Decimal("0.001")],
+        [Decimal("100.5"), Decimal("1")],
+        [Decimal("99.0"), Decimal("2.5")],
+    ]
+    assert cache.get_asks() == [
+        [Decimal("101.5"), Decimal("4")],
+        [Decimal("102.0"), Decimal("3")],
+    ]
+    assert isinstance(cache.get_bids()[0][0], Decimal)
+
+
+def test_cached_views_invalidated_on_update(fresh_cache):
+    fresh_cache.add_bid(["0.1", "1"])
+    bids = fresh_cache.get_bids()
+    view = fresh_cache._bids_view
+    assert fresh_cache.get_bids() == bids
+    assert fresh_cache._bids_view is view
+
+    fresh_cache.add_bid(["0.2", "2"])
+    assert fresh_cache._bids_view is None
+    assert fresh_cache.get_bids()[0] == [Decimal("0.2"), Decimal("2")]
+
+
+def test_cached_views_are_not_shared_with_callers(fresh_cache):
+    fresh_cache.add_ask(["0.3", "1"])
+    fresh_cache.add_ask(["0.4", "2"])
+    asks = fresh_cache.get_asks()
+    asks.pop()
+    asks[0][1] = Decimal("0")
+    fresh_cache.best_ask()[0] = Decimal("9")
+    fresh_cache.top_n(1)[1][0][1] = Decimal("9")
+    assert fresh_cache.get_asks() == [[Decimal("0.3"), Decimal("1")], [Decimal("0.4"), Decimal("2")]]
+
+
+@pytest.mark.parametrize("tick_size", [None, "0.01"])
+def test_best_and_top_n(tick_size):
+    cache = DepthCache(TEST_SYMBOL, tick_size=tick_size)
+    assert cache.best_bid() is None
+    assert cache.best_ask() is None
+
+    for price in ["9.98", "10.00", "9.99", "9.50"]:
+        cache.add_bid([price, "1.00000000"])
+    for price in ["10.02", "10.01", "11.00"]:
+        cache.add_ask([price, "2.00000000"])
+
+    # computed without a full sort
+    assert cache.best_bid() == [10.0, 1.0]
+    assert cache.best_ask() == [10.01, 2.0]
+    bids, asks = cache.top_n(2)
+    assert bids == [[10.0, 1.0], [9.99, 1.0]]
+    assert asks == [[10.01, 2.0], [10.02, 2.0]]
+
+    # served from the cached sorted views
+    assert cache.top_n(2) == (cache.get_bids()[:2], cache.get_asks()[:2])
+    assert cache.best_bid() == cache.get_bids()[0]
+
+
+class _SnapshotClient:
+    """Serves order book snapshots with a lastUpdateId taken from ``snapshots``"""
+
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self.calls = []
+
+    async def get_order_book(self, symbol, limit):
+        self.calls.append(symbol)
+        return {
+            "lastUpdateId": self.snapshots[symbol],
+            "bids": [["1.0", "1"]],
+            "asks": [["2.0", "1"]],
+        }
+
+
+def _envelope(symbol, first_id, final_id, bids=None):
+    return {
+        "stream": f"{symbol.lower()}@depth",
+        "data": {
+            "e": "depthUpdate",
+            "E": final_id,
+            "s": symbol,
+            "U": first_id,
+            "u": final_id,
+            "b": bids or [],
+            "a": [],
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_resync_gives_up_when_snapshots_lag():
+    client = _SnapshotClient({"BNBBTC": 10})
+    dcm = DepthCacheManager(client, "BNBBTC", bm=object())
+    dcm.MAX_RESYNC_WAIT = 0
+    await dcm._init_cache()
+
+    # every snapshot is older than the buffered update
+    res = await dcm._process_depth_message({"e": "depthUpdate", "E": 1, "U": 20, "u": 21, "b": [], "a": []})
+    assert res["type"] == "BinanceDepthCacheOutOfSync"
+    assert client.calls.count("BNBBTC") == 1 + dcm.MAX_RESYNC_ATTEMPTS
+    assert dcm._depth_message_buffer == []
+
+    # the next update starts over once the snapshots catch up
+    client.snapshots["BNBBTC"] = 25
+    dc = await dcm._process_depth_message({"e": "depthUpdate", "E": 2, "U": 22, "u": 26, "b": [["1.5", "2"]], "a": []})
+    assert dc.get_bids()[0] == [1.5, 2.0]
+    assert dcm._last_update_id == 26
+
+
+def test_multi_depth_cache_shards_streams():
+    symbols = [f"SYM{i}USDT" for i in range(5)]
+    dcm = MultiDepthCacheManager(
+        _SnapshotClient({}), symbols, bm=object(), ws_interval=100, max_streams_per_connection=2
+    )
+
+    shards = dcm._get_stream_shards()
+    assert [len(shard) for shard in shards] == [2, 2, 1]
+    assert shards[0][0] == "sym0usdt@depth@100ms"
+
+
+@pytest.mark.asyncio
+async def test_multi_depth_cache_routes_and_resyncs_one_symbol():
+    client = _SnapshotClient({"BNBBTC": 10, "ETHBTC": 20})
+    dcm = MultiDepthCacheManager(client, ["bnbbtc", "ETHBTC"], bm=object())
+    for manager in dcm._managers.values():
+        await manager._init_cache()
+
+    # bridging event is accepted, stale event ignored
+    dc = await dcm._route(_envelope("BNBBTC", 9, 11, bids=[["1.5", "2"]]))
+    assert dc.symbol == "BNBBTC"
+    assert dc.get_bids()[0] == [1.5, 2.0]
+    assert await dcm._route(_envelope("ETHBTC", 15, 20)) is None
+
+    # gap on BNBBTC, buffered while a new snapshot is fetched in the background
+    client.snapshots["BNBBTC"] = 30
+    assert await dcm._route(_envelope("BNBBTC", 25, 31, bids=[["1.7", "3"]])) is None
+    assert await dcm._route(_envelope("BNBBTC", 32, 32, bids=[["1.8", "4"]])) is None
+
+    # the other symbol keeps streaming
+    dc = await dcm._route(_envelope("ETHBTC", 21, 21, bids=[["1.2", "1"]]))
+    assert dc.symbol == "ETHBTC"
+
+    await asyncio.gather(*dcm._resync_tasks.values())
+    assert client.calls.count("BNBBTC") == 2
+    assert client.calls.count("ETHBTC") == 1
+    bnb = dcm.get_depth_cache("BNBBTC")
+    assert bnb.get_bids()[:2] == [[1.8, 4.0], [1.7, 3.0]]
+    assert dcm._managers["BNBBTC"]._last_update_id == 32
+
+    assert await dcm._route({"e": "error", "type": "ReadLoopClosed", "m": ""}) == {
+        "e": "error",
+        "type": "ReadLoopClosed",
+        "m": "",
+    }
+
+
+@pytest.mark.asyncio
+async def test_multi_depth_cache_resync_gives_up():
+    client = _SnapshotClient({"BNBBTC": 10})
+    dcm = MultiDepthCacheManager(client, ["BNBBTC"], bm=object())
+    dcm.MAX_RESYNC_WAIT = 0
+    dcm._queue = asyncio.Queue()
+    await dcm._managers["BNBBTC"]._init_cache()
+
+    assert await dcm._route(_envelope("BNBBTC", 20, 21)) is None
+    await asyncio.gather(*dcm._resync_tasks.values())
+    assert client.calls.count("BNBBTC") == 1 + dcm.MAX_RESYNC_ATTEMPTS
+    error = dcm._queue.get_nowait()
+    assert error["type"] == "BinanceDepthCacheOutOfSync"
+
+
+class _FakeMultiplexSocket:
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def recv(self):
+        if self.messages:
+            return self.messages.pop(0)
+        await asyncio.sleep(3600)
+
+
+def test_multi_depth_cache_runs_in_another_loop():
+    # the threaded manager builds the manager outside the loop that uses it
+    socket = _FakeMultiplexSocket([_envelope("BNBBTC", 9, 11, bids=[["1.5", "2"]])])
+    bm = type("FakeSocketManager", (), {"multiplex_socket": lambda self, streams: socket})()
+    dcm = MultiDepthCacheManager(_SnapshotClient({"BNBBTC": 10}), ["BNBBTC"], bm=bm)
+    results = []
+
+    async def run():
+        async with dcm:
+            results.append(await dcm.recv())
+
+    thread = threading.Thread(target=asyncio.run, args=(run(),))
+    thread.start()
+    thread.join(5)
+    assert results[0].get_bids()[0] == [1.5, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_scheduler_concurrency_and_priority():
+    scheduler = SnapshotScheduler(max_concurrency=2)
+    running = []
+    peak = []
+    order = []
+
+    def fetcher(name):
+        async def fetch():
+            running.append(name)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(name)
+            order.append(name)
+            return name
+
+        return fetch
+
+    refresh = [
+        scheduler.fetch(fetcher(f"refresh{i}"), 5, SnapshotScheduler.PRIORITY_REFRESH)
+        for i in range(3)
+    ]
+    invalid = [scheduler.fetch(fetcher(f"invalid{i}"), 5) for i in range(3)]
+    results = await asyncio.gather(*refresh, *invalid)
+
+    assert results == [f"refresh{i}" for i in range(3)] + [f"invalid{i}" for i in range(3)]
+    assert max(peak) == 2
+    # invalid books are fetched before refreshes
+    assert [name[:-1] for name in order] == ["invalid"] * 3 + ["refresh"] * 3
+
+
+@pytest.mark.asyncio
+async def test_snapshot_scheduler_weight_budget(monkeypatch):
+    scheduler = SnapshotScheduler(max_concurrency=10, max_weight_per_minute=50)
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        # move to the next window
+        scheduler._window_start -= SnapshotScheduler.WINDOW_SECONDS
+
+    async def fetch():
+        return True
+
+    monkeypatch.setattr("binance.ws.depthcache.asyncio.sleep", fake_sleep)
+    assert await asyncio.gather(*(scheduler.fetch(fetch, 25) for _ in range(3))) == [True] * 3
+    assert len(sleeps) == 1
+    assert 0 < sleeps[0] <= SnapshotScheduler.WINDOW_SECONDS
+
+
+def test_spot_order_book_weight():
+    assert [spot_order_book_weight(limit) for limit in (5, 100, 500, 1000, 5000)] == [
+        5,
+        5,
+        25,
+        50,
+        250,
+    ]
+
+
+class _FuturesSnapshotClient:
+    def __init__(self, last_update_id):
+        self.last_update_id = last_update_id
+        self.calls = []
+
+    def _snapshot(self, futures_type, symbol, limit):
+        self.calls.append((futures_type, symbol, limit))
+        return {
+            "lastUpdateId": self.last_update_id,
+            "E": 1,
+            "T": 1,
+            "bids": [["100.0", "1.000"]],
+            "asks": [["101.0", "1.000"]],
+        }
+
+    async def futures_order_book(self, symbol, limit):
+        return self._snapshot("usd_m", symbol, limit)
+
+    async def futures_coin_order_book(self, symbol, limit):
+        return self._snapshot("coin_m", symbol, limit)
+
+
+def _futures_diff(first_id, final_id, prev_id, bids=None, asks=None):
+    return {
+        "stream": "btcusdt@depth@100ms",
+        "data": {
+            "e": "depthUpdate",
+            "E": final_id,
+            "s": "BTCUSDT",
+            "U": first_id,
+            "u": final_id,
+            "pu": prev_id,
+            "b": bids or [],
+            "a": asks or [],
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_futures_depth_cache_diff_sync():
+    client = _FuturesSnapshotClient(100)
+    dcm = FuturesDepthCacheManager(client, "BTCUSDT", bm=object())
+
+    # buffered until the snapshot is fetched, then replayed
+    assert await dcm._depth_event(_futures_diff(90, 95, 89)) is None
+    assert await dcm._depth_event(_futures_diff(98, 103, 95, bids=[["100.5", "2.000"]])) is None
+    await dcm._init_cache()
+    assert client.calls == [("usd_m", "BTCUSDT", 1000)]
+    assert dcm._last_update_id == 103
+
+    dc = await dcm._depth_event(
+        _futures_diff(104, 106, 103, bids=[["100.0", "0.000"]], asks=[["100.8", "3.000"]])
+    )
+    assert dc.get_bids() == [[100.5, 2.0]]
+    assert dc.get_asks() == [[100.8, 3.0], [101.0, 1.0]]
+
+    # pu does not continue the previous u, a new snapshot is fetched
+    client.last_update_id = 120
+    dc = await dcm._depth_event(_futures_diff(110, 121, 108, asks=[["100.9", "1.000"]]))
+    assert len(client.calls) == 2
+    assert dcm._last_update_id == 121
+    assert dc.get_asks()[0] == [100.9, 1.0]
+    assert dc.get_bids() == [[100.0, 1.0]]
+
+
+@pytest.mark.asyncio
+async def test_futures_depth_cache_first_event_must_span_snapshot():
+    client = _FuturesSnapshotClient(100)
+    dcm = FuturesDepthCacheManager(
+        client, "BTCUSD_PERP", bm=object(), futures_type=FuturesType.COIN_M, limit=500
+    )
+    await dcm._init_cache()
+    assert client.calls == [("coin_m", "BTCUSD_PERP", 500)]
+
+    # starts after the snapshot, so updates are missing
+    client.last_update_id = 110
+    await dcm._depth_event(_futures_diff(105, 111, 104))
+    assert len(client.calls) == 2
+    assert dcm._last_update_id == 111
@@ -0,0 +1,210 @@
+import json
+
+import pytest
+
+from binance.ws.events import (
+    AggTrade,
+    BookTicker,
+    DepthDiff,
+    Kline,
+    MarkPrice,
+    make_decoder,
+    parse_book_ticker,
+    parse_event,
+    parse_mark_price,
+)
+from binance.ws.streams import BinanceSocketManager
+
+BOOK_TICKER = {
+    "u": 400900217,
+    "s": "BNBUSDT",
+    "b": "25.35190000",
+    "B": "31.21000000",
+    "a": "25.36520000",
+    "A": "40.66000000",
+}
+
+AGG_TRADE = {
+    "e": "aggTrade",
+    "E": 1499405254326,
+    "s": "ETHBTC",
+    "a": 70232,
+    "p": "0.10281118",
+    "q": "8.15632997",
+    "f": 77489,
+    "l": 77489,
+    "T": 1499405254324,
+    "m": False,
+    "M": True,
+}
+
+DEPTH_DIFF = {
+    "e": "depthUpdate",
+    "E": 123456789,
+    "T": 123456788,
+    "s": "BTCUSDT",
+    "U": 157,
+    "u": 160,
+    "pu": 149,
+    "b": [["0.0024", "10"]],
+    "a": [["0.0026", "100"], ["0.0027", "0"]],
+}
+
+MARK_PRICE = {
+    "e": "markPriceUpdate",
+    "E": 1562305380000,
+    "s": "BTCUSDT",
+    "p": "11794.15000000",
+    "i": "11784.62659091",
+    "P": "11784.25641265",
+    "r": "0.00038167",
+    "T": 1562306400000,
+}
+
+KLINE = {
+    "e": "kline",
+    "E": 1499404907056,
+    "s": "ETHBTC",
+    "k": {
+        "t": 1499404860000,
+        "T": 1499404919999,
+        "s": "ETHBTC",
+        "i": "1m",
+        "f": 77462,
+        "L": 77465,
+        "o": "0.10278577",
+        "c": "0.10278645",
+        "h": "0.10278712",
+        "l": "0.10278518",
+        "v": "17.47929838",
+        "n": 4,
+        "x": False,
+        "q": "1.79662878",
+        "V": "2.34879839",
+        "Q": "0.24142166",
+        "B": "13279784.01349473",
+    },
+}
+
+
+def test_parse_book_ticker():
+    event = parse_book_ticker(BOOK_TICKER)
+    assert isinstance(event, BookTicker)
+    assert event.symbol == "BNBUSDT"
+    assert event.update_id == 400900217
+    assert event.bid_price == 25.3519
+    assert event.ask_qty == 40.66
+    assert event.event_time is None
+    with pytest.raises(AttributeError):
+        event.extra = 1
+
+
+def test_parse_event_types():
+    trade = parse_event(AGG_TRADE)
+    assert isinstance(trade, AggTrade)
+    assert (trade.price, trade.quantity, trade.is_buyer_maker) == (0.10281118, 8.15632997, False)
+
+    diff = parse_event(DEPTH_DIFF)
+    assert isinstance(diff, DepthDiff)
+    assert (diff.first_update_id, diff.final_update_id, diff.prev_final_update_id) == (157, 160, 149)
+    assert diff.bids == [(0.0024, 10.0)]
+    assert diff.asks == [(0.0026, 100.0), (0.0027, 0.0)]
+
+    mark = parse_event(MARK_PRICE)
+    assert isinstance(mark, MarkPrice)
+    assert (mark.mark_price, mark.funding_rate, mark.next_funding_time) == (
+        11794.15,
+        0.00038167,
+        1562306400000,
+    )
+
+    kline = parse_event(KLINE)
+    assert isinstance(kline, Kline)
+    assert (kline.interval, kline.open, kline.close, kline.trades, kline.is_closed) == (
+        "1m",
+        0.10278577,
+        0.10278645,
+        4,
+        False,
+    )
+
+    # spot book ticker has no event type
+    assert isinstance(parse_event(BOOK_TICKER), BookTicker)
+
+
+def test_parse_event_unwraps_envelope_and_passes_unknown_messages():
+    event = parse_event({"stream": "ethbtc@aggTrade", "data": AGG_TRADE})
+    assert isinstance(event, AggTrade)
+    assert event.stream == "ethbtc@aggTrade"
+    assert parse_event(AGG_TRADE).stream is None
+
+    unknown = {"stream": "ethbtc@ticker", "data": {"e": "24hrTicker", "s": "ETHBTC"}}
+    assert parse_event(unknown) is unknown
+
+
+def test_events_read_the_decoded_message():
+    diff = parse_event(DEPTH_DIFF)
+    # no copy of the message is made, levels are converted when read
+    assert diff.msg is DEPTH_DIFF
+    assert diff.bids is not diff.bids
+    assert diff.asks == [(0.0026, 100.0), (0.0027, 0.0)]
+
+    ticker = parse_book_ticker(BOOK_TICKER)
+    assert ticker.msg is BOOK_TICKER
+    assert (ticker.event_time, ticker.transaction_time) == (None, None)
+    assert parse_book_ticker(dict(BOOK_TICKER, E=1, T=2)).event_time == 1
+
+    mark = parse_mark_price(dict(MARK_PRICE, i="", P=""))
+    assert (mark.index_price, mark.estimated_settle_price) == (None, None)
+
+
+def test_parse_mark_price_array():
+    events = parse_mark_price([MARK_PRICE, dict(MARK_PRICE, s="ETHUSDT")])
+    assert [event.symbol for event in events] == ["BTCUSDT", "ETHUSDT"]
+
+
+def test_make_decoder():
+    decoder = make_decoder(parse_book_ticker)
+    event = decoder(json.dumps(BOOK_TICKER).encode())
+    assert isinstance(event, BookTicker)
+
+    # subscription responses are passed through
+    assert decoder(b'{"result": null, "id": 1}') == {"result": None, "id": 1}
+
+
+class _Client:
+    tld = "com"
+    testnet = False
+    demo = False
+    https_proxy = None
+
+
+def test_typed_sockets_use_event_decoder():
+    bm = BinanceSocketManager(_Client())
+    plain = bm.symbol_book_ticker_socket("BNBUSDT")
+    typed = bm.symbol_book_ticker_socket("BNBUSDT", typed=True)
+
+    assert plain is not typed
+    assert plain.decoder is None
+    assert isinstance(typed._handle_message(json.dumps(BOOK_TICKER)), BookTicker)
+    assert bm.symbol_book_ticker_socket("BNBUSDT", typed=True) is typed
+
+    with pytest.raises(ValueError):
+        bm.depth_socket("BNBUSDT", depth="5", typed=True)
+
+
+def test_typed_multiplex_socket_keeps_stream():
+    bm = BinanceSocketManager(_Client())
+    socket = bm.multiplex_socket(["bnbusdt@bookTicker", "btcusdt@markPrice", "ethbtc@ticker"], typed=True)
+
+    ticker = socket._handle_message(json.dumps({"stream": "bnbusdt@bookTicker", "data": BOOK_TICKER}))
+    assert isinstance(ticker, BookTicker)
+    assert (ticker.stream, ticker.symbol) == ("bnbusdt@bookTicker", "BNBUSDT")
+
+    mark = socket._handle_message(json.dumps({"stream": "btcusdt@markPrice", "data": MARK_PRICE}))
+    assert (mark.stream, mark.mark_price) == ("btcusdt@markPrice", 11794.15)
+    marks = parse_mark_price({"stream": "!markPrice@arr", "data": [MARK_PRICE]})
+    assert marks[0].stream == "!markPrice@arr"
+
+    ticker_24h = {"stream": "ethbtc@ticker", "data": {"e": "24hrTicker", "s": "ETHBTC"}}
+    assert socket._handle_message(json.dumps(ticker_24h)) == ticker_24h
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from binance.async_client import AsyncClient
+from binance.exceptions import BinanceAPIException
+from binance.hedging import HedgingPolicy
+from binance.rate_limit import RateLimit, RateLimiter
+from binance.transport import AsyncTransport, TransportResponse
+
+
+class Transport(AsyncTransport):
+    def __init__(self, delays, statuses=None):
+        self.delays = delays
+        self.statuses = statuses or {}
+        self.urls = []
+        self.cancelled = []
+
+    async def request(self, method, url, headers, data=None, timeout=None):
+        self.urls.append(url)
+        host = url.split("/")[2]
+        try:
+            await asyncio.sleep(self.delays.get(host, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(host)
+            raise
+        status = self.statuses.get(host, 200)
+        if status != 200:
+            return TransportResponse(status, {}, '{"code": -1000, "msg": "error"}')
+        return TransportResponse(200, {"X-Host": host}, '{"lastUpdateId": 1}')
+
+
+def test_policy_delay_follows_quantile():
+    policy = HedgingPolicy(min_samples=10, min_delay=0.01, max_delay=1)
+    key = policy.get_key("get", "https://api.binance.com/api/v3/depth")
+    assert key == "GET /api/v3/depth"
+    assert policy.get_key("get", "https://api.binance.com/api/v3/klines") is None
+    assert policy.get_delay(key) == 1
+    for latency in range(1, 101):
+        policy.record(key, latency / 1000)
+    assert policy.get_delay(key) == pytest.approx(0.095)
+
+
+def test_policy_hedge_uri_rotates_spot_hosts():
+    policy = HedgingPolicy(hosts=("1", "2"))
+    uri = "https://api1.binance.com/api/v3/depth?symbol=BTCUSDT"
+    assert policy.get_hedge_uri(uri) == "https://api2.binance.com/api/v3/depth?symbol=BTCUSDT"
+    assert policy.get_hedge_uri(uri) == "https://api2.binance.com/api/v3/depth?symbol=BTCUSDT"
+    assert policy.get_hedge_uri("https://api.binance.com/api/v3/depth").startswith("https://api1.")
+    assert policy.get_hedge_uri("https://fapi.binance.com/fapi/v1/depth") == "https://fapi.binance.com/fapi/v1/depth"
+    for uri in (
+        "https://api.binance.us/api/v3/depth",
+        "https://testnet.binance.vision/api/v3/depth",
+        "https://demo-api.binance.com/api/v3/depth",
+    ):
+        assert policy.get_hedge_uri(uri) == uri
+
+
+def test_policy_budget():
+    policy = HedgingPolicy(budget=0.5, max_tokens=4)
+    assert policy.spend(4)
+    assert not policy.spend(1)
+    policy.earn(2)
+    assert policy.spend(1)
+    policy.refund(10)
+    assert policy.tokens == 4
+
+
+@pytest.mark.asyncio()
+async def test_slow_request_is_hedged_to_another_host():
+    transport = Transport({"api.binance.com": 1, "api1.binance.com": 0})
+    policy = HedgingPolicy(delay=0.01)
+    client = AsyncClient(transport=transport, hedging_policy=policy)
+    assert await client.get_order_book(symbol="BTCUSDT") == {"lastUpdateId": 1}
+    assert client.response.headers["X-Host"] == "api1.binance.com"
+    assert transport.urls == [
+        "https://api.binance.com/api/v3/depth?symbol=BTCUSDT",
+        "https://api1.binance.com/api/v3/depth?symbol=BTCUSDT",
+    ]
+    await asyncio.sleep(0)
+    assert transport.cancelled == ["api.binance.com"]
+    assert policy.get_stats()["hedge_wins"] == 1
+    await client.close_connection()
+
+
+@pytest.mark.asyncio()
+async def test_fast_request_is_not_hedged():
+    transport = Transport({})
+    policy = HedgingPolicy(delay=0.5)
+    client = AsyncClient(transport=transport, hedging_policy=policy)
+    await client.get_order_book(symbol="BTCUSDT")
+    # klines are not hedged
+    await client.get_klines(symbol="BTCUSDT", interval="1m")
+    assert len(transport.urls) == 2
+    assert policy.get_stats()["hedges"] == 0
+    await client.close_connection()
+
+
+@pytest.mark.asyncio()
+async def test_hedge_charges_rate_limiter_and_budget():
+    transport = Transport({"api.binance.com": 0.05, "api1.binance.com": 1})
+    limiter = RateLimiter(
+        limits={"api": [RateLimit(RateLimit.REQUEST_WEIGHT, 60, 100, "X-MBX-USED-WEIGHT-1M")]}
+    )
+    policy = HedgingPolicy(delay=0.01, max_tokens=5, budget=0)
+    client = AsyncClient(transport=transport, hedging_policy=policy, rate_limiter=limiter)
+    await client.get_order_book(symbol="BTCUSDT")
+    # the first request wins, both are charged
+    assert client.response.headers["X-Host"] == "api.binance.com"
+    assert limiter.get_usage()["api"]["X-MBX-USED-WEIGHT-1M"][0] == 10
+    assert policy.tokens == 0
+    # the budget is spent, no more hedges
+    await client.get_order_book(symbol="BTCUSDT")
+    assert len(transport.urls) == 3
+    await client.close_connection()
+
+
+@pytest.mark.asyncio()
+async def test_error_is_raised_once_both_fail():
+    transport = Transport(
+        {"api.binance.com": 0.05, "api1.binance.com": 0},
+        {"api.binance.com": 500, "api1.binance.com": 500},
+    )
+    client = AsyncClient(transport=transport, hedging_policy=HedgingPolicy(delay=0.01))
+    with pytest.raises(BinanceAPIException):
+        await client.get_order_book(symbol="BTCUSDT")
+    assert len(transport.urls) == 2
+    await client.close_connection()
@@ -1,13 +1,24 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import asyncio
+
+from binance.async_client import AsyncClient
 from binance.client import Client
+from binance.enums import HistoricalKlinesType
+from binance.kline_cache import EarliestTimestampCache
 import pytest
 import requests_mock
 
 client = Client("api_key", "api_secret", ping=False)
 
 
+@pytest.fixture(autouse=True)
+def clear_earliest_timestamps():
+    # each test mocks its own first kline
+    client.earliest_timestamp_cache.clear()
+
+
 def test_exact_amount():
     """Test Exact amount returned"""
 
@@ -341,3 +352,141 @@ def test_start_and_limit():
             limit=5,
         )
         assert len(klines) == 5
+
+
+FIRST_OPEN_TIME = 1500000000000
+
+
+def _klines_page(start_time, end_time, limit, interval_ms=60000):
+    # klines open on the minute from FIRST_OPEN_TIME, each page repeats the last kline of the previous one
+    first = max(start_time, FIRST_OPEN_TIME)
+    first += -(first - FIRST_OPEN_TIME) % interval_ms
+    open_times = range(first, end_time + 1, interval_ms)[:limit]
+    if first > FIRST_OPEN_TIME:
+        open_times = [first - interval_ms, *open_times]
+    return [[open_time, "1", "1", "1", "1", "1", open_time + interval_ms - 1] for open_time in open_times]
+
+
+def _klines_callback(request, context):
+    params = {key: int(value[0]) for key, value in request.qs.items() if key in ("starttime", "endtime", "limit")}
+    return _klines_page(params["starttime"], params.get("endtime", 2 ** 62), params["limit"])
+
+
+def test_historical_klines_parallel():
+    with requests_mock.mock() as m:
+        m.get("https://api.binance.com/api/v3/klines", json=_klines_callback)
+        klines = client.get_historical_klines_parallel(
+            symbol="BNBBTC",
+            interval=Client.KLINE_INTERVAL_1MINUTE,
+            start_str=FIRST_OPEN_TIME - 3600000,
+            end_str=FIRST_OPEN_TIME + 2499 * 60000,
+            page_limit=1000,
+            concurrency=3,
+        )
+        # one call for the first kline, then three pages
+        assert m.call_count == 4
+    open_times = [kline[0] for kline in klines]
+    assert open_times == list(range(FIRST_OPEN_TIME, FIRST_OPEN_TIME + 2500 * 60000, 60000))
+
+
+def test_historical_klines_parallel_limit():
+    with requests_mock.mock() as m:
+        m.get("https://api.binance.com/api/v3/klines", json=_klines_callback)
+        klines = client.get_historical_klines_parallel(
+            symbol="BNBBTC",
+            interval=Client.KLINE_INTERVAL_1MINUTE,
+            start_str=FIRST_OPEN_TIME,
+            limit=150,
+            page_limit=100,
+        )
+        assert m.call_count == 3
+    assert len(klines) == 150
+    assert klines[-1][0] == FIRST_OPEN_TIME + 149 * 60000
+
+
+@pytest.mark.asyncio()
+async def test_historical_klines_parallel_async():
+    async_client = AsyncClient("api_key", "api_secret")
+    calls = []
+
+    async def klines(klines_type=None, **params):
+        calls.append(params)
+        await asyncio.sleep(0)
+        if params.get("startTime") == 0:
+            return _klines_page(0, 2 ** 62, 1)
+        return _klines_page(params["startTime"], params["endTime"], params["limit"])
+
+    async_client._klines = klines
+    try:
+        result = await async_client.get_historical_klines_parallel(
+            symbol="BNBBTC",
+            interval=AsyncClient.KLINE_INTERVAL_1MINUTE,
+            start_str=FIRST_OPEN_TIME,
+            end_str=FIRST_OPEN_TIME + 4999 * 60000,
+            concurrency=2,
+        )
+    finally:
+        await async_client.close_connection()
+    assert len(calls) == 6
+    assert [kline[0] for kline in result] == list(range(FIRST_OPEN_TIME, FIRST_OPEN_TIME + 5000 * 60000, 60000))
+
+
+def test_earliest_timestamp_is_cached():
+    with requests_mock.mock() as m:
+        m.get("https://api.binance.com/api/v3/klines", json=_klines_callback)
+        for _ in range(2):
+            client.get_historical_klines(
+                "BNBBTC", Client.KLINE_INTERVAL_1MINUTE, FIRST_OPEN_TIME - 60000, FIRST_OPEN_TIME + 9 * 60000
+            )
+        probes = [request for request in m.request_history if request.qs["limit"] == ["1"]]
+        assert len(probes) == 1
+        assert m.call_count == 3
+    assert client.earliest_timestamp_cache.get("BNBBTC", "1m", HistoricalKlinesType.SPOT) == FIRST_OPEN_TIME
+    assert client.earliest_timestamp_cache.get("BNBBTC", "1m", HistoricalKlinesType.FUTURES) is None
+
+
+def test_earliest_timestamp_cache_persists(tmp_path):
+    path = tmp_path / "klines.sqlite3"
+    cache = EarliestTimestampCache(path)
+    cache.set("BTCUSDT", "1h", HistoricalKlinesType.FUTURES_MARK_PRICE, FIRST_OPEN_TIME)
+    reloaded = EarliestTimestampCache(path)
+    assert reloaded.get("BTCUSDT", "1h", HistoricalKlinesType.FUTURES_MARK_PRICE) == FIRST_OPEN_TIME
+    assert reloaded.get("BTCUSDT", "1h", HistoricalKlinesType.FUTURES) is None
+
+    # caches sharing the file, e.g. in two processes, keep each other's timestamps
+    cache.set("ETHUSDT", "1m", HistoricalKlinesType.SPOT, FIRST_OPEN_TIME + 1)
+    reloaded.set("BNBUSDT", "1m", HistoricalKlinesType.SPOT, FIRST_OPEN_TIME + 2)
+    assert reloaded.get("ETHUSDT", "1m", HistoricalKlinesType.SPOT) == FIRST_OPEN_TIME + 1
+    assert len(EarliestTimestampCache(path)) == 3
+
+    reloaded.clear()
+    assert len(EarliestTimestampCache(path)) == 0
+    cache.close()
+    reloaded.close()
+
+
+@pytest.mark.asyncio()
+async def test_earliest_timestamp_cache_shared_with_async_client():
+    cache = EarliestTimestampCache()
+    sync_client = Client("api_key", "api_secret", ping=False, earliest_timestamp_cache=cache)
+    with requests_mock.mock() as m:
+        m.get("https://fapi.binance.com/fapi/v1/klines", json=_klines_callback)
+        sync_client.futures_historical_klines("BTCUSDT", "1m", FIRST_OPEN_TIME - 60000, FIRST_OPEN_TIME + 60000)
+        assert m.call_count == 2
+
+    async_client = AsyncClient("api_key", "api_secret", earliest_timestamp_cache=cache)
+    calls = []
+
+    async def klines(klines_type=None, **params):
+        calls.append(params)
+        return _klines_page(params["startTime"], params.get("endTime", 2 ** 62), params["limit"])
+
+    async_client._klines = klines
+    try:
+        result = await async_client.futures_historical_klines(
+            "BTCUSDT", "1m", FIRST_OPEN_TIME - 60000, FIRST_OPEN_TIME + 60000
+        )
+    finally:
+        await async_client.close_connection()
+    assert [params["limit"] for params in calls] == [1000]
+    assert [kline[0] for kline in result] == [FIRST_OPEN_TIME, FIRST_OPEN_TIME + 60000]
@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from binance.enums import HistoricalKlinesType
+from binance.kline_cache import CachedKlineStore
+
+from .conftest import MINUTE, FakeAsyncKlinesClient, FakeKlinesClient
+
+LISTED = 1500000000000
+
+
+def _ranges(client):
+    return [(params["startTime"], params["endTime"]) for _, params in client.calls]
+
+
+def test_serves_cached_ranges_and_fetches_gaps(tmp_path):
+    client = FakeKlinesClient({"BTCUSDT": LISTED})
+    store = CachedKlineStore(client, tmp_path / "klines.sqlite3", page_limit=100)
+    end = LISTED + 249 * MINUTE
+
+    klines = store.get_klines("BTCUSDT", "1m", 0, end)
+    assert [kline[0] for kline in klines] == list(range(LISTED, end + 1, MINUTE))
+    assert len(client.calls) == 3
+    assert klines[5] == [LISTED + 5 * MINUTE, "1.0", "2.0", "0.5", str((LISTED + 5 * MINUTE) % 7), "10",
+                         LISTED + 6 * MINUTE - 1, "10", 3, "5", "5", "0"]
+
+    client.calls.clear()
+    assert store.get_klines("BTCUSDT", "1m", LISTED + 10 * MINUTE, LISTED + 20 * MINUTE) == klines[10:21]
+    assert client.calls == []
+
+    # only the tail after the cached range is fetched
+    klines = store.get_klines("BTCUSDT", "1m", LISTED + 200 * MINUTE, LISTED + 299 * MINUTE)
+    assert len(klines) == 100
+    assert _ranges(client) == [(end + 1, LISTED + 299 * MINUTE)]
+    assert store.get_gaps("BTCUSDT", "1m", 0, LISTED + 299 * MINUTE) == []
+    # other series are cached separately
+    assert store.get_gaps("BTCUSDT", "1m", 0, 1, HistoricalKlinesType.FUTURES) == [(0, 1)]
+
+
+def test_open_kline_is_refetched(tmp_path):
+    client = FakeKlinesClient({"BTCUSDT": LISTED})
+    store = CachedKlineStore(client, tmp_path / "klines.sqlite3")
+    now = int(time.time() * 1000)
+    start = now - 10 * 3600000
+    klines = store.get_klines("BTCUSDT", "1h", start)
+    assert len(klines) == 10
+    assert klines[-1][0] > now - 3600000
+    # the open kline is returned but not stored
+    assert store.count("BTCUSDT", "1h") == 9
+    client.calls.clear()
+    store.get_klines("BTCUSDT", "1h", start)
+    assert len(client.calls) == 1
+    assert _ranges(client)[0][0] > now - 3600000
+    assert store.update("BTCUSDT", "1h") == 0
+
+
+def test_concurrent_readers(tmp_path):
+    path = tmp_path / "klines.sqlite3"
+    store = CachedKlineStore(FakeKlinesClient({"BTCUSDT": LISTED}), path)
+    end = LISTED + 999 * MINUTE
+    expected = store.get_klines("BTCUSDT", "1m", 0, end)
+    errors = []
+
+    def read():
+        try:
+            reader = CachedKlineStore(FakeKlinesClient({"BTCUSDT": LISTED}), path)
+            for _ in range(5):
+                assert reader.get_klines("BTCUSDT", "1m", 0, end) == expected
+                assert store.get_klines("BTCUSDT", "1m", 0, end) == expected
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+@pytest.mark.asyncio()
+async def test_async_client(tmp_path):
+    client = FakeAsyncKlinesClient({"BTCUSDT": LISTED})
+    store = CachedKlineStore(client, tmp_path / "klines.sqlite3", page_limit=100)
+    end = LISTED + 149 * MINUTE
+    klines = await store.get_klines_async("BTCUSDT", "1m", 0, end)
+    assert [kline[0] for kline in klines] == list(range(LISTED, end + 1, MINUTE))
+    assert len(client.calls) == 2
+    assert store.get_klines("BTCUSDT", "1m", 0, end) == klines
+    assert len(client.calls) == 2
+
+    start = int(time.time() * 1000) - 10 * 3600000
+    assert len(await store.get_klines_async("BTCUSDT", "1h", start)) == 10
+    assert await store.update_async("BTCUSDT", "1h") == 0
+    assert store.count("BTCUSDT", "1h") == 9
+
+
+def test_close_closes_every_thread_connection(tmp_path):
+    store = CachedKlineStore(FakeKlinesClient({"BTCUSDT": LISTED}), tmp_path / "klines.sqlite3")
+    connections = []
+    threads = [threading.Thread(target=lambda: connections.append(store._connection())) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connections.append(store._connection())
+
+    store.close()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # the store opens a new connection when used again
+    assert store.count("BTCUSDT", "1m") == 0
+    store.close()
@@ -0,0 +1,82 @@
+import pytest
+import requests_mock
+
+from binance.client import Client
+from binance.klines import KLINE_FIELDS, format_klines, klines_to_columns, klines_to_numpy
+
+KLINES = [
+    [
+        1500004800000 + i * 60000,
+        "0.00005000",
+        "0.00005300",
+        "0.00001000",
+        f"0.0000479{i}",
+        "663152.00000000",
+        1500004859999 + i * 60000,
+        "30.55108144",
+        43 + i,
+        "559224.00000000",
+        "25.65468144",
+        "0",
+    ]
+    for i in range(3)
+]
+
+
+def test_columns_without_numpy():
+    columns = klines_to_columns(KLINES, use_numpy=False)
+    assert list(columns) == [name for name, _ in KLINE_FIELDS]
+    assert columns["open_time"].typecode == "q"
+    assert list(columns["close"]) == [0.0000479, 0.00004791, 0.00004792]
+    assert list(columns["trades"]) == [43, 44, 45]
+    assert len(klines_to_columns([], use_numpy=False)["open"]) == 0
+
+
+def test_columns_with_numpy():
+    np = pytest.importorskip("numpy")
+    columns = klines_to_columns(KLINES, use_numpy=True)
+    assert columns["open_time"].dtype == np.int64
+    assert columns["volume"].dtype == np.float64
+    assert columns["high"].tolist() == [0.000053] * 3
+
+
+def test_structured_array():
+    np = pytest.importorskip("numpy")
+    klines = klines_to_numpy(KLINES)
+    assert klines.dtype.names == tuple(name for name, _ in KLINE_FIELDS)
+    assert klines["close_time"][2] == 1500004979999
+    assert klines[1]["trades"] == 44
+    assert len(klines_to_numpy([])) == 0
+    assert klines.dtype["open"] == np.float64
+
+
+def test_dataframe():
+    pd = pytest.importorskip("pandas")
+    df = format_klines(KLINES, "pandas")
+    assert len(df) == 3
+    assert df["open_time"][0] == pd.Timestamp("2017-07-14 04:00:00", tz="UTC")
+    assert df["taker_buy_quote_volume"].sum() == pytest.approx(3 * 25.65468144)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        format_klines(KLINES, "arrow")
+
+
+def test_historical_klines_output_format():
+    client = Client("api_key", "api_secret", ping=False)
+    with requests_mock.mock() as m:
+        m.get(
+            "https://api.binance.com/api/v3/klines?interval=1m&limit=1&startTime=0&symbol=BNBBTC",
+            json=KLINES[:1],
+        )
+        m.get(
+            "https://api.binance.com/api/v3/klines?interval=1m&limit=1000&startTime=1500004800000&symbol=BNBBTC",
+            json=KLINES,
+        )
+        columns = client.get_historical_klines(
+            "BNBBTC", Client.KLINE_INTERVAL_1MINUTE, 1500004800000, output_format="columns"
+        )
+    assert list(columns["open_time"]) == [kline[0] for kline in KLINES]
+    with pytest.raises(ValueError):
+        client.get_historical_klines("BNBBTC", Client.KLINE_INTERVAL_1MINUTE, output_format="csv")
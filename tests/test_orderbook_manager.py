@@ -0,0 +1,84 @@
+import random
+
+from binance.ws.orderbook_manager import OrderBookManager, PriceLadder
+
+
+def _depth_update(first_id, final_id, prev_id, bids=None, asks=None):
+    return {
+        "e": "depthUpdate",
+        "U": first_id,
+        "u": final_id,
+        "pu": prev_id,
+        "b": bids or [],
+        "a": asks or [],
+    }
+
+
+def test_price_ladder_matches_full_sort():
+    bids = PriceLadder(descending=True, max_levels=None)
+    asks = PriceLadder(descending=False, max_levels=None)
+    bids_dict = {}
+    asks_dict = {}
+    rng = random.Random(1)
+    for _ in range(2000):
+        price = round(rng.uniform(90, 110), 1)
+        quantity = rng.choice([0, 0, 1.5, 2.0, 3.25])
+        for ladder, levels in ((bids, bids_dict), (asks, asks_dict)):
+            ladder.update(price, quantity)
+            if quantity == 0:
+                levels.pop(price, None)
+            else:
+                levels[price] = quantity
+
+    assert bids[:] == sorted([[p, q] for p, q in bids_dict.items()], reverse=True)
+    assert asks[:] == sorted([[p, q] for p, q in asks_dict.items()])
+
+
+def test_price_ladder_view():
+    ladder = PriceLadder(descending=True, max_levels=2)
+    ladder.load({1.0: 10.0, 3.0: 30.0, 2.0: 20.0})
+
+    assert len(ladder) == 2
+    assert ladder[0] == [3.0, 30.0]
+    assert ladder[-1] == [2.0, 20.0]
+    assert ladder[:5] == [[3.0, 30.0], [2.0, 20.0]]
+    assert [price for price, _ in ladder] == [3.0, 2.0]
+    assert ladder.best() == [3.0, 30.0]
+
+    assert ladder.update(3.0, 0)
+    assert not ladder.update(3.0, 0)
+    assert ladder[0] == [2.0, 20.0]
+
+
+def test_process_depth_update_keeps_views_sorted():
+    manager = OrderBookManager(symbol="BTCUSDT")
+    manager.orderbook["bids_dict"] = {100.0: 1.0, 99.0: 2.0}
+    manager.orderbook["asks_dict"] = {101.0: 1.0, 102.0: 2.0}
+    manager.sync_dict_and_list()
+    manager.orderbook["last_update_id"] = 10
+
+    manager.process_depth_update(
+        _depth_update(
+            11,
+            12,
+            10,
+            bids=[["100.5", "3"], ["99", "0"]],
+            asks=[["101", "0"], ["101.5", "4"]],
+        )
+    )
+
+    assert manager.orderbook["last_update_id"] == 12
+    assert manager.orderbook["bids"][:] == [[100.5, 3.0], [100.0, 1.0]]
+    assert manager.orderbook["asks"][:] == [[101.5, 4.0], [102.0, 2.0]]
+    assert manager.get_best_prices() == {"bid": 100.5, "ask": 101.5}
+    assert manager.validate_orderbook()["is_valid"]
+
+
+def test_process_depth_update_ignores_gap():
+    manager = OrderBookManager(symbol="BTCUSDT")
+    manager.orderbook["last_update_id"] = 10
+
+    manager.process_depth_update(_depth_update(20, 21, 19, bids=[["100", "1"]]))
+
+    assert manager.orderbook["last_update_id"] == 10
+    assert len(manager.orderbook["bids"]) == 0
@@ -0,0 +1,190 @@
+import pytest
+import requests_mock
+
+from binance import Client
+from binance.exceptions import (
+    BinanceAPIException,
+    BinanceCircuitBreakerOpen,
+    BinanceRateLimitExceeded,
+)
+from binance.rate_limit import CircuitBreaker, RateLimit, RateLimiter, get_api_family
+
+
+def _limiter(limit=100, **kwargs):
+    return RateLimiter(
+        limits={"api": [RateLimit(RateLimit.REQUEST_WEIGHT, 60, limit, "X-MBX-USED-WEIGHT-1M")]},
+        **kwargs,
+    )
+
+
+def test_get_api_family():
+    assert get_api_family("https://api.binance.com/api/v3/depth") == ("api", "/api/v3/depth")
+    assert get_api_family("https://api.binance.com/sapi/v1/margin/order")[0] == "sapi"
+    assert get_api_family("https://fapi.binance.com/futures/data/openInterestHist")[0] == "fapi"
+    assert get_api_family("https://dapi.binance.com/futures/data/openInterestHist")[0] == "dapi"
+    assert get_api_family("https://www.binance.com/bapi/asset/v2/public/asset")[0] is None
+
+
+def test_endpoint_weights():
+    limiter = RateLimiter()
+    assert limiter.get_weight("get", "/api/v3/depth", {"limit": 5000}) == 250
+    assert limiter.get_weight("get", "/api/v3/depth", {}) == 5
+    assert limiter.get_weight("GET", "/api/v3/ticker/price", {"symbol": "BTCUSDT"}) == 2
+    assert limiter.get_weight("GET", "/api/v3/ticker/price", {}) == 4
+    assert limiter.get_weight("GET", "/fapi/v1/klines", {"limit": 1500}) == 10
+    assert limiter.get_weight("GET", "/api/v3/unknown", {}) == 1
+    assert limiter.get_order_count("post", "/api/v3/order", {}) == 1
+    assert limiter.get_order_count("GET", "/api/v3/order", {}) == 0
+    assert limiter.get_order_count("POST", "/fapi/v1/batchOrders", {"batchOrders": "[{}, {}]"}) == 2
+
+
+def test_reserve_until_utilization():
+    limiter = _limiter(limit=100, utilization=0.5)
+    now = 120.0
+    for _ in range(5):
+        assert limiter._reserve("api", 10, 0, now) == 0
+    assert limiter._reserve("api", 10, 0, now + 15) == pytest.approx(45)
+    # the next window starts empty
+    assert limiter._reserve("api", 10, 0, 180.0) == 0
+
+
+def test_reject_mode(monkeypatch):
+    limiter = _limiter(limit=10, mode=RateLimiter.REJECT)
+    monkeypatch.setattr("binance.rate_limit.time.time", lambda: 60.0)
+    # a request heavier than the allowance goes through on an empty window
+    limiter.acquire("get", "https://api.binance.com/api/v3/exchangeInfo")
+    with pytest.raises(BinanceRateLimitExceeded) as exc:
+        limiter.acquire("get", "https://api.binance.com/api/v3/klines")
+    assert exc.value.family == "api"
+    assert exc.value.retry_after == pytest.approx(60)
+
+
+def test_delay_mode_sleeps_until_next_window(monkeypatch):
+    limiter = _limiter(limit=10)
+    clock = [90.0]
+    sleeps = []
+
+    def sleep(delay):
+        sleeps.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr("binance.rate_limit.time.time", lambda: clock[0])
+    monkeypatch.setattr("binance.rate_limit.time.sleep", sleep)
+    for _ in range(5):
+        limiter.acquire("get", "https://api.binance.com/api/v3/klines")
+    assert sleeps == [pytest.approx(30)]
+
+
+def test_update_from_headers_raises_local_count():
+    limiter = _limiter(limit=100)
+    limiter.acquire("get", "https://api.binance.com/api/v3/klines")
+    limiter.update_from_headers(
+        "https://api.binance.com/api/v3/klines", {"X-MBX-USED-WEIGHT-1M": "80"}
+    )
+    assert limiter.get_usage()["api"]["X-MBX-USED-WEIGHT-1M"] == (80, 100)
+    limiter.update_from_headers(
+        "https://api.binance.com/api/v3/klines", {"X-MBX-USED-WEIGHT-1M": "3"}
+    )
+    assert limiter.get_usage()["api"]["X-MBX-USED-WEIGHT-1M"] == (80, 100)
+
+
+def test_client_charges_requests():
+    limiter = RateLimiter()
+    client = Client(api_key="api_key", api_secret="api_secret", ping=False, rate_limiter=limiter)
+    with requests_mock.mock() as m:
+        m.get(
+            "https://api.binance.com/api/v3/depth",
+            json={},
+            headers={"X-MBX-USED-WEIGHT-1M": "7"},
+        )
+        client.get_order_book(symbol="BTCUSDT", limit=1000)
+    # 50 charged locally, the server reported less
+    assert limiter.get_usage()["api"]["X-MBX-USED-WEIGHT-1M"] == (50, 6000)
+
+
+@pytest.mark.asyncio()
+async def test_acquire_async_waits_for_next_window(monkeypatch):
+    limiter = _limiter(limit=10)
+    clock = [110.0]
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr("binance.rate_limit.time.time", lambda: clock[0])
+    monkeypatch.setattr("binance.rate_limit.asyncio.sleep", sleep)
+    for _ in range(5):
+        await limiter.acquire_async("get", "https://api.binance.com/api/v3/klines")
+    assert sleeps == [pytest.approx(10)]
+
+
+def test_unlimited_hosts_are_not_counted():
+    limiter = RateLimiter()
+    limiter.acquire("get", "https://www.binance.com/bapi/asset/v2/public/asset")
+    assert limiter.get_usage() == {}
+
+
+def test_circuit_breaker_opens_on_429():
+    breaker = CircuitBreaker()
+    assert breaker.record("https://fapi.binance.com/fapi/v1/klines", 200, {}) == 0
+    assert breaker.get_state() == {}
+
+    assert breaker.record("https://fapi.binance.com/fapi/v1/klines", 429, {"Retry-After": "5"}) == 5
+    state = breaker.get_state()["fapi"]
+    assert state["state"] == CircuitBreaker.OPEN
+    assert state["status"] == 429
+    assert state["trips"] == 1
+    assert 0 < breaker.get_wait("https://fapi.binance.com/fapi/v1/depth") <= 5
+    # other families keep going
+    assert breaker.get_wait("https://api.binance.com/api/v3/depth") == 0
+
+
+def test_circuit_breaker_raises_on_long_ban():
+    breaker = CircuitBreaker(max_wait=10)
+    breaker.record("https://api.binance.com/api/v3/depth", 418, {"Retry-After": "120"})
+    with pytest.raises(BinanceCircuitBreakerOpen) as exc:
+        breaker.wait("https://api.binance.com/api/v3/ticker/price")
+    assert exc.value.family == "api"
+
+
+def test_circuit_breaker_retry_delay():
+    breaker = CircuitBreaker(max_retries=2, backoff=1, max_backoff=3)
+    assert 0 <= breaker.get_retry_delay("get", 429, 0) <= 1
+    assert 0 <= breaker.get_retry_delay("get", 503, 1) <= 2
+    assert breaker.get_retry_delay("get", 429, 2) is None
+    assert breaker.get_retry_delay("post", 429, 0) is None
+    assert breaker.get_retry_delay("get", 400, 0) is None
+
+
+def test_client_retries_get_after_429():
+    breaker = CircuitBreaker(backoff=0)
+    client = Client(api_key="api_key", api_secret="api_secret", ping=False, circuit_breaker=breaker)
+    with requests_mock.mock() as m:
+        m.get(
+            "https://api.binance.com/api/v3/account",
+            [
+                {"status_code": 429, "json": {"code": -1003}, "headers": {"Retry-After": "0"}},
+                {"status_code": 200, "json": {"balances": []}},
+            ],
+        )
+        assert client.get_account() == {"balances": []}
+        assert m.call_count == 2
+        # each attempt is signed again
+        assert [len(r.qs["signature"]) for r in m.request_history] == [1, 1]
+    assert breaker.get_state()["api"]["trips"] == 1
+
+
+def test_client_does_not_retry_post():
+    breaker = CircuitBreaker(backoff=0)
+    client = Client(api_key="api_key", api_secret="api_secret", ping=False, circuit_breaker=breaker)
+    with requests_mock.mock() as m:
+        m.post(
+            "https://api.binance.com/api/v3/order",
+            status_code=429,
+            json={"code": -1003},
+            headers={"Retry-After": "0"},
+        )
+        with pytest.raises(BinanceAPIException):
+            client.create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1)
+        assert m.call_count == 1
@@ -1,11 +1,16 @@
 import sys
 import pytest
 import gzip
+import time
 import json
 from unittest.mock import patch, create_autospec, Mock
-from binance.ws.reconnecting_websocket import ReconnectingWebsocket
-from binance.ws.constants import WSListenerState
-from binance.exceptions import BinanceWebsocketUnableToConnect, ReadLoopClosed
+from binance.ws.reconnecting_websocket import ReconnectingWebsocket, default_conflate_key
+from binance.ws.constants import WSListenerState, WSQueueOverflowPolicy
+from binance.exceptions import (
+    BinanceWebsocketQueueOverflow,
+    BinanceWebsocketUnableToConnect,
+    ReadLoopClosed,
+)
 from websockets import WebSocketClientProtocol  # type: ignore
 from websockets.protocol import State
 import asyncio
@@ -224,3 +229,212 @@ async def test_recv_read_loop_closed():
     
     assert "Read loop has been closed" in str(exc_info.value)
     assert "please reset the websocket connection" in str(exc_info.value)
+
+
+def test_handle_message_raw():
+    ws = ReconnectingWebsocket(url="wss://test.url", raw=True, is_binary=True)
+    frame = gzip.compress(b'{"key": "value"}')
+    assert ws._handle_message(frame) is frame
+
+
+def test_handle_message_decoder():
+    def best_bid(frame):
+        return json.loads(frame)["b"]
+
+    ws = ReconnectingWebsocket(url="wss://test.url", decoder=best_bid)
+    assert ws._handle_message(b'{"b": "1.5", "a": "1.6"}') == "1.5"
+
+    ws = ReconnectingWebsocket(url="wss://test.url", is_binary=True, decoder=best_bid)
+    assert ws._handle_message(gzip.compress(b'{"b": "2.5"}')) == "2.5"
+
+
+def test_recv_kwargs_request_bytes_when_supported():
+    class Connection:
+        async def recv(self, decode=None):
+            pass
+
+    class LegacyConnection:
+        async def recv(self):
+            pass
+
+    ws = ReconnectingWebsocket(url="wss://test.url")
+    ws.ws = Connection()
+    assert ws._get_recv_kwargs() == {"decode": False}
+    ws.ws = LegacyConnection()
+    assert ws._get_recv_kwargs() == {}
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Requires Python 3.8+")
+@pytest.mark.asyncio
+async def test_receive_raw_frames():
+    mock_socket = create_autospec(WebSocketClientProtocol)
+    mock_socket.recv = AsyncMock(return_value=b'{"e": "value"}')
+    mock_socket.state = AsyncMock()
+
+    with patch("websockets.connect") as mock_connect:
+        mock_connect.return_value.__aenter__.return_value = mock_socket
+
+        ws = ReconnectingWebsocket(url="wss://test.url", raw=True)
+        async with ws:
+            msg = await ws.recv()
+            assert msg == b'{"e": "value"}'
+
+
+def _book_ticker(symbol, update_id):
+    return {"u": update_id, "s": symbol, "b": "1.0", "B": "1", "a": "1.1", "A": "1"}
+
+
+async def _drain(ws):
+    msgs = []
+    while not ws._queue.empty():
+        msgs.append(ws._dequeue(ws._queue.get_nowait()))
+    return msgs
+
+
+@pytest.mark.asyncio
+async def test_overflow_raise():
+    ws = ReconnectingWebsocket(url="wss://test.url", max_queue_size=1)
+    await ws._enqueue({"e": "trade", "t": 1})
+    with pytest.raises(BinanceWebsocketQueueOverflow):
+        await ws._enqueue({"e": "trade", "t": 2})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        (WSQueueOverflowPolicy.DROP_OLDEST, [2, 3]),
+        (WSQueueOverflowPolicy.DROP_NEWEST, [1, 2]),
+    ],
+)
+async def test_overflow_drop(policy, expected):
+    ws = ReconnectingWebsocket(url="wss://test.url", max_queue_size=2, overflow_policy=policy)
+    for trade_id in (1, 2, 3):
+        await ws._enqueue({"e": "trade", "t": trade_id})
+
+    assert [msg["t"] for msg in await _drain(ws)] == expected
+    assert ws.overflow_stats == {"dropped": 1, "conflated": 0, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_overflow_conflate():
+    ws = ReconnectingWebsocket(
+        url="wss://test.url", max_queue_size=3, overflow_policy="conflate"
+    )
+    await ws._enqueue(_book_ticker("BNBUSDT", 1))
+    await ws._enqueue({"e": "trade", "t": 1})
+    await ws._enqueue(_book_ticker("BNBUSDT", 2))
+    await ws._enqueue(_book_ticker("ETHUSDT", 3))
+    await ws._enqueue(_book_ticker("BNBUSDT", 4))
+
+    # latest book ticker per symbol, in the position of the first one
+    assert [(msg.get("s"), msg.get("u")) for msg in await _drain(ws)] == [
+        ("BNBUSDT", 4),
+        (None, None),
+        ("ETHUSDT", 3),
+    ]
+    assert ws.conflated_messages == 2
+    assert ws.dropped_messages == 0
+
+    # a dequeued key starts a new slot, trades are never conflated
+    await ws._enqueue(_book_ticker("BNBUSDT", 5))
+    await ws._enqueue({"e": "trade", "t": 2})
+    await ws._enqueue({"e": "trade", "t": 3})
+    await ws._enqueue({"e": "trade", "t": 4})
+    assert [msg.get("t") for msg in await _drain(ws)] == [2, 3, 4]
+    assert ws.dropped_messages == 1
+
+
+def test_default_conflate_key():
+    kline = {"e": "kline", "s": "BNBUSDT", "k": {"i": "1m"}}
+    assert default_conflate_key(kline) == (None, "kline", "BNBUSDT", "1m")
+    assert default_conflate_key({"stream": "bnbusdt@kline_1m", "data": kline}) == (
+        "bnbusdt@kline_1m",
+        "kline",
+        "BNBUSDT",
+        "1m",
+    )
+    assert default_conflate_key({"e": "depthUpdate", "s": "BNBUSDT"}) is None
+    assert default_conflate_key({"e": "aggTrade", "s": "BNBUSDT"}) is None
+    assert default_conflate_key(b"raw frame") is None
+
+
+@pytest.mark.asyncio
+async def test_overflow_block():
+    ws = ReconnectingWebsocket(url="wss://test.url", max_queue_size=1, overflow_policy="block")
+    ws._handle_read_loop = Mock()
+    await ws._enqueue({"e": "trade", "t": 1})
+    blocked = asyncio.ensure_future(ws._enqueue({"e": "trade", "t": 2}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    assert (await ws.recv())["t"] == 1
+    await blocked
+    assert (await ws.recv())["t"] == 2
+
+
+@pytest.mark.asyncio
+async def test_read_loop_cancel_with_full_block_queue():
+    ws = ReconnectingWebsocket(url="wss://test.url", max_queue_size=1, overflow_policy="block")
+
+    async def recv(**kwargs):
+        await asyncio.sleep(3600)
+
+    ws.ws = Mock(state=State.OPEN, recv=recv)
+    ws.ws_state = WSListenerState.STREAMING
+    await ws._enqueue({"e": "trade", "t": 1})
+
+    read_loop = asyncio.ensure_future(ws._read_loop())
+    await asyncio.sleep(0.01)
+    read_loop.cancel()
+    await asyncio.wait_for(read_loop, timeout=1)
+
+    # the error replaces the oldest message instead of waiting for the consumer
+    assert ws._queue.get_nowait() == {"e": "error", "type": "CancelledError", "m": ""}
+    assert ws.dropped_messages == 1
+
+
+@pytest.mark.asyncio
+async def test_recv_many():
+    ws = ReconnectingWebsocket(url="wss://test.url", overflow_policy="conflate")
+    ws._handle_read_loop = Mock()
+    for trade_id in range(5):
+        await ws._enqueue({"e": "trade", "t": trade_id})
+    await ws._enqueue(_book_ticker("BNBUSDT", 1))
+    await ws._enqueue(_book_ticker("BNBUSDT", 2))
+
+    assert [msg["t"] for msg in await ws.recv_many(3)] == [0, 1, 2]
+    msgs = await ws.recv_many()
+    assert [msg.get("t", msg.get("u")) for msg in msgs] == [3, 4, 2]
+    assert ws._conflated == {}
+
+    # waits for the first message only
+    assert await ws.recv_many(timeout=0.01) == []
+    ws.TIMEOUT = 2
+    started = time.monotonic()
+    assert await ws.recv_many(timeout=0) == []
+    assert time.monotonic() - started < 0.5
+    await ws._enqueue({"e": "trade", "t": 6})
+    assert await ws.recv_many(timeout=0) == [{"e": "trade", "t": 6}]
+    # empty messages are skipped like in recv
+    ws._queue.put_nowait(None)
+    asyncio.get_running_loop().call_later(0.01, ws._queue.put_nowait, {"e": "trade", "t": 7})
+    assert await ws.recv_many(timeout=1) == [{"e": "trade", "t": 7}]
+    asyncio.get_running_loop().call_later(0.01, ws._queue.put_nowait, {"e": "trade", "t": 5})
+    assert await ws.recv_many(timeout=1) == [{"e": "trade", "t": 5}]
+
+
+@pytest.mark.asyncio
+async def test_iter_batches():
+    ws = ReconnectingWebsocket(url="wss://test.url")
+    ws._handle_read_loop = Mock()
+    for trade_id in range(3):
+        await ws._enqueue({"e": "trade", "t": trade_id})
+
+    batches = ws.iter_batches(max_n=2)
+    assert [msg["t"] for msg in await batches.__anext__()] == [0, 1]
+    assert [msg["t"] for msg in await batches.__anext__()] == [2]
+
+    ws._handle_read_loop = None
+    with pytest.raises(ReadLoopClosed):
+        await batches.__anext__()